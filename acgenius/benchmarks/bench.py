@@ -0,0 +1,340 @@
+"""
+Benchmark parse, validate, match, report and apply at scale, on synthetic workloads.
+
+Run from the project folder:
+    python benchmarks/bench.py --out results.json
+    python benchmarks/bench.py --compare baseline.json --threshold 0.25
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable
+
+import yaml
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from acgenius import config  # noqa: E402
+from acgenius.resources.ip_acgs.utils import match_ip_acgs  # noqa: E402
+from acgenius.resources.models import (  # noqa: E402
+    IP_ACG,
+    AppInput,
+    Directory,
+    Inventory,
+    Rule,
+)
+from acgenius.resources.utils import create_report, format_table  # noqa: E402
+from acgenius.routing.actions import create, delete, update  # noqa: E402
+from acgenius.validation import val_work_instruction  # noqa: E402
+from acgenius.validation import utils as validation_utils  # noqa: E402
+from acgenius.validation.utils import parse_settings  # noqa: E402
+
+# (rules in total, IP ACGs, directories)
+SCENARIOS = [
+    (10, 1, 1),
+    (1_000, 100, 1),
+    (1_000, 100, 50),
+    (100_000, 1_000, 1),
+    (100_000, 1_000, 50),
+]
+
+
+class FakeWorkSpaces:
+    """
+    Answer the WorkSpaces operations used by the apply routes, without latency.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def _ok(self, **kwargs) -> dict:
+        self.calls += 1
+        return {}
+
+    def create_ip_group(self, **kwargs) -> dict:
+        self.calls += 1
+        return {"GroupId": f"wsipg-{kwargs['GroupName']}"}
+
+    def describe_tags(self, **kwargs) -> dict:
+        self.calls += 1
+        return {"TagList": []}
+
+    associate_ip_groups = _ok
+    update_rules_of_ip_group = _ok
+    disassociate_ip_groups = _ok
+    delete_ip_group = _ok
+    create_tags = _ok
+    delete_tags = _ok
+
+
+def get_ip(i: int) -> str:
+    """
+    Get a unique /32 address for the i-th rule, avoiding invalid addresses.
+    """
+    i += 1 << 24
+    return f"{i >> 24 & 255}.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+
+def get_settings(rules: int, groups: int) -> dict:
+    """
+    Get synthetic contents of settings.yaml, with limits raised to fit the workload.
+    """
+    rules_per_group = rules // groups
+    return {
+        "ip_acgs": [
+            {
+                "name": f"Group{g:05}",
+                "desc": f"Description {g}",
+                "origin": "Benchmark",
+                "rules": [
+                    {get_ip(g * rules_per_group + r): "Trusted host"}
+                    for r in range(rules_per_group)
+                ],
+            }
+            for g in range(groups)
+        ],
+        "tags": {"CreatedBy": "acgenius"},
+        "directories": [{"id": None, "name": None}],
+        "user_input_validation": {
+            "ip_address": {
+                "invalid": [{"0.0.0.0": "Open to all"}],
+                "prefix": {"default": 32, "min": 27},
+            },
+            "ip_acg": {
+                "name_length": {"max": 50},
+                "rules_amt": {"max": rules_per_group},
+                "rules_desc_length": {"max": 255},
+                "groups_per_directory_amt": {"max": groups},
+            },
+        },
+    }
+
+
+def get_inventory(settings: dict, directories: int, state: str = "current") -> Inventory:
+    """
+    Get a synthetic inventory for the IP ACGs of the settings.
+
+    :param state: "current" for IP ACGs matching the settings, "stale" for IP ACGs
+        with other rule descriptions, "absent" for no IP ACGs at all
+    """
+    suffix = " (stale)" if state == "stale" else ""
+    ip_acgs = [
+        IP_ACG(
+            id=f"wsipg-{ip_acg['name']}",
+            name=ip_acg["name"],
+            desc=ip_acg["desc"],
+            rules=[
+                Rule(ip=f"{ip}/32", desc=f"{desc}{suffix}")
+                for rule in ip_acg["rules"]
+                for ip, desc in rule.items()
+            ],
+        )
+        for ip_acg in settings["ip_acgs"]
+    ] if state != "absent" else []
+    return Inventory(
+        directories=[
+            Directory(
+                id=f"d-{d:010}",
+                name=f"corp{d}.example.com",
+                type="SimpleAD",
+                state="REGISTERED",
+                ip_acgs=[ip_acg.id for ip_acg in ip_acgs],
+            )
+            for d in range(directories)
+        ],
+        ip_acgs=ip_acgs,
+    )
+
+
+def measure(fn: Callable, setup: Callable, repeat: int) -> list[float]:
+    """
+    Time a function, with a fresh argument from setup for every run.
+    Reports printed by the function are discarded.
+    """
+    timings = []
+    for _ in range(repeat):
+        arg = setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn(arg)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_scenario(rules: int, groups: int, directories: int, repeat: int) -> list:
+    """
+    Run all benchmarks for a single scenario.
+    """
+    settings_dict = get_settings(rules, groups)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings_path = os.path.join(tmp, "settings.yaml")
+        with open(settings_path, "w") as settings_file:
+            yaml.safe_dump(settings_dict, settings_file)
+        validation_utils.SETTINGS_FILE_PATH = settings_path
+
+        settings = parse_settings()
+        validated = copy.deepcopy(settings)
+        validated.work_instruction = val_work_instruction(validated)
+
+        def get_app_input(dryrun: bool = False, state: str = "current") -> AppInput:
+            return AppInput(
+                cli={
+                    "dryrun": dryrun,
+                    "ip_acg_ids_to_delete": [
+                        f"wsipg-{ip_acg['name']}" for ip_acg in settings_dict["ip_acgs"]
+                    ],
+                },
+                settings=copy.deepcopy(validated),
+                inventory=get_inventory(settings_dict, directories, state),
+            )
+
+        benchmarks = {
+            "parse_settings": (lambda _: parse_settings(), lambda: None),
+            "val_work_instruction": (
+                val_work_instruction,
+                lambda: copy.deepcopy(settings),
+            ),
+            "match_ip_acgs": (
+                lambda app_input: match_ip_acgs(
+                    app_input.inventory, app_input.settings.work_instruction
+                ),
+                get_app_input,
+            ),
+            "create_report": (
+                lambda inventory: (
+                    create_report(inventory.directories, "inventory", io.StringIO()),
+                    create_report(inventory.ip_acgs, "inventory", io.StringIO()),
+                ),
+                lambda: get_inventory(settings_dict, directories),
+            ),
+            "route_create": (create, lambda: get_app_input(state="absent")),
+            "route_update": (update, lambda: get_app_input(state="stale")),
+            "route_delete": (delete, get_app_input),
+        }
+
+        results = []
+        for name, (fn, setup) in benchmarks.items():
+            timings = measure(fn, setup, repeat)
+            results.append(
+                {
+                    "scenario": f"rules={rules},groups={groups},directories={directories}",
+                    "benchmark": name,
+                    "runs": repeat,
+                    "min_s": min(timings),
+                    "median_s": statistics.median(timings),
+                }
+            )
+
+    return results
+
+
+def compare(results: list, baseline: list, threshold: float) -> list:
+    """
+    Compare median timings against a baseline.
+
+    :return: rows of (scenario, benchmark, baseline, current, ratio, flag)
+    """
+    baseline_map = {(r["scenario"], r["benchmark"]): r for r in baseline}
+    rows = []
+    for result in results:
+        base = baseline_map.get((result["scenario"], result["benchmark"]))
+        if not base:
+            continue
+        ratio = result["median_s"] / base["median_s"] if base["median_s"] else 1.0
+        flag = "SLOWER" if ratio > 1 + threshold else ""
+        rows.append(
+            (
+                result["scenario"],
+                result["benchmark"],
+                f"{base['median_s'] * 1000:.2f}",
+                f"{result['median_s'] * 1000:.2f}",
+                f"{ratio:.2f}",
+                flag,
+            )
+        )
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark")
+    parser.add_argument(
+        "--max-rules", type=int, default=100_000, help="skip larger scenarios"
+    )
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="relative slowdown of the median to flag, e.g. 0.25 for 25%%",
+    )
+    args = parser.parse_args()
+
+    logging.getLogger("acgenius").setLevel(logging.WARNING)
+    fake = FakeWorkSpaces()
+    config.set_workspaces(fake)
+
+    results = []
+    for rules, groups, directories in SCENARIOS:
+        if rules <= args.max_rules:
+            results.extend(run_scenario(rules, groups, directories, args.repeat))
+
+    print(
+        format_table(
+            [
+                (r["scenario"], r["benchmark"], f"{r['median_s'] * 1000:.2f}")
+                for r in results
+            ],
+            ("scenario", "benchmark", "median [ms]"),
+            "psql",
+        )
+    )
+
+    if args.out:
+        with open(args.out, "w") as out_file:
+            json.dump(
+                {
+                    "meta": {
+                        "timestamp": datetime.now().isoformat(),
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "repeat": args.repeat,
+                    },
+                    "results": results,
+                },
+                out_file,
+                indent=4,
+            )
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        rows = compare(results, baseline, args.threshold)
+        print(
+            format_table(
+                rows,
+                ("scenario", "benchmark", "baseline [ms]", "current [ms]", "ratio", ""),
+                "psql",
+            )
+        )
+        if any(row[-1] for row in rows):
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
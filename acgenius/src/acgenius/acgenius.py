@@ -1,14 +1,46 @@
+from datetime import datetime
+
 import click
 
-from acgenius.config import HR, click_help, setup_logger
+from acgenius.config import (
+    HR,
+    STD_INSTR_README,
+    click_help,
+    get_workspaces,
+    set_workspaces,
+    setup_logger,
+)
 from acgenius.resources.models import AppInput
+from acgenius.resources.output import OUTPUT_FORMATS, close_output, set_output
+from acgenius.resources.store import store
+from acgenius.routing.errors import process_error
+from acgenius.routing.journal import journal
 from acgenius.routing.routes import run_common_route, run_selected_route
+from acgenius.routing.watch import POLL_INTERVAL_DEFAULT, REFRESH_INTERVAL_DEFAULT
+from acgenius.telemetry.metrics import format_summary, metrics, write_summary
+from acgenius.telemetry.profiling import MemoryProfiler, start_profile, write_profile
+from acgenius.telemetry.tracing import tracer, write_trace
 
 
 @click.command()
 @click.argument(
     "action",
-    type=click.Choice(["status", "create", "update", "delete"], case_sensitive=False),
+    type=click.Choice(
+        [
+            "status",
+            "create",
+            "update",
+            "rotate",
+            "sync",
+            "delete",
+            "watch",
+            "drift",
+            "lookup",
+            "audit",
+            "impact",
+        ],
+        case_sensitive=False,
+    ),
 )
 @click.argument(
     "ip_acg_ids_to_delete",
@@ -16,18 +48,206 @@ from acgenius.routing.routes import run_common_route, run_selected_route
     required=False,
 )
 @click.option("--dryrun", is_flag=True, default=False, help=click_help["dryrun"])
+@click.option("--prune", is_flag=True, default=False, help=click_help["prune"])
 @click.option("--debug", is_flag=True, default=False, help=click_help["debug"])
-def main(action: str, ip_acg_ids_to_delete: tuple, dryrun: bool, debug: bool) -> None:
+@click.option(
+    "--output",
+    type=click.Choice(OUTPUT_FORMATS, case_sensitive=False),
+    default="table",
+    help=click_help["output"],
+)
+@click.option(
+    "--poll-interval",
+    type=click.FloatRange(min=0.1),
+    default=POLL_INTERVAL_DEFAULT,
+    help=click_help["poll_interval"],
+)
+@click.option(
+    "--refresh-interval",
+    type=click.FloatRange(min=1),
+    default=REFRESH_INTERVAL_DEFAULT,
+    help=click_help["refresh_interval"],
+)
+@click.option(
+    "--drift-file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help=click_help["drift_file"],
+)
+@click.option(
+    "--address",
+    "addresses",
+    multiple=True,
+    help=click_help["address"],
+)
+@click.option(
+    "--address-file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=click_help["address_file"],
+)
+@click.option(
+    "--log-file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=click_help["log_file"],
+)
+@click.option("--log-column", default=None, help=click_help["log_column"])
+@click.option(
+    "--journal",
+    "journal_file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help=click_help["journal"],
+)
+@click.option(
+    "--resume",
+    type=click.Path(exists=True, dir_okay=False, writable=True),
+    default=None,
+    help=click_help["resume"],
+)
+@click.option(
+    "--store",
+    "store_file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help=click_help["store"],
+)
+@click.option("--since", type=click.DateTime(), default=None, help=click_help["since"])
+@click.option(
+    "--latency-profile",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help=click_help["latency_profile"],
+)
+@click.option("--stats", is_flag=True, default=False, help=click_help["stats"])
+@click.option(
+    "--stats-file",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help=click_help["stats_file"],
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help=click_help["trace"],
+)
+@click.option(
+    "--profile",
+    type=click.Path(dir_okay=False, writable=True),
+    default=None,
+    help=click_help["profile"],
+)
+@click.option(
+    "--memprofile", is_flag=True, default=False, help=click_help["memprofile"]
+)
+def main(
+    action: str,
+    ip_acg_ids_to_delete: tuple,
+    dryrun: bool,
+    prune: bool,
+    debug: bool,
+    output: str,
+    poll_interval: float,
+    refresh_interval: float,
+    drift_file: str,
+    addresses: tuple,
+    address_file: str,
+    log_file: str,
+    log_column: str,
+    journal_file: str,
+    resume: str,
+    store_file: str,
+    since: datetime,
+    latency_profile: str,
+    stats: bool,
+    stats_file: str,
+    trace: str,
+    profile: str,
+    memprofile: bool,
+) -> None:
     """
     Integrate app.
 
-    :param action: action requested: status|create|update|delete
+    :param action: action requested:
+        status|create|update|rotate|sync|delete|watch|drift|lookup|audit|impact
     :param ip_acg_ids_to_delete: list of IP ACG IDs to delete.
     :param dryrun: dry run mode enabled.
+    :param prune: delete IP ACGs absent in settings.yaml, in sync mode.
     :param debug: debug mode enabled.
+    :param output: output format: table|json|ndjson|csv
+    :param poll_interval: seconds between checks of settings.yaml, in watch mode.
+    :param refresh_interval: seconds between inventory refreshes, in watch mode,
+        and between polls, in drift mode.
+    :param drift_file: path to append drift records to, in drift mode.
+    :param addresses: IPv4 addresses to look up, in lookup mode,
+        or known clients, in impact mode.
+    :param address_file: path of a file with IPv4 addresses, in lookup and
+        impact mode.
+    :param log_file: path of the log to audit, in audit mode.
+    :param log_column: column of the source address in a CSV log, in audit mode.
+    :param journal_file: path to journal the operations applied in AWS to.
+    :param resume: path of the journal of an earlier run to continue from.
+    :param store_file: path of the SQLite file to store the inventory in.
+    :param since: time to report changes since, in status mode.
+    :param latency_profile: path of the stats of an earlier run, for the latency
+        per operation in the estimate of a dry run.
+    :param stats: show a summary of the AWS calls at the end of the run.
+    :param stats_file: path to write the summary of the AWS calls to as JSON.
+    :param trace: path to write the Chrome trace of the run to.
+    :param profile: path to write the cProfile stats of the run to.
+    :param memprofile: show peak memory and top allocation sites per phase.
     """
+    ctx = click.get_current_context()
+    if profile:
+        profiler = start_profile()
+        ctx.call_on_close(lambda: write_profile(profiler, profile))
+    if memprofile:
+        memory_profiler = MemoryProfiler()
+        memory_profiler.start()
+        ctx.call_on_close(lambda: report_memory(memory_profiler))
+
     logger = setup_logger("acgenius", debug)
 
+    metrics.reset()
+    set_output(output)
+    ctx.call_on_close(close_output)
+    if stats or stats_file:
+        ctx.call_on_close(lambda: report_stats(stats, stats_file))
+    if trace:
+        tracer.start()
+        ctx.call_on_close(lambda: write_trace(trace))
+    if resume and journal_file:
+        msg_generic = "Could not start the journal."
+        error_code = "JournalResumeConflictException"
+        error_map = {
+            "JournalResumeConflictException": {
+                "msg": "--resume appends to the journal it continues from; "
+                f"please specify either --journal or --resume. {STD_INSTR_README}",
+                "crash": True,
+            }
+        }
+        process_error(error_map, error_code, msg_generic)
+    if drift_file and output not in ("table", "ndjson"):
+        msg_generic = "Could not start the drift file."
+        error_code = "DriftFileOutputConflictException"
+        error_map = {
+            "DriftFileOutputConflictException": {
+                "msg": f"--drift-file appends NDJSON records; output [{output}] "
+                "cannot be appended to. Please specify --output ndjson, or omit "
+                f"--drift-file to stream [{output}] to stdout. {STD_INSTR_README}",
+                "crash": True,
+            }
+        }
+        process_error(error_map, error_code, msg_generic)
+    if resume or journal_file:
+        journal.start(resume or journal_file, resume=bool(resume))
+        ctx.call_on_close(journal.stop)
+    if store_file:
+        store.start(store_file)
+        ctx.call_on_close(store.stop)
+
     logger.info(HR)
     logger.info("START APP: ACGENIUS...")
     logger.info(HR)
@@ -36,14 +256,27 @@ def main(action: str, ip_acg_ids_to_delete: tuple, dryrun: bool, debug: bool) ->
     logger.info(f"Delete list of IP ACGs: [{ip_acg_ids_to_delete}]", extra={"depth": 1})
     logger.info(f"Dry run mode enabled:   [{dryrun}]", extra={"depth": 1})
     logger.info(f"Debug mode enabled:     [{debug}]", extra={"depth": 1})
+    logger.info(f"Output format:          [{output}]", extra={"depth": 1})
 
+    client = get_workspaces()
+    ctx.call_on_close(lambda: set_workspaces(client))
     settings, inventory = run_common_route()
 
     app_input = AppInput(
         cli={
             "action": action,
             "dryrun": dryrun,
+            "prune": prune,
             "ip_acg_ids_to_delete": ip_acg_ids_to_delete,
+            "poll_interval": poll_interval,
+            "refresh_interval": refresh_interval,
+            "drift_file": drift_file,
+            "addresses": addresses,
+            "address_file": address_file,
+            "log_file": log_file,
+            "log_column": log_column,
+            "latency_profile": latency_profile,
+            "since": since,
         },
         settings=settings,
         inventory=inventory,
@@ -56,5 +289,30 @@ def main(action: str, ip_acg_ids_to_delete: tuple, dryrun: bool, debug: bool) ->
     logger.info(HR)
 
 
+def report_stats(stats: bool, stats_file: str) -> None:
+    """
+    Report the summary of the AWS calls made during the run.
+    The table goes to stderr, to keep stdout for reports and records.
+
+    :param stats: show the summary as a table.
+    :param stats_file: path to write the summary to as JSON, if any.
+    """
+    summary = metrics.summary()
+    if stats:
+        click.echo(format_summary(summary), err=True)
+    if stats_file:
+        write_summary(summary, stats_file)
+
+
+def report_memory(memory_profiler: MemoryProfiler) -> None:
+    """
+    Stop the memory profiler and show its report on stderr.
+
+    :param memory_profiler: running memory profiler
+    """
+    memory_profiler.stop()
+    click.echo(memory_profiler.format_report(), err=True)
+
+
 if __name__ == "__main__":
     main()
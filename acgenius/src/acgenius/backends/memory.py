@@ -0,0 +1,357 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from acgenius.resources.models import Validation
+
+logger = logging.getLogger("acgenius")
+
+# AWS limits, used when no validation baseline from settings.yaml is given.
+DEFAULT_VALIDATION = Validation(
+    invalid_rules=[],
+    rules_amt_max=10,
+    rules_desc_length_max=255,
+    prefix_default=32,
+    prefix_min=27,
+    ip_acg_name_length_max=50,
+    groups_per_directory_amt_max=25,
+)
+
+PAGE_SIZE = 25
+
+
+class InMemoryWorkSpaces:
+    """
+    Local stand-in for the AWS WorkSpaces client, for the operations acgenius uses.
+
+    State is kept in memory. AWS limits are enforced from the validation baseline
+    (`user_input_validation` in settings.yaml), and describe calls are paginated.
+    Latency, random errors and throttling can be injected to load test
+    concurrency and retry behaviour offline. With a fixed seed and an injected
+    clock, error and throttling sequences are reproducible.
+
+    Plug it in with `config.set_workspaces(InMemoryWorkSpaces(...))`.
+    """
+
+    def __init__(
+        self,
+        validation: Optional[Validation] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_code: str = "ServiceUnavailable",
+        throttle_limit: Optional[int] = None,
+        throttle_window: float = 1.0,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        :param validation: validation baseline with the AWS limits to enforce
+        :param latency: base latency per call, in seconds
+        :param jitter: maximum random latency added per call, in seconds
+        :param error_rate: probability of a call failing with `error_code`
+        :param error_code: error code of injected errors
+        :param throttle_limit: maximum calls per throttle window, if any
+        :param throttle_window: length of the throttle window, in seconds
+        :param seed: seed for the random latency and error injection
+        :param clock: clock for throttling, in seconds
+        :param sleep: function to wait for the injected latency
+        """
+        self.validation = validation or DEFAULT_VALIDATION
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_code = error_code
+        self.throttle_limit = throttle_limit
+        self.throttle_window = throttle_window
+        self.clock = clock
+        self.sleep = sleep
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = deque()
+        self.call_counts: dict[str, int] = {}
+
+        self.ip_groups: dict[str, dict] = {}
+        self.directories: dict[str, dict] = {}
+        self.tags: dict[str, dict] = {}
+        self.next_id = 0
+
+    # ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+    # Seeding and fault injection
+
+    def add_directory(
+        self,
+        directory_id: str,
+        name: str,
+        directory_type: str = "SIMPLE_AD",
+        state: str = "REGISTERED",
+    ) -> None:
+        """
+        Add a registered WorkSpaces directory.
+
+        :param directory_id: directory id, e.g. 'd-1234567890'
+        :param name: directory name
+        :param directory_type: directory type
+        :param state: directory state
+        """
+        self.directories[directory_id] = {
+            "DirectoryId": directory_id,
+            "DirectoryName": name,
+            "DirectoryType": directory_type,
+            "State": state,
+            "ipGroupIds": [],
+        }
+
+    def _error(self, operation: str, code: str, msg: str = "") -> Exception:
+        from botocore.exceptions import ClientError
+
+        return ClientError(
+            {
+                "Error": {"Code": code, "Message": msg or code},
+                "ResponseMetadata": {"HTTPStatusCode": 400, "RetryAttempts": 0},
+            },
+            operation,
+        )
+
+    def _call(self, operation: str) -> None:
+        """
+        Register a call: apply injected latency, throttling and errors.
+        """
+        with self.lock:
+            self.call_counts[operation] = self.call_counts.get(operation, 0) + 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            failing = self.random.random() < self.error_rate
+
+            throttled = False
+            if self.throttle_limit is not None:
+                now = self.clock()
+                while self.calls and self.calls[0] <= now - self.throttle_window:
+                    self.calls.popleft()
+                throttled = len(self.calls) >= self.throttle_limit
+                if not throttled:
+                    self.calls.append(now)
+
+        if delay:
+            self.sleep(delay)
+        if throttled:
+            raise self._error(operation, "ThrottlingException", "Rate exceeded")
+        if failing:
+            raise self._error(operation, self.error_code)
+
+    @staticmethod
+    def _ok(**response) -> dict:
+        return {
+            **response,
+            "ResponseMetadata": {"HTTPStatusCode": 200, "RetryAttempts": 0},
+        }
+
+    @staticmethod
+    def _normalize(rules: list) -> list:
+        """
+        Append the /32 prefix to single IP addresses, as AWS does.
+        """
+        return [
+            {
+                **rule,
+                "ipRule": rule["ipRule"]
+                if "/" in rule["ipRule"]
+                else f"{rule['ipRule']}/32",
+            }
+            for rule in rules
+        ]
+
+    @staticmethod
+    def _page(items: list, token: Optional[str], size: Optional[int]) -> tuple:
+        start = int(token or 0)
+        end = start + (size or PAGE_SIZE)
+        return items[start:end], (str(end) if end < len(items) else None)
+
+    def _get_group(self, operation: str, group_id: str) -> dict:
+        if group_id not in self.ip_groups:
+            raise self._error(operation, "ResourceNotFoundException", group_id)
+        return self.ip_groups[group_id]
+
+    def _get_directory(self, operation: str, directory_id: str) -> dict:
+        if directory_id not in self.directories:
+            raise self._error(operation, "ResourceNotFoundException", directory_id)
+        return self.directories[directory_id]
+
+    def _check_rules(self, operation: str, rules: list) -> None:
+        if len(rules) > self.validation.rules_amt_max:
+            raise self._error(operation, "ResourceLimitExceededException")
+        for rule in rules:
+            if len(rule.get("ruleDesc", "")) > self.validation.rules_desc_length_max:
+                raise self._error(operation, "InvalidParameterValuesException")
+
+    # ''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''''
+    # WorkSpaces operations
+
+    def describe_ip_groups(
+        self,
+        GroupIds: Optional[list] = None,
+        NextToken: Optional[str] = None,
+        MaxResults: Optional[int] = None,
+    ) -> dict:
+        self._call("DescribeIpGroups")
+        with self.lock:
+            groups = [
+                {**group, "userRules": list(group["userRules"])}
+                for group_id, group in self.ip_groups.items()
+                if not GroupIds or group_id in GroupIds
+            ]
+        page, token = self._page(groups, NextToken, MaxResults)
+        response = {"Result": page}
+        if token:
+            response["NextToken"] = token
+        return self._ok(**response)
+
+    def describe_workspace_directories(
+        self,
+        DirectoryIds: Optional[list] = None,
+        NextToken: Optional[str] = None,
+        Limit: Optional[int] = None,
+    ) -> dict:
+        self._call("DescribeWorkspaceDirectories")
+        with self.lock:
+            directories = [
+                {**directory, "ipGroupIds": list(directory["ipGroupIds"])}
+                for directory_id, directory in self.directories.items()
+                if not DirectoryIds or directory_id in DirectoryIds
+            ]
+        page, token = self._page(directories, NextToken, Limit)
+        response = {"Directories": page}
+        if token:
+            response["NextToken"] = token
+        return self._ok(**response)
+
+    def create_ip_group(
+        self,
+        GroupName: str,
+        GroupDesc: str = "",
+        UserRules: Optional[list] = None,
+        Tags: Optional[list] = None,
+    ) -> dict:
+        operation = "CreateIpGroup"
+        self._call(operation)
+        rules = self._normalize(UserRules or [])
+        if not GroupName or len(GroupName) > self.validation.ip_acg_name_length_max:
+            raise self._error(operation, "InvalidParameterValuesException")
+        self._check_rules(operation, rules)
+
+        with self.lock:
+            if any(g["groupName"] == GroupName for g in self.ip_groups.values()):
+                raise self._error(operation, "ResourceAlreadyExistsException")
+            self.next_id += 1
+            group_id = f"wsipg-{self.next_id:09d}"
+            self.ip_groups[group_id] = {
+                "groupId": group_id,
+                "groupName": GroupName,
+                "groupDesc": GroupDesc,
+                "userRules": rules,
+            }
+            self.tags[group_id] = {tag["Key"]: tag["Value"] for tag in Tags or []}
+
+        return self._ok(GroupId=group_id)
+
+    def delete_ip_group(self, GroupId: str) -> dict:
+        operation = "DeleteIpGroup"
+        self._call(operation)
+        with self.lock:
+            self._get_group(operation, GroupId)
+            if any(GroupId in d["ipGroupIds"] for d in self.directories.values()):
+                raise self._error(operation, "ResourceAssociatedException")
+            del self.ip_groups[GroupId]
+            self.tags.pop(GroupId, None)
+        return self._ok()
+
+    def associate_ip_groups(self, DirectoryId: str, GroupIds: list) -> dict:
+        operation = "AssociateIpGroups"
+        self._call(operation)
+        with self.lock:
+            directory = self._get_directory(operation, DirectoryId)
+            for group_id in GroupIds:
+                self._get_group(operation, group_id)
+            associated = directory["ipGroupIds"]
+            new = [group_id for group_id in GroupIds if group_id not in associated]
+            if (
+                len(associated) + len(new)
+                > self.validation.groups_per_directory_amt_max
+            ):
+                raise self._error(operation, "ResourceLimitExceededException")
+            associated.extend(new)
+        return self._ok()
+
+    def disassociate_ip_groups(self, DirectoryId: str, GroupIds: list) -> dict:
+        operation = "DisassociateIpGroups"
+        self._call(operation)
+        with self.lock:
+            directory = self._get_directory(operation, DirectoryId)
+            directory["ipGroupIds"] = [
+                group_id
+                for group_id in directory["ipGroupIds"]
+                if group_id not in GroupIds
+            ]
+        return self._ok()
+
+    def update_rules_of_ip_group(self, GroupId: str, UserRules: list) -> dict:
+        operation = "UpdateRulesOfIpGroup"
+        self._call(operation)
+        self._check_rules(operation, UserRules)
+        with self.lock:
+            self._get_group(operation, GroupId)["userRules"] = self._normalize(
+                UserRules
+            )
+        return self._ok()
+
+    def authorize_ip_rules(self, GroupId: str, UserRules: list) -> dict:
+        operation = "AuthorizeIpRules"
+        self._call(operation)
+        with self.lock:
+            group = self._get_group(operation, GroupId)
+            rules = self._normalize(UserRules)
+            current = {rule["ipRule"] for rule in group["userRules"]}
+            if any(rule["ipRule"] in current for rule in rules):
+                raise self._error(operation, "InvalidParameterValuesException")
+            self._check_rules(operation, group["userRules"] + rules)
+            group["userRules"].extend(rules)
+        return self._ok()
+
+    def revoke_ip_rules(self, GroupId: str, UserRules: list) -> dict:
+        operation = "RevokeIpRules"
+        self._call(operation)
+        with self.lock:
+            group = self._get_group(operation, GroupId)
+            group["userRules"] = [
+                rule for rule in group["userRules"] if rule["ipRule"] not in UserRules
+            ]
+        return self._ok()
+
+    def create_tags(self, ResourceId: str, Tags: list) -> dict:
+        operation = "CreateTags"
+        self._call(operation)
+        with self.lock:
+            self._get_group(operation, ResourceId)
+            self.tags[ResourceId].update({tag["Key"]: tag["Value"] for tag in Tags})
+        return self._ok()
+
+    def delete_tags(self, ResourceId: str, TagKeys: list) -> dict:
+        operation = "DeleteTags"
+        self._call(operation)
+        with self.lock:
+            self._get_group(operation, ResourceId)
+            for key in TagKeys:
+                self.tags[ResourceId].pop(key, None)
+        return self._ok()
+
+    def describe_tags(self, ResourceId: str) -> dict:
+        operation = "DescribeTags"
+        self._call(operation)
+        with self.lock:
+            self._get_group(operation, ResourceId)
+            tags = [{"Key": k, "Value": v} for k, v in self.tags[ResourceId].items()]
+        return self._ok(TagList=tags)
@@ -1,8 +1,12 @@
-import boto3
+import json
 import logging
 import os
+import threading
+from dataclasses import asdict, is_dataclass
 from pathlib import Path
+from typing import Any
 
+from acgenius.telemetry.metrics import instrument
 
 SETTINGS_FILE = "settings.yaml"
 SETTINGS_FILE_PATH = os.path.join(Path().resolve().parent, SETTINGS_FILE)
@@ -40,7 +44,12 @@ EXIT_APP = "❌ Cannot continue. Exit app."
 
 HR = "┉" * 88
 
-workspaces = boto3.client("workspaces", region_name="eu-west-1")
+DEBUG_PAYLOAD_MAX_CHARS = 4000
+
+REGION = "eu-west-1"
+
+_workspaces = None
+_workspaces_lock = threading.Lock()
 
 click_help = {
     "dryrun": (
@@ -48,12 +57,178 @@ click_help = {
         "This only shows the plan or inventory, "
         "and does not actually apply anything in AWS."
     ),
+    "prune": (
+        "In 'sync' mode: also disassociate and delete IP ACGs in AWS "
+        "that are not in settings.yaml."
+    ),
     "debug": (
         "Enable debug mode? This will show more detailed information in the logs."
     ),
+    "output": (
+        "Output format of reports and results. "
+        "'table' prints human readable tables; "
+        "'json', 'ndjson' and 'csv' stream records to stdout, "
+        "while logs go to stderr."
+    ),
+    "stats": (
+        "Show a summary of the AWS calls at the end of the run: "
+        "calls per operation, p50/p95/max latency and total wall time."
+    ),
+    "stats_file": "Write the summary of the AWS calls as JSON to this file.",
+    "trace": (
+        "Write timing spans of the run (phases and AWS calls) "
+        "as Chrome trace event JSON to this file, "
+        "to open in chrome://tracing or Perfetto."
+    ),
+    "poll_interval": "In 'watch' mode: seconds between checks of settings.yaml.",
+    "refresh_interval": (
+        "In 'watch' mode and in the server: seconds between refreshes of the inventory. "
+        "In 'drift' mode: seconds between polls of the inventory."
+    ),
+    "journal": (
+        "Journal each operation applied in AWS, before and after its call, "
+        "to this JSON lines file."
+    ),
+    "resume": (
+        "Continue from the journal of an earlier, failed run: operations completed "
+        "in it are skipped. The journal is appended to. "
+        "Cannot be combined with --journal."
+    ),
+    "latency_profile": (
+        "With --dryrun: estimate the duration with the latency per operation "
+        "of an earlier run, from a file written with --stats-file."
+    ),
+    "drift_file": (
+        "In 'drift' mode: append drift records as NDJSON to this file "
+        "(default: stdout, in the --output format)."
+    ),
+    "store": (
+        "Write each fetch of the inventory as a new generation "
+        "to this SQLite file. 'status' then reports wide rules and changes."
+    ),
+    "since": (
+        "In 'status' mode, with --store: report changes since this time "
+        "(default: since the previous fetch)."
+    ),
+    "address": (
+        "In 'lookup' mode: IPv4 address to look up; repeat for more addresses. "
+        "In 'impact' mode: known client address."
+    ),
+    "address_file": (
+        "In 'lookup' mode: file with IPv4 addresses to look up, one per line. "
+        "In 'impact' mode: file with known client addresses, e.g. recent sources."
+    ),
+    "log_file": (
+        "In 'audit' mode: connection or access log to audit, as CSV with a header "
+        "or one address per line; gzipped or not."
+    ),
+    "log_column": (
+        "In 'audit' mode: column of the source address in a CSV log "
+        "(default: the first of source_ip, src_ip, client_ip, src, source, ip)."
+    ),
+    "host": "Host to bind the server to.",
+    "port": "Port to bind the server to.",
+    "profile": (
+        "Profile the run with cProfile: write the stats to this pstats file, "
+        "and show the functions with most cumulative time."
+    ),
+    "memprofile": (
+        "Show peak memory and top allocation sites per phase "
+        "(inventory, settings parse, validation, report), using tracemalloc."
+    ),
 }
 
 
+def get_workspaces() -> Any:
+    """
+    Get the AWS WorkSpaces client, creating it at first use.
+
+    boto3 (and botocore's service models) are only imported here,
+    so runs and imports that never call AWS do not pay for loading them.
+
+    :return: WorkSpaces client
+    """
+    global _workspaces
+
+    if _workspaces is None:
+        with _workspaces_lock:
+            if _workspaces is None:
+                import boto3
+
+                _workspaces = boto3.client("workspaces", region_name=REGION)
+
+    return _workspaces
+
+
+def set_workspaces(client: Any) -> None:
+    """
+    Set the client used for all AWS WorkSpaces calls, e.g. a local stand-in.
+
+    :param client: object implementing the WorkSpaces client operations used
+    """
+    global _workspaces
+
+    with _workspaces_lock:
+        _workspaces = client
+
+
+class LazyWorkSpaces:
+    """
+    Stand in for the AWS WorkSpaces client until it is actually used.
+
+    Attribute access (e.g. `workspaces.describe_ip_groups`) is delegated
+    to the client returned by `get_workspaces`. Client methods are instrumented,
+    so the latency, outcome and retries of each call are recorded, unless the
+    client instruments its calls itself (`instruments_calls`).
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        client = get_workspaces()
+        attr = getattr(client, name)
+        if callable(attr) and not getattr(type(client), "instruments_calls", False):
+            return instrument(name, attr)
+        return attr
+
+
+workspaces = LazyWorkSpaces()
+
+
+class LazyJSON:
+    """
+    Defer JSON serialization of a log payload until a record is actually emitted.
+
+    Pass an instance as a %-style logging argument, e.g.
+    `logger.debug("Response: %s", LazyJSON(response))`.
+    When the debug level is disabled, the logger drops the record
+    without ever calling `__str__`, so no JSON is produced.
+    Rendered payloads are capped at `max_chars` characters.
+    """
+
+    __slots__ = ("payload", "max_chars")
+
+    def __init__(self, payload: Any, max_chars: int = DEBUG_PAYLOAD_MAX_CHARS) -> None:
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        """
+        Render the payload as indented JSON, truncated to the maximum length.
+
+        :return: rendered payload
+        """
+        payload = self.payload
+        if is_dataclass(payload) and not isinstance(payload, type):
+            payload = asdict(payload)
+
+        rendered = json.dumps(payload, indent=4, default=str)
+
+        if len(rendered) > self.max_chars:
+            omitted = len(rendered) - self.max_chars
+            rendered = f"{rendered[: self.max_chars]}... [{omitted} chars truncated]"
+
+        return rendered
+
+
 class DepthFormatter(logging.Formatter):
     """
     Format log messages with pipe-based indentation based on depth.
@@ -1,35 +1,44 @@
-from botocore.exceptions import ClientError
-import json
 import logging
 from typing import Optional
 
-from acgenius.config import EXC_INVALID_PARAM, workspaces
+from acgenius.config import EXC_INVALID_PARAM, LazyJSON, workspaces
 from acgenius.resources.models import Directory
 from acgenius.resources.utils import create_report
 from acgenius.routing.errors import get_error_code, process_error
+from acgenius.telemetry.tracing import traced
 
 logger = logging.getLogger("acgenius")
 
 
-def get_directories() -> Optional[list[dict]]:
+@traced("fetch_directories")
+def get_directories(directory_ids: Optional[list[str]] = None) -> Optional[list[dict]]:
     """
-    Get directories from AWS WorkSpaces.
+    Get directories from AWS WorkSpaces, following all pages.
 
+    :param directory_ids: ids of the directories to get (default: all; max 25)
     :return: list of directories, if any
     """
     logger.debug("Call [describe_workspace_directories]...", extra={"depth": 2})
 
     try:
-        response = workspaces.describe_workspace_directories()
-        logger.debug(
-            "Response of [describe_workspace_directories]: "
-            f"{json.dumps(response, indent=4)}",
-            extra={"depth": 2},
-        )
-        if response["Directories"]:
-            return response["Directories"]
-
-    except (ClientError, Exception) as e:
+        directories = []
+        kwargs = {"DirectoryIds": directory_ids} if directory_ids else {}
+        while True:
+            response = workspaces.describe_workspace_directories(**kwargs)
+            logger.debug(
+                "Response of [describe_workspace_directories]: %s",
+                LazyJSON(response),
+                extra={"depth": 2},
+            )
+            directories.extend(response.get("Directories") or [])
+            if not response.get("NextToken"):
+                break
+            kwargs["NextToken"] = response["NextToken"]
+
+        if directories:
+            return directories
+
+    except Exception as e:
         msg_generic = "Could not get directories from AWS."
         error_map = {
             "InvalidParameterValuesException": {"msg": EXC_INVALID_PARAM, "crash": True}
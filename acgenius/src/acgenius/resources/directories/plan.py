@@ -0,0 +1,143 @@
+import logging
+
+from acgenius.resources.models import IP_ACG, Directory, Inventory, WorkInstruction
+from acgenius.telemetry.tracing import traced
+from acgenius.validation.directories import val_directories_specified
+
+logger = logging.getLogger("acgenius")
+
+
+def get_target_directories(
+    work_instruction: WorkInstruction, inventory: Inventory
+) -> list[Directory]:
+    """
+    Get the directories to associate the IP ACGs of the work instruction with,
+    unless an IP ACG lists its own: the directories specified,
+    or else all directories.
+
+    :param work_instruction: validated work instruction
+    :param inventory: Inventory object
+    :return: directories
+    """
+    if val_directories_specified(work_instruction):
+        return work_instruction.directories
+    return inventory.directories or []
+
+
+def get_ip_acg_directories(
+    ip_acg: IP_ACG, work_instruction: WorkInstruction, inventory: Inventory
+) -> list[Directory]:
+    """
+    Get the directories an IP ACG of the work instruction should be associated with:
+    the directories it lists, as found in the inventory, or else the target
+    directories of the work instruction.
+
+    :param ip_acg: IP ACG of the work instruction
+    :param work_instruction: validated work instruction
+    :param inventory: Inventory object
+    :return: directories
+    """
+    if not ip_acg.directories:
+        return get_target_directories(work_instruction, inventory)
+
+    index = {directory.id: directory for directory in inventory.directories or []}
+    unknown = [
+        directory_id for directory_id in ip_acg.directories if directory_id not in index
+    ]
+    if unknown:
+        logger.warning(
+            f"⚠️  Directories {unknown} of IP ACG [{ip_acg.name}] not found in AWS; "
+            "skip these.",
+            extra={"depth": 2},
+        )
+    return [
+        index[directory_id]
+        for directory_id in ip_acg.directories
+        if directory_id in index
+    ]
+
+
+@traced("plan_associations")
+def plan_associations(
+    work_instruction: WorkInstruction, inventory: Inventory
+) -> list[tuple[Directory, list[IP_ACG]]]:
+    """
+    Plan the desired associations: per directory, the IP ACGs of the work
+    instruction to be associated with it. All directories in the inventory
+    are included, also those without any IP ACG desired.
+
+    :param work_instruction: validated work instruction
+    :param inventory: Inventory object
+    :return: directories, each with the IP ACGs desired
+    """
+    directories = {directory.id: directory for directory in inventory.directories or []}
+    desired = {directory_id: [] for directory_id in directories}
+
+    for ip_acg in work_instruction.ip_acgs:
+        for directory in get_ip_acg_directories(ip_acg, work_instruction, inventory):
+            directories.setdefault(directory.id, directory)
+            desired.setdefault(directory.id, []).append(ip_acg)
+
+    return [
+        (directories[directory_id], ip_acgs)
+        for directory_id, ip_acgs in desired.items()
+    ]
+
+
+def get_unassociated(
+    ip_acgs: list[IP_ACG], directory: Directory, inventory: Inventory
+) -> list[IP_ACG]:
+    """
+    Get the IP ACGs not yet associated with a directory, according to the inventory.
+
+    :param ip_acgs: IP ACGs to associate
+    :param directory: Directory
+    :param inventory: Inventory object
+    :return: IP ACGs to associate with the directory
+    """
+    associated = {
+        ip_acg_id
+        for inventory_directory in inventory.directories or []
+        if inventory_directory.id == directory.id
+        for ip_acg_id in inventory_directory.ip_acgs or []
+    }
+    return [ip_acg for ip_acg in ip_acgs if ip_acg.id not in associated]
+
+
+def diff_associations(
+    desired: list[tuple[Directory, list[IP_ACG]]],
+    inventory: Inventory,
+    managed_ids: set[str],
+) -> tuple[list[tuple[Directory, list[IP_ACG]]], list[tuple[Directory, list[str]]]]:
+    """
+    Compare the desired associations with the associations in the inventory.
+    Only managed IP ACGs are disassociated: IP ACGs of others are left alone.
+
+    :param desired: directories, each with the IP ACGs desired, from
+        `plan_associations`
+    :param inventory: Inventory object
+    :param managed_ids: ids of the IP ACGs in AWS managed by the work instruction
+    :return: directories, each with the IP ACGs to associate, and directories,
+        each with the ids of the IP ACGs to disassociate; only where changed
+    """
+    associated = {
+        directory.id: directory.ip_acgs or []
+        for directory in inventory.directories or []
+    }
+    to_associate, to_disassociate = [], []
+
+    for directory, ip_acgs in desired:
+        ip_acgs_unassociated = get_unassociated(ip_acgs, directory, inventory)
+        if ip_acgs_unassociated:
+            to_associate.append((directory, ip_acgs_unassociated))
+
+        desired_ids = {ip_acg.id for ip_acg in ip_acgs}
+        ip_acg_ids = [
+            ip_acg_id
+            for ip_acg_id in associated.get(directory.id, [])
+            if ip_acg_id in managed_ids and ip_acg_id not in desired_ids
+        ]
+        if ip_acg_ids:
+            to_disassociate.append((directory, ip_acg_ids))
+
+    return to_associate, to_disassociate
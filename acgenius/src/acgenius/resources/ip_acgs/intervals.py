@@ -0,0 +1,105 @@
+import bisect
+from typing import Iterable
+
+from acgenius.resources.models import IPV4_MAX, Network, Rule
+
+# Range of addresses, as first and last address (inclusive).
+Interval = tuple[int, int]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    """
+    Merge intervals into a sorted set of disjoint intervals;
+    overlapping and adjacent intervals are joined.
+
+    :param intervals: intervals, in any order
+    :return: sorted, disjoint intervals
+    """
+    merged = []
+    for first, last in sorted(intervals):
+        if merged and first <= merged[-1][1] + 1:
+            if last > merged[-1][1]:
+                merged[-1] = (merged[-1][0], last)
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def get_address_space(rules: Iterable[Rule]) -> list[Interval]:
+    """
+    Get the address space the rules admit, as interval set.
+
+    :param rules: rules, e.g. of an IP ACG
+    :return: sorted, disjoint intervals
+    """
+    return merge_intervals((rule.network.first, rule.network.last) for rule in rules)
+
+
+def subtract_intervals(a: list[Interval], b: list[Interval]) -> list[Interval]:
+    """
+    Subtract one interval set from another, in a single pass over both.
+
+    :param a: sorted, disjoint intervals
+    :param b: sorted, disjoint intervals to subtract
+    :return: sorted, disjoint intervals in a but not in b
+    """
+    result = []
+    j = 0
+    for first, last in a:
+        while j < len(b) and b[j][1] < first:
+            j += 1
+        k = j
+        while k < len(b) and b[k][0] <= last:
+            if b[k][0] > first:
+                result.append((first, b[k][0] - 1))
+            first = max(first, b[k][1] + 1)
+            k += 1
+        if first <= last:
+            result.append((first, last))
+    return result
+
+
+def count_interval_addresses(intervals: list[Interval]) -> int:
+    """
+    Count the addresses in an interval set.
+
+    :param intervals: disjoint intervals
+    :return: number of addresses
+    """
+    return sum(last - first + 1 for first, last in intervals)
+
+
+def to_networks(intervals: list[Interval]) -> list[Network]:
+    """
+    Split an interval set into the fewest networks (CIDR blocks) covering it.
+
+    :param intervals: sorted, disjoint intervals
+    :return: networks, in order
+    """
+    networks = []
+    for first, last in intervals:
+        while first <= last:
+            # Largest block aligned at first, that does not pass last
+            size = (first & -first) or IPV4_MAX + 1
+            while size > last - first + 1:
+                size >>= 1
+            networks.append(Network(address=first, prefix=32 - size.bit_length() + 1))
+            first += size
+    return networks
+
+
+def get_covered(intervals: list[Interval], values: Iterable[int]) -> list[int]:
+    """
+    Get the addresses covered by an interval set.
+
+    :param intervals: sorted, disjoint intervals
+    :param values: addresses, as integers
+    :return: addresses in any of the intervals, in the order given
+    """
+    firsts = [first for first, _ in intervals]
+    covered = []
+    for value in values:
+        position = bisect.bisect_right(firsts, value) - 1
+        if position >= 0 and value <= intervals[position][1]:
+            covered.append(value)
+    return covered
@@ -1,25 +1,25 @@
-import json
 import logging
 from typing import Optional
 
-from botocore.exceptions import ClientError
-
 from acgenius.config import (
     EXC_ACCESS_DENIED,
     EXC_INVALID_PARAM,
     STD_INSTR_README,
+    LazyJSON,
     workspaces,
 )
 from acgenius.resources.models import IP_ACG, Rule
 from acgenius.resources.utils import create_report
 from acgenius.routing.errors import get_error_code, process_error
+from acgenius.telemetry.tracing import traced
 
 logger = logging.getLogger("acgenius")
 
 
+@traced("fetch_ip_acgs")
 def get_ip_acgs() -> list[IP_ACG]:
     """
-    Retrieve IP Access Control Groups from AWS Workspaces.
+    Retrieve IP Access Control Groups from AWS Workspaces, following all pages.
     https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/workspaces/client/describe_ip_groups.html
 
     :return: List of IP_ACGs found in AWS
@@ -27,18 +27,27 @@ def get_ip_acgs() -> list[IP_ACG]:
     logger.debug("Call [describe_ip_groups]...", extra={"depth": 2})
 
     try:
-        response = workspaces.describe_ip_groups()
-
-        logger.debug(
-            f"Response of [describe_ip_groups]: {json.dumps(response, indent=4)}",
-            extra={"depth": 2},
-        )
-        if response.get("Result"):
-            return response["Result"]
+        ip_acgs = []
+        kwargs = {}
+        while True:
+            response = workspaces.describe_ip_groups(**kwargs)
+
+            logger.debug(
+                "Response of [describe_ip_groups]: %s",
+                LazyJSON(response),
+                extra={"depth": 2},
+            )
+            ip_acgs.extend(response.get("Result") or [])
+            if not response.get("NextToken"):
+                break
+            kwargs["NextToken"] = response["NextToken"]
+
+        if ip_acgs:
+            return ip_acgs
 
         logger.info("No IP ACGs found in AWS.", extra={"depth": 2})
 
-    except (ClientError, Exception) as e:
+    except Exception as e:
         msg_generic = "Could not get IP ACGs from AWS."
         error_map = {
             "InvalidParameterValuesException": {
@@ -0,0 +1,182 @@
+import bisect
+import logging
+import socket
+from typing import Any, Iterable, Optional, Sequence, Union
+
+from acgenius.resources.models import Inventory
+from acgenius.telemetry.tracing import traced
+
+logger = logging.getLogger("acgenius")
+
+# End of the IPv4 address space, as boundary of the last interval.
+IPV4_END = 1 << 32
+
+
+def get_numpy() -> Optional[Any]:
+    """
+    Get numpy, if installed (extra 'lookup'), for vectorized bulk lookups.
+    numpy is only imported here, so runs without lookups do not pay for it.
+
+    :return: numpy module, or None if not installed
+    """
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        return None
+
+
+def parse_address(address: str) -> Optional[int]:
+    """
+    Parse an IPv4 address in dotted-quad notation.
+
+    :param address: IPv4 address, e.g. '203.0.113.57'
+    :return: address as integer, or None if invalid
+    """
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, address.strip()))
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def format_address(value: int) -> str:
+    """
+    Format an address as dotted quad.
+
+    :param value: address, as integer
+    :return: address, e.g. '203.0.113.57'
+    """
+    return ".".join(str(value >> shift & 0xFF) for shift in (24, 16, 8, 0))
+
+
+class IPLookupIndex:
+    """
+    Index of the rules of the inventory, to look up which IP ACGs, and through
+    them which directories, admit an IPv4 address.
+
+    Rules may overlap (e.g. a /16 and a /32 within it), so the address space
+    is cut at the first address of each network and at the address after
+    its last: within each interval, the same rules apply. Intervals are kept
+    as a sorted array of their first addresses, with the rules per interval.
+    A lookup is a binary search: with numpy, vectorized for many addresses
+    at once (np.searchsorted); without, with bisect per address.
+    """
+
+    def __init__(self, inventory: Inventory) -> None:
+        self.rules: list[dict] = []
+        self.starts: list[int] = []
+        self.matches: list[tuple[int, ...]] = []
+        self._starts_array = None
+
+        directory_ids = {}
+        for directory in inventory.directories or []:
+            for ip_acg_id in directory.ip_acgs or []:
+                directory_ids.setdefault(ip_acg_id, []).append(directory.id)
+
+        events = {}
+        for ip_acg in inventory.ip_acgs or []:
+            for rule in ip_acg.rules or []:
+                network = rule.network
+                index = len(self.rules)
+                self.rules.append(
+                    {
+                        "id": ip_acg.id,
+                        "name": ip_acg.name,
+                        "rule": str(network),
+                        "rule_description": rule.desc,
+                        "directory_ids": directory_ids.get(ip_acg.id, []),
+                    }
+                )
+                events.setdefault(network.first, ([], []))[0].append(index)
+                events.setdefault(network.last + 1, ([], []))[1].append(index)
+
+        active = set()
+        for boundary in sorted(events.keys() | {0}):
+            if boundary >= IPV4_END:
+                break
+            starting, ending = events.get(boundary, ([], []))
+            active.difference_update(ending)
+            active.update(starting)
+            self.starts.append(boundary)
+            self.matches.append(tuple(sorted(active)))
+
+        logger.debug(
+            f"Indexed [{len(self.rules)}] rules in [{len(self.starts)}] intervals.",
+            extra={"depth": 2},
+        )
+
+    def search_array(self, values: Any) -> Any:
+        """
+        Find the interval of each address, vectorized with numpy.
+        Interval starts and addresses are packed as uint32.
+
+        :param values: addresses, as numpy array or sequence of integers
+        :return: index of the interval per address, as numpy array
+        """
+        np = get_numpy()
+        if self._starts_array is None:
+            self._starts_array = np.array(self.starts, dtype=np.uint32)
+        positions = np.searchsorted(
+            self._starts_array, np.asarray(values, dtype=np.uint32), side="right"
+        )
+        return positions - 1
+
+    def search(self, values: Sequence[int]) -> list[int]:
+        """
+        Find the interval of each address.
+
+        :param values: addresses, as integers
+        :return: index of the interval per address
+        """
+        if get_numpy() is None:
+            return [bisect.bisect_right(self.starts, value) - 1 for value in values]
+        return self.search_array(values).tolist()
+
+    def lookup(self, addresses: Union[str, Iterable[str]]) -> Union[list, list[list]]:
+        """
+        Look up the rules that admit one or many addresses.
+
+        :param addresses: IPv4 address, or iterable of IPv4 addresses
+        :return: for one address, its matching rules; for many, the matching
+            rules per address, in order. Each match has the IP ACG id and name,
+            the rule and its description, and the ids of the directories the
+            IP ACG is associated with. Invalid addresses match nothing.
+        """
+        if isinstance(addresses, str):
+            return self.lookup([addresses])[0]
+
+        values = [parse_address(address) for address in addresses]
+        valid = [value for value in values if value is not None]
+        intervals = iter(self.search(valid))
+
+        return [
+            [self.rules[index] for index in self.matches[next(intervals)]]
+            if value is not None
+            else []
+            for value in values
+        ]
+
+
+@traced("build_lookup_index")
+def build_lookup_index(inventory: Inventory) -> IPLookupIndex:
+    """
+    Build the lookup index over the rules of the inventory.
+
+    :param inventory: Inventory object
+    :return: IPLookupIndex object
+    """
+    return IPLookupIndex(inventory)
+
+
+def lookup_addresses(
+    addresses: Union[str, Iterable[str]], inventory: Inventory
+) -> Union[list, list[list]]:
+    """
+    Look up which IP ACGs and directories admit one or many addresses.
+
+    :param addresses: IPv4 address, or iterable of IPv4 addresses
+    :param inventory: Inventory object
+    :return: matching rules, see `IPLookupIndex.lookup`
+    """
+    return build_lookup_index(inventory).lookup(addresses)
@@ -0,0 +1,121 @@
+import logging
+from typing import Optional
+
+from acgenius.resources.ip_acgs.utils import index_latest, split_version
+from acgenius.resources.directories.plan import plan_associations
+from acgenius.resources.models import (
+    IP_ACG,
+    Directory,
+    Inventory,
+    Network,
+    Plan,
+    WorkInstruction,
+)
+from acgenius.telemetry.tracing import traced
+
+logger = logging.getLogger("acgenius")
+
+
+def get_rule_set(ip_acg: IP_ACG) -> frozenset[tuple[Network, str]]:
+    """
+    Get the rules of an IP ACG in canonical form, to compare regardless of order
+    and notation (e.g. '10.0.0.1' and '10.0.0.1/32').
+
+    :param ip_acg: IP ACG
+    :return: set of (network, description) pairs
+    """
+    return frozenset((rule.network, rule.desc) for rule in ip_acg.rules)
+
+
+@traced("plan_ip_acgs")
+def plan_ip_acgs(
+    inventory_ip_acgs: Optional[list[IP_ACG]], ip_acgs: list[IP_ACG]
+) -> Plan:
+    """
+    Plan the operations for IP ACGs of the work instruction, against the inventory.
+    IP ACGs are matched by name, through an index over the inventory;
+    matched IP ACGs get the id of their counterpart in AWS
+    (of a rotated IP ACG, the latest version).
+
+    :param inventory_ip_acgs: IP ACGs in AWS, if any
+    :param ip_acgs: IP ACGs of the work instruction
+    :return: Plan object
+    """
+    logger.debug("Plan operations for IP ACGs...", extra={"depth": 1})
+
+    index = index_latest(inventory_ip_acgs)
+    plan = Plan(create=[], update=[], unchanged=[])
+
+    for ip_acg in ip_acgs:
+        current = index.get(split_version(ip_acg.name)[0])
+        if current is None:
+            plan.create.append(ip_acg)
+            continue
+
+        ip_acg.id = current.id
+        if get_rule_set(ip_acg) == get_rule_set(current):
+            plan.unchanged.append(ip_acg)
+        else:
+            plan.update.append(ip_acg)
+
+    logger.debug(
+        "Planned: [%s] to create, [%s] to update, [%s] unchanged.",
+        len(plan.create),
+        len(plan.update),
+        len(plan.unchanged),
+        extra={"depth": 2},
+    )
+    return plan
+
+
+@traced("plan_inventory")
+def plan_inventory(
+    work_instruction: WorkInstruction, inventory: Inventory
+) -> Inventory:
+    """
+    Get the inventory as it would be once settings.yaml is applied:
+    IP ACGs of the work instruction replace their counterpart in AWS, new ones
+    are associated with their directories; other IP ACGs in AWS keep their
+    rules and associations. Planned IP ACGs not yet in AWS get a placeholder id.
+
+    :param work_instruction: validated work instruction
+    :param inventory: Inventory object
+    :return: Inventory object, of the planned state
+    """
+    plan = plan_ip_acgs(inventory.ip_acgs, work_instruction.ip_acgs)
+    planned = [
+        IP_ACG(
+            name=ip_acg.name,
+            desc=ip_acg.desc,
+            rules=ip_acg.rules,
+            id=ip_acg.id or f"planned:{ip_acg.name}",
+        )
+        for ip_acg in plan.create + plan.update + plan.unchanged
+    ]
+    planned_ids = {ip_acg.name: ip_acg.id for ip_acg in planned}
+    managed_ids = {ip_acg.id for ip_acg in plan.update + plan.unchanged}
+
+    desired = {
+        directory.id: [planned_ids[ip_acg.name] for ip_acg in ip_acgs]
+        for directory, ip_acgs in plan_associations(work_instruction, inventory)
+    }
+    directories = [
+        Directory(
+            id=directory.id,
+            name=directory.name,
+            ip_acgs=[
+                ip_acg_id
+                for ip_acg_id in directory.ip_acgs or []
+                if ip_acg_id not in managed_ids
+            ]
+            + desired.get(directory.id, []),
+        )
+        for directory in inventory.directories or []
+    ]
+    return Inventory(
+        directories=directories,
+        ip_acgs=[
+            ip_acg for ip_acg in inventory.ip_acgs or [] if ip_acg.id not in managed_ids
+        ]
+        + planned,
+    )
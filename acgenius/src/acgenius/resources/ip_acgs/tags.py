@@ -0,0 +1,238 @@
+import logging
+import threading
+from typing import Optional
+
+from acgenius.config import (
+    EXC_ACCESS_DENIED,
+    EXC_INVALID_PARAM,
+    EXC_RESOURCE_NOT_FOUND,
+    STD_INSTR_README,
+    LazyJSON,
+    workspaces,
+)
+from acgenius.resources.ip_acgs.utils import extend_tags
+from acgenius.resources.models import IP_ACG, Execution, Inventory
+from acgenius.routing.engine import run_concurrently
+from acgenius.routing.errors import get_error_code, process_error
+
+logger = logging.getLogger("acgenius")
+
+# Tags set once by acgenius or by AWS, never reconciled.
+IGNORED_TAG_KEYS = ("Created",)
+RESERVED_TAG_PREFIX = "aws:"
+# IP ACGs of which tags are fetched or applied at the same time, at least.
+TAG_CONCURRENCY = 8
+
+
+def is_ignored(key: str) -> bool:
+    """
+    See if a tag key is left out of reconciliation: the creation timestamp,
+    which differs on every run, and keys reserved by AWS, which cannot be changed.
+
+    :param key: tag key
+    :return: True if ignored, False otherwise
+    """
+    return key in IGNORED_TAG_KEYS or key.startswith(RESERVED_TAG_PREFIX)
+
+
+def get_tags(ip_acg_id: str) -> dict:
+    """
+    Retrieve the tags of an IP ACG from AWS WorkSpaces.
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/workspaces/client/describe_tags.html
+
+    :param ip_acg_id: IP ACG id
+    :return: tags, by key
+    """
+    logger.debug("Call [describe_tags] for [%s]...", ip_acg_id, extra={"depth": 2})
+
+    try:
+        response = workspaces.describe_tags(ResourceId=ip_acg_id)
+        logger.debug(
+            "Response of [describe_tags]: %s", LazyJSON(response), extra={"depth": 2}
+        )
+        return {tag["Key"]: tag.get("Value", "") for tag in response.get("TagList", [])}
+
+    except Exception as e:
+        msg_generic = f"Could not get tags of IP ACG [{ip_acg_id}] from AWS."
+        error_map = {
+            "InvalidParameterValuesException": {
+                "msg": EXC_INVALID_PARAM,
+                "crash": True,
+            },
+            "ResourceNotFoundException": {
+                "msg": f"{EXC_RESOURCE_NOT_FOUND} {STD_INSTR_README}",
+                "crash": True,
+            },
+            "AccessDeniedException": {
+                "msg": f"{EXC_ACCESS_DENIED} {STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+class TagCache:
+    """
+    Keep the tags of IP ACGs fetched from AWS, shared by all threads.
+
+    Tags are fetched once per IP ACG, and kept up to date with the tags
+    applied by acgenius, so a dry run followed by its estimate, or a
+    'watch' cycle, does not describe the same IP ACG again.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tags: dict[str, dict] = {}
+
+    def get(self, ip_acg_id: str) -> dict:
+        """
+        Get the tags of an IP ACG, from the cache or else from AWS.
+
+        :param ip_acg_id: IP ACG id
+        :return: tags, by key
+        """
+        with self.lock:
+            if ip_acg_id in self.tags:
+                return dict(self.tags[ip_acg_id])
+
+        tags = get_tags(ip_acg_id) or {}
+        with self.lock:
+            self.tags[ip_acg_id] = tags
+        return dict(tags)
+
+    def update(
+        self, ip_acg_id: str, tags: Optional[dict] = None, deleted: tuple = ()
+    ) -> None:
+        """
+        Apply tags created and deleted in AWS to the cached tags of an IP ACG.
+
+        :param ip_acg_id: IP ACG id
+        :param tags: tags created or overwritten
+        :param deleted: keys of tags deleted
+        """
+        with self.lock:
+            if ip_acg_id not in self.tags:
+                return
+            self.tags[ip_acg_id].update(tags or {})
+            for key in deleted:
+                self.tags[ip_acg_id].pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Forget all tags, e.g. at a refresh of the inventory.
+        """
+        with self.lock:
+            self.tags.clear()
+
+
+tag_cache = TagCache()
+
+
+def get_tag_concurrency(ip_acgs: list, execution: Execution) -> int:
+    """
+    Get the number of IP ACGs of which tags are fetched or applied at the same
+    time: all IP ACGs, up to the configured or the default concurrency.
+
+    :param ip_acgs: IP ACGs
+    :param execution: execution settings
+    :return: concurrency
+    """
+    return min(len(ip_acgs), max(execution.concurrency, TAG_CONCURRENCY))
+
+
+def fetch_tags(ip_acgs: list[IP_ACG], execution: Execution) -> dict[str, dict]:
+    """
+    Fetch the tags of IP ACGs concurrently, through the cache.
+
+    :param ip_acgs: IP ACGs in AWS
+    :param execution: execution settings
+    :return: tags per IP ACG id
+    """
+    concurrency = get_tag_concurrency(ip_acgs, execution)
+    tags = run_concurrently(
+        lambda ip_acg: tag_cache.get(ip_acg.id), ip_acgs, concurrency
+    )
+    return {ip_acg.id: ip_acg_tags for ip_acg, ip_acg_tags in zip(ip_acgs, tags)}
+
+
+def get_managed(ip_acgs: list[IP_ACG], inventory: Inventory) -> list[IP_ACG]:
+    """
+    Get the IP ACGs in AWS matched by IP ACGs of the work instruction, by id.
+
+    :param ip_acgs: IP ACGs of the work instruction, with ids matched
+    :param inventory: Inventory object
+    :return: IP ACGs in AWS, as in the inventory
+    """
+    index = {ip_acg.id: ip_acg for ip_acg in inventory.ip_acgs or []}
+    return [index[ip_acg.id] for ip_acg in ip_acgs if ip_acg.id in index]
+
+
+def get_desired_tags(tags: dict, ip_acg: IP_ACG) -> dict:
+    """
+    Get the tags an IP ACG in AWS should have: the tags of settings.yaml,
+    extended as at creation, without ignored tags.
+
+    :param tags: tags of settings.yaml
+    :param ip_acg: IP ACG in AWS, with its name in AWS (e.g. of a rotated version)
+    :return: tags, by key
+    """
+    tags_extended = extend_tags(dict(tags), ip_acg)
+    return {key: value for key, value in tags_extended.items() if not is_ignored(key)}
+
+
+def diff_tags(desired: dict, current: dict) -> tuple[dict, list[str]]:
+    """
+    Get the differences between the desired and current tags of an IP ACG.
+
+    :param desired: desired tags
+    :param current: tags in AWS
+    :return: tags to create or overwrite, and keys of tags to delete
+    """
+    to_create = {
+        key: value for key, value in desired.items() if current.get(key) != value
+    }
+    to_delete = sorted(
+        key for key in current if key not in desired and not is_ignored(key)
+    )
+    return to_create, to_delete
+
+
+def plan_tags(
+    ip_acgs: list[IP_ACG], tags: dict, execution: Execution
+) -> list[tuple[IP_ACG, dict, list[str]]]:
+    """
+    Plan the tags to create and delete per IP ACG in AWS, to match settings.yaml.
+
+    :param ip_acgs: IP ACGs in AWS, managed by the work instruction
+    :param tags: tags of settings.yaml
+    :param execution: execution settings
+    :return: IP ACGs with tags to differ, each with the tags to create or
+        overwrite, and the keys of tags to delete
+    """
+    logger.debug("Plan tags of [%s] IP ACGs...", len(ip_acgs), extra={"depth": 2})
+
+    current = fetch_tags(ip_acgs, execution)
+    changes = []
+    for ip_acg in ip_acgs:
+        to_create, to_delete = diff_tags(
+            get_desired_tags(tags, ip_acg), current[ip_acg.id]
+        )
+        if to_create or to_delete:
+            changes.append((ip_acg, to_create, to_delete))
+    return changes
+
+
+def report_tags(changes: list[tuple[IP_ACG, dict, list[str]]], dryrun: bool) -> None:
+    """
+    Report the tags to create and delete per IP ACG.
+
+    :param changes: tag changes, from `plan_tags`
+    :param dryrun: dry run mode enabled
+    """
+    for ip_acg, to_create, to_delete in changes:
+        logger.info(
+            f"Tags of IP ACG [{ip_acg.name}] {'would' if dryrun else 'will'} "
+            f"be set: {sorted(to_create)}, and deleted: {to_delete}.",
+            extra={"depth": 2},
+        )
@@ -1,14 +1,59 @@
+import hashlib
 import json
 import logging
-from dataclasses import asdict
+import re
 from datetime import datetime
 
+from acgenius.config import LazyJSON
 from acgenius.resources.models import IP_ACG, Inventory, WorkInstruction
+from acgenius.telemetry.tracing import traced
 from acgenius.validation.ip_acgs import val_ip_acgs_match_inventory
 
 logger = logging.getLogger("acgenius")
 
+# Suffix of the name of a rotated IP ACG, e.g. 'ThatGroup1-v2'.
+VERSION_PATTERN = re.compile(r"^(?P<base>.+)-v(?P<version>[0-9]+)$")
 
+
+def split_version(name: str) -> tuple[str, int]:
+    """
+    Split the name of an IP ACG in its base name and version.
+    A name without version suffix is version 1.
+
+    :param name: name of the IP ACG, e.g. 'ThatGroup1-v2'
+    :return: base name and version, e.g. ('ThatGroup1', 2)
+    """
+    match = VERSION_PATTERN.match(name or "")
+    if match:
+        return match["base"], int(match["version"])
+    return name, 1
+
+
+def get_versioned_name(name: str, version: int) -> str:
+    """
+    Get the name of a version of an IP ACG.
+
+    :param name: base name of the IP ACG
+    :param version: version
+    :return: versioned name, e.g. 'ThatGroup1-v2'
+    """
+    return f"{name}-v{version}"
+
+
+def index_latest(ip_acgs: list[IP_ACG]) -> dict[str, IP_ACG]:
+    """
+    Index IP ACGs by base name; of rotated IP ACGs, only the latest version.
+
+    :param ip_acgs: IP ACGs, e.g. of the inventory
+    :return: latest IP ACG per base name
+    """
+    index = {}
+    for ip_acg in sorted(ip_acgs or [], key=lambda x: split_version(x.name)[1]):
+        index[split_version(ip_acg.name)[0]] = ip_acg
+    return index
+
+
+@traced("match_ip_acgs")
 def match_ip_acgs(
     inventory: Inventory, work_instruction: WorkInstruction
 ) -> WorkInstruction:
@@ -21,6 +66,7 @@ def match_ip_acgs(
     the IP ACGs specified.
 
     Find the ids of the IP ACGs of 2 by looking them up in 1.
+    Rotated IP ACGs match by base name, with the id of the latest version.
     Update the input WorkInstruction.
 
     :param inventory: Inventory object
@@ -31,32 +77,30 @@ def match_ip_acgs(
         "Try to match IP ACGs from work instruction with IP ACGs from inventory...",
         extra={"depth": 5},
     )
+    logger.debug("Current inventory:\n%s", LazyJSON(inventory), extra={"depth": 1})
     logger.debug(
-        f"Current inventory:\n{json.dumps(asdict(work_instruction), indent=4)}",
-        extra={"depth": 1},
-    )
-    logger.debug(
-        f"Current work instruction:\n{json.dumps(asdict(work_instruction), indent=4)}",
-        extra={"depth": 1},
+        "Current work instruction:\n%s", LazyJSON(work_instruction), extra={"depth": 1}
     )
 
+    index = index_latest(inventory.ip_acgs)
     matches = 0
     for work_instruction_ip_acg in work_instruction.ip_acgs:
+        base_name = split_version(work_instruction_ip_acg.name)[0]
         for inventory_ip_acg in inventory.ip_acgs:
-            if work_instruction_ip_acg.name == inventory_ip_acg.name:
+            if base_name == split_version(inventory_ip_acg.name)[0]:
                 logger.debug(
-                    f"Matching IP ACG names: [{work_instruction_ip_acg.name}] with "
-                    f"[{inventory_ip_acg.name}]...",
+                    "Matching IP ACG names: [%s] with [%s]...",
+                    work_instruction_ip_acg.name,
+                    inventory_ip_acg.name,
                     extra={"depth": 2},
                 )
                 matches += 1
-                work_instruction_ip_acg.id = inventory_ip_acg.id
+                work_instruction_ip_acg.id = index[base_name].id
 
     val_ip_acgs_match_inventory(matches, inventory)
 
     logger.debug(
-        f"Updated work instruction:\n{json.dumps(asdict(work_instruction), indent=4)}",
-        extra={"depth": 1},
+        "Updated work instruction:\n%s", LazyJSON(work_instruction), extra={"depth": 1}
     )
 
     return work_instruction
@@ -65,15 +109,26 @@ def match_ip_acgs(
 def format_rules(ip_acg: IP_ACG) -> list[dict]:
     """
     Format rules to IP ACG to AWS request syntax format.
-    Sort rules for user friendliness.
+    Sort rules numerically by network, for user friendliness.
 
     :param ip_acg: IP ACG
     :return: List of rules formatted for AWS request syntax
     """
-    logger.debug(f"Format rules for IP ACG [{ip_acg.name}]...", extra={"depth": 2})
-    rules = [{"ipRule": rule.ip, "ruleDesc": rule.desc} for rule in ip_acg.rules]
-    rules_sorted = sorted(rules, key=lambda rules: rules["ipRule"])
-    return rules_sorted
+    logger.debug("Format rules for IP ACG [%s]...", ip_acg.name, extra={"depth": 2})
+    rules_sorted = sorted(ip_acg.rules, key=lambda rule: rule.network)
+    return [{"ipRule": rule.ip, "ruleDesc": rule.desc} for rule in rules_sorted]
+
+
+def get_rules_digest(rules_formatted: list[dict]) -> str:
+    """
+    Get a short digest of rules formatted for AWS request syntax,
+    to tell one set of rules from another.
+
+    :param rules_formatted: rules formatted for AWS request syntax
+    :return: first 12 characters of the sha256 hex digest
+    """
+    content = json.dumps(rules_formatted, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()[:12]
 
 
 def extend_tags(tags: dict, ip_acg: IP_ACG) -> dict:
@@ -84,7 +139,7 @@ def extend_tags(tags: dict, ip_acg: IP_ACG) -> dict:
     :param ip_acg: IP ACG
     :return: 'static' tags extended with dynamic values
     """
-    logger.debug(f"Extend tags for IP ACG [{ip_acg.name}]...", extra={"depth": 2})
+    logger.debug("Extend tags for IP ACG [%s]...", ip_acg.name, extra={"depth": 2})
     timestamp = datetime.now().isoformat()
 
     tags["IPACGName"] = ip_acg.name
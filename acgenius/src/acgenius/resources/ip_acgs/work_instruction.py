@@ -1,9 +1,6 @@
-import json
 import logging
 from typing import Optional
 
-from botocore.exceptions import ClientError, ParamValidationError
-
 from acgenius.config import (
     EXC_ACCESS_DENIED,
     EXC_INVALID_PARAM,
@@ -12,11 +9,20 @@ from acgenius.config import (
     EXC_RESOURCE_NOT_FOUND,
     EXC_RESOURCE_STATE,
     STD_INSTR_README,
+    LazyJSON,
     workspaces,
 )
-from acgenius.resources.ip_acgs.utils import extend_tags, format_rules, format_tags
-from acgenius.resources.models import IP_ACG, Directory
+from acgenius.resources.ip_acgs.tags import tag_cache
+from acgenius.resources.ip_acgs.utils import (
+    extend_tags,
+    format_rules,
+    format_tags,
+    get_rules_digest,
+)
+from acgenius.resources.models import IP_ACG, Directory, Rule
+from acgenius.resources.output import emit_result
 from acgenius.routing.errors import get_error_code, process_error
+from acgenius.routing.journal import get_key, journal
 
 logger = logging.getLogger("acgenius")
 
@@ -33,21 +39,29 @@ def create_ip_acg(ip_acg: IP_ACG, tags: dict) -> Optional[IP_ACG]:
 
     :return: updated IP ACG
     """
-    logger.debug(f"Create IP ACG [{ip_acg.name}]...", extra={"depth": 1})
+    logger.debug("Create IP ACG [%s]...", ip_acg.name, extra={"depth": 1})
+    completed = journal.resume("create_ip_group", ip_acg.name)
+    if completed:
+        ip_acg.id = completed["id"]
+        return ip_acg
+
     tags_extended = extend_tags(tags, ip_acg)
     tags_formatted = format_tags(tags_extended)
 
     rules_formatted = format_rules(ip_acg)
 
     try:
-        response = workspaces.create_ip_group(
-            GroupName=ip_acg.name,
-            GroupDesc=ip_acg.desc,
-            UserRules=rules_formatted,
-            Tags=tags_formatted,
-        )
+        with journal.step("create_ip_group", ip_acg.name) as result:
+            response = workspaces.create_ip_group(
+                GroupName=ip_acg.name,
+                GroupDesc=ip_acg.desc,
+                UserRules=rules_formatted,
+                Tags=tags_formatted,
+            )
+            result["id"] = response.get("GroupId")
         logger.debug(
-            f"Response of [create_ip_group]: {json.dumps(response, indent=4)}",
+            "Response of [create_ip_group]: %s",
+            LazyJSON(response),
             extra={"depth": 2},
         )
         ip_acg.id = response.get("GroupId")
@@ -55,9 +69,10 @@ def create_ip_acg(ip_acg: IP_ACG, tags: dict) -> Optional[IP_ACG]:
             f"☑ Created IP ACG [{ip_acg.name}] with id [{ip_acg.id}].",
             extra={"depth": 2},
         )
+        emit_result("create_ip_group", id=ip_acg.id, name=ip_acg.name)
         return ip_acg
 
-    except (ParamValidationError, ClientError, Exception) as e:
+    except Exception as e:
         msg_generic = f"Could not create IP ACG [{ip_acg.name}] in AWS."
         error_map = {
             "ParamValidationError": {"msg": EXC_INVALID_PARAM, "crash": True},
@@ -85,6 +100,9 @@ def create_ip_acg(ip_acg: IP_ACG, tags: dict) -> Optional[IP_ACG]:
         }
         error_code = get_error_code(e)
         process_error(error_map, error_code, msg_generic, e)
+        emit_result(
+            "create_ip_group", status="skipped", name=ip_acg.name, error=error_code
+        )
 
 
 def associate_ip_acg(ip_acgs: list[IP_ACG], directory: Directory) -> None:
@@ -96,24 +114,38 @@ def associate_ip_acg(ip_acgs: list[IP_ACG], directory: Directory) -> None:
     :param directory: Directory
     """
     logger.debug(
-        f"Associate IP ACG [{ip_acgs}] to directory [{directory.name}]",
+        "Associate IP ACG [%s] to directory [%s]",
+        ip_acgs,
+        directory.name,
         extra={"depth": 1},
     )
 
+    ip_acg_ids = [ip_acg.id for ip_acg in ip_acgs]
+    key = get_key(directory.id, ip_acg_ids)
+    if journal.resume("associate_ip_groups", key):
+        return
+
     try:
-        response = workspaces.associate_ip_groups(
-            DirectoryId=directory.id, GroupIds=[ip_acg.id for ip_acg in ip_acgs]
-        )
+        with journal.step("associate_ip_groups", key):
+            response = workspaces.associate_ip_groups(
+                DirectoryId=directory.id, GroupIds=ip_acg_ids
+            )
         logger.debug(
-            f"Response of [associate_ip_acg]: {json.dumps(response, indent=4)}",
+            "Response of [associate_ip_acg]: %s",
+            LazyJSON(response),
             extra={"depth": 2},
         )
         logger.info(
             f"☑ Associated IP ACGs with directory [{directory.id} - {directory.name}].",
             extra={"depth": 2},
         )
+        emit_result(
+            "associate_ip_groups",
+            directory_id=directory.id,
+            ip_acgs=ip_acg_ids,
+        )
 
-    except (ParamValidationError, ClientError, Exception) as e:
+    except Exception as e:
         msg_generic = (
             f"Could not associate IP ACGs with directory "
             f"[{directory.id} - {directory.name}] in AWS."
@@ -156,22 +188,28 @@ def update_rules(ip_acg: IP_ACG) -> None:
     """
     rules_formatted = format_rules(ip_acg)
 
-    logger.debug(f"Update rules for IP ACG [{ip_acg.name}]...", extra={"depth": 1})
+    logger.debug("Update rules for IP ACG [%s]...", ip_acg.name, extra={"depth": 1})
+    key = get_key(ip_acg.id, get_rules_digest(rules_formatted))
+    if journal.resume("update_rules_of_ip_group", key):
+        return
 
     try:
-        response = workspaces.update_rules_of_ip_group(
-            GroupId=ip_acg.id, UserRules=rules_formatted
-        )
+        with journal.step("update_rules_of_ip_group", key, name=ip_acg.name):
+            response = workspaces.update_rules_of_ip_group(
+                GroupId=ip_acg.id, UserRules=rules_formatted
+            )
         logger.debug(
-            f"Response of [update_rules_of_ip_group]: {json.dumps(response, indent=4)}.",
+            "Response of [update_rules_of_ip_group]: %s",
+            LazyJSON(response),
             extra={"depth": 2},
         )
         logger.info(
             f"☑ Updated rules for IP ACG [{ip_acg.id} - {ip_acg.name}].",
             extra={"depth": 1},
         )
+        emit_result("update_rules_of_ip_group", id=ip_acg.id, name=ip_acg.name)
 
-    except (ParamValidationError, ClientError, Exception) as e:
+    except Exception as e:
         msg_generic = (
             f"Could not update rules of IP ACG [{ip_acg.id} - {ip_acg.name}] in AWS."
         )
@@ -205,6 +243,251 @@ def update_rules(ip_acg: IP_ACG) -> None:
         process_error(error_map, error_code, msg_generic, e)
 
 
+def authorize_rules(ip_acg: IP_ACG, rules: list[Rule]) -> None:
+    """
+    Add rules to IP ACG in AWS WorkSpaces, keeping the rules in place.
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/workspaces/client/authorize_ip_rules.html
+
+    :param ip_acg: IP ACG
+    :param rules: rules to add, with IP addresses not in the IP ACG yet
+    """
+    rules_formatted = format_rules(IP_ACG(name=ip_acg.name, desc="", rules=rules))
+
+    logger.debug("Authorize rules for IP ACG [%s]...", ip_acg.name, extra={"depth": 1})
+    key = get_key(ip_acg.id, get_rules_digest(rules_formatted))
+    if journal.resume("authorize_ip_rules", key):
+        return
+
+    try:
+        with journal.step("authorize_ip_rules", key, name=ip_acg.name):
+            response = workspaces.authorize_ip_rules(
+                GroupId=ip_acg.id, UserRules=rules_formatted
+            )
+        logger.debug(
+            "Response of [authorize_ip_rules]: %s",
+            LazyJSON(response),
+            extra={"depth": 2},
+        )
+        logger.info(
+            f"☑ Authorized [{len(rules)}] rules for IP ACG "
+            f"[{ip_acg.id} - {ip_acg.name}].",
+            extra={"depth": 1},
+        )
+        emit_result(
+            "authorize_ip_rules", id=ip_acg.id, name=ip_acg.name, rules=len(rules)
+        )
+
+    except Exception as e:
+        msg_generic = (
+            f"Could not authorize rules of IP ACG [{ip_acg.id} - {ip_acg.name}] in AWS."
+        )
+        error_map = {
+            "ParamValidationError": {"msg": EXC_INVALID_PARAM, "crash": True},
+            "InvalidParameterValuesException": {
+                "msg": EXC_INVALID_PARAM,
+                "crash": True,
+            },
+            "ResourceNotFoundException": {
+                "msg": "Could not find the IP ACG. Are you sure it exists?",
+                "crash": True,
+            },
+            "ResourceLimitExceededException": {
+                "msg": EXC_RESOURCE_LIMIT,
+                "crash": True,
+            },
+            "InvalidResourceStateException": {
+                "msg": (
+                    "The IP ACG is in an unexpected state. "
+                    "Please inspect it in the AWS console. "
+                ),
+                "crash": True,
+            },
+            "AccessDeniedException": {
+                "msg": f"{EXC_ACCESS_DENIED} {STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+def revoke_rules(ip_acg: IP_ACG, rules: list[Rule]) -> None:
+    """
+    Remove rules from IP ACG in AWS WorkSpaces, keeping the other rules in place.
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/workspaces/client/revoke_ip_rules.html
+
+    :param ip_acg: IP ACG
+    :param rules: rules to remove, as in AWS
+    """
+    ips = sorted({rule.ip for rule in rules})
+
+    logger.debug("Revoke rules for IP ACG [%s]...", ip_acg.name, extra={"depth": 1})
+    key = get_key(ip_acg.id, get_rules_digest(ips))
+    if journal.resume("revoke_ip_rules", key):
+        return
+
+    try:
+        with journal.step("revoke_ip_rules", key, name=ip_acg.name):
+            response = workspaces.revoke_ip_rules(GroupId=ip_acg.id, UserRules=ips)
+        logger.debug(
+            "Response of [revoke_ip_rules]: %s",
+            LazyJSON(response),
+            extra={"depth": 2},
+        )
+        logger.info(
+            f"☑ Revoked [{len(ips)}] rules for IP ACG [{ip_acg.id} - {ip_acg.name}].",
+            extra={"depth": 1},
+        )
+        emit_result("revoke_ip_rules", id=ip_acg.id, name=ip_acg.name, rules=len(ips))
+
+    except Exception as e:
+        msg_generic = (
+            f"Could not revoke rules of IP ACG [{ip_acg.id} - {ip_acg.name}] in AWS."
+        )
+        error_map = {
+            "ParamValidationError": {"msg": EXC_INVALID_PARAM, "crash": True},
+            "InvalidParameterValuesException": {
+                "msg": EXC_INVALID_PARAM,
+                "crash": True,
+            },
+            "ResourceNotFoundException": {
+                "msg": "Could not find the IP ACG. Are you sure it exists?",
+                "crash": True,
+            },
+            "InvalidResourceStateException": {
+                "msg": (
+                    "The IP ACG is in an unexpected state. "
+                    "Please inspect it in the AWS console. "
+                ),
+                "crash": True,
+            },
+            "AccessDeniedException": {
+                "msg": f"{EXC_ACCESS_DENIED} {STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+def create_tags(ip_acg: IP_ACG, tags: dict) -> None:
+    """
+    Create or overwrite tags of IP ACG in AWS WorkSpaces, in a single call.
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/workspaces/client/create_tags.html
+
+    :param ip_acg: IP ACG
+    :param tags: tags to create or overwrite
+    """
+    tags_formatted = format_tags(tags)
+
+    logger.debug("Create tags for IP ACG [%s]...", ip_acg.name, extra={"depth": 1})
+    key = get_key(ip_acg.id, get_rules_digest(tags_formatted))
+    if journal.resume("create_tags", key):
+        return
+
+    try:
+        with journal.step("create_tags", key, name=ip_acg.name):
+            response = workspaces.create_tags(ResourceId=ip_acg.id, Tags=tags_formatted)
+        logger.debug(
+            "Response of [create_tags]: %s", LazyJSON(response), extra={"depth": 2}
+        )
+        tag_cache.update(ip_acg.id, tags=tags)
+        logger.info(
+            f"☑ Set tags {sorted(tags)} for IP ACG [{ip_acg.id} - {ip_acg.name}].",
+            extra={"depth": 1},
+        )
+        emit_result("create_tags", id=ip_acg.id, name=ip_acg.name, keys=sorted(tags))
+
+    except Exception as e:
+        msg_generic = (
+            f"Could not create tags of IP ACG [{ip_acg.id} - {ip_acg.name}] in AWS."
+        )
+        error_map = {
+            "ParamValidationError": {"msg": EXC_INVALID_PARAM, "crash": True},
+            "InvalidParameterValuesException": {
+                "msg": EXC_INVALID_PARAM,
+                "crash": True,
+            },
+            "ResourceNotFoundException": {
+                "msg": "Could not find the IP ACG. Are you sure it exists?",
+                "crash": True,
+            },
+            "ResourceLimitExceededException": {
+                "msg": EXC_RESOURCE_LIMIT,
+                "crash": True,
+            },
+            "AccessDeniedException": {
+                "msg": f"{EXC_ACCESS_DENIED} {STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+def delete_tags(ip_acg: IP_ACG, keys: list[str]) -> None:
+    """
+    Delete tags of IP ACG in AWS WorkSpaces, in a single call.
+    https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/workspaces/client/delete_tags.html
+
+    :param ip_acg: IP ACG
+    :param keys: keys of the tags to delete
+    """
+    logger.debug("Delete tags for IP ACG [%s]...", ip_acg.name, extra={"depth": 1})
+    key = get_key(ip_acg.id, list(keys))
+    if journal.resume("delete_tags", key):
+        return
+
+    try:
+        with journal.step("delete_tags", key, name=ip_acg.name):
+            response = workspaces.delete_tags(ResourceId=ip_acg.id, TagKeys=keys)
+        logger.debug(
+            "Response of [delete_tags]: %s", LazyJSON(response), extra={"depth": 2}
+        )
+        tag_cache.update(ip_acg.id, deleted=tuple(keys))
+        logger.info(
+            f"☑ Deleted tags {keys} of IP ACG [{ip_acg.id} - {ip_acg.name}].",
+            extra={"depth": 1},
+        )
+        emit_result("delete_tags", id=ip_acg.id, name=ip_acg.name, keys=list(keys))
+
+    except Exception as e:
+        msg_generic = (
+            f"Could not delete tags of IP ACG [{ip_acg.id} - {ip_acg.name}] in AWS."
+        )
+        error_map = {
+            "InvalidParameterValuesException": {
+                "msg": EXC_INVALID_PARAM,
+                "crash": True,
+            },
+            "ResourceNotFoundException": {
+                "msg": "Could not find the IP ACG. Are you sure it exists?",
+                "crash": True,
+            },
+            "AccessDeniedException": {
+                "msg": f"{EXC_ACCESS_DENIED} {STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+def reconcile_tags(change: tuple[IP_ACG, dict, list[str]]) -> None:
+    """
+    Apply the tag changes of an IP ACG, with at most one call to create
+    and one call to delete tags.
+
+    :param change: IP ACG, with the tags to create or overwrite,
+        and the keys of tags to delete
+    """
+    ip_acg, to_create, to_delete = change
+    if to_create:
+        create_tags(ip_acg, to_create)
+    if to_delete:
+        delete_tags(ip_acg, to_delete)
+
+
 def disassociate_ip_acg(ip_acg_ids_to_delete: list, directory: Directory) -> None:
     """
     Disassociate IP ACGs from directory in AWS WorkSpaces.
@@ -215,16 +498,24 @@ def disassociate_ip_acg(ip_acg_ids_to_delete: list, directory: Directory) -> Non
     :param directory: Directory
     """
     logger.debug(
-        f"Disassociate IP ACGs [{ip_acg_ids_to_delete}] "
-        f"from directory [{directory.id} - {directory.name}]...",
+        "Disassociate IP ACGs [%s] from directory [%s - %s]...",
+        ip_acg_ids_to_delete,
+        directory.id,
+        directory.name,
         extra={"depth": 2},
     )
+    key = get_key(directory.id, ip_acg_ids_to_delete)
+    if journal.resume("disassociate_ip_groups", key):
+        return
+
     try:
-        response = workspaces.disassociate_ip_groups(
-            DirectoryId=directory.id, GroupIds=ip_acg_ids_to_delete
-        )
+        with journal.step("disassociate_ip_groups", key):
+            response = workspaces.disassociate_ip_groups(
+                DirectoryId=directory.id, GroupIds=ip_acg_ids_to_delete
+            )
         logger.debug(
-            f"Response of [disassociate_ip_acg]: {json.dumps(response, indent=4)}...",
+            "Response of [disassociate_ip_acg]: %s",
+            LazyJSON(response),
             extra={"depth": 2},
         )
         logger.info(
@@ -233,8 +524,13 @@ def disassociate_ip_acg(ip_acg_ids_to_delete: list, directory: Directory) -> Non
             "for those IP ACGs existent and associated.",
             extra={"depth": 1},
         )
+        emit_result(
+            "disassociate_ip_groups",
+            directory_id=directory.id,
+            ip_acgs=list(ip_acg_ids_to_delete),
+        )
 
-    except (ParamValidationError, ClientError, Exception) as e:
+    except Exception as e:
         msg_generic = (
             f"Could not disassociate all IP ACGs "
             f"from directory [{directory.id} - {directory.name}] in AWS."
@@ -279,16 +575,22 @@ def delete_ip_acg(ip_acg_id: str) -> None:
 
     :param ip_acg_id: IP ACG id
     """
-    logger.debug(f"Delete IP ACG [{ip_acg_id}]...", extra={"depth": 1})
+    logger.debug("Delete IP ACG [%s]...", ip_acg_id, extra={"depth": 1})
+    if journal.resume("delete_ip_group", ip_acg_id):
+        return
+
     try:
-        response = workspaces.delete_ip_group(GroupId=ip_acg_id)
+        with journal.step("delete_ip_group", ip_acg_id):
+            response = workspaces.delete_ip_group(GroupId=ip_acg_id)
         logger.debug(
-            f"Response of [delete_ip_acg]: {json.dumps(response, indent=4)}",
+            "Response of [delete_ip_acg]: %s",
+            LazyJSON(response),
             extra={"depth": 2},
         )
         logger.info(f"☑ Deleted IP ACG [{ip_acg_id}].", extra={"depth": 1})
+        emit_result("delete_ip_group", id=ip_acg_id)
 
-    except (ParamValidationError, ClientError, Exception) as e:
+    except Exception as e:
         msg_generic = f"Could not delete IP ACG [{ip_acg_id}] in AWS."
         error_map = {
             "InvalidParameterValuesException": {
@@ -1,22 +1,105 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Optional
 
+IPV4_MAX = 0xFFFFFFFF
 
-@dataclass
+
+@dataclass(frozen=True, order=True, slots=True)
+class Network:
+    """
+    Represent an IPv4 network in canonical form: a packed 32-bit network address
+    plus prefix length. Instances are immutable, hashable, and ordered numerically.
+
+    Attributes:
+        address: network address as unsigned 32-bit integer (host bits cleared)
+        prefix: prefix length, 0 to 32
+    """
+
+    address: int
+    prefix: int
+
+    @classmethod
+    def from_cidr(cls, cidr: str, prefix_default: int = 32) -> "Network":
+        """
+        Parse an IPv4 address with optional prefix, e.g. '198.51.100.0/27'.
+
+        :param cidr: IPv4 address, with or without prefix
+        :param prefix_default: prefix to use if absent
+        :return: Network object
+        """
+        ip, _, prefix = cidr.partition("/")
+        octets = ip.split(".")
+        prefix = int(prefix) if prefix else prefix_default
+
+        if len(octets) != 4 or not 0 <= prefix <= 32:
+            raise ValueError(f"Invalid IPv4 network [{cidr}]")
+
+        address = 0
+        for octet in octets:
+            value = int(octet)
+            if not 0 <= value <= 255:
+                raise ValueError(f"Invalid IPv4 network [{cidr}]")
+            address = (address << 8) | value
+
+        mask = (IPV4_MAX << (32 - prefix)) & IPV4_MAX
+        return cls(address=address & mask, prefix=prefix)
+
+    @property
+    def first(self) -> int:
+        """First address in the network, as integer."""
+        return self.address
+
+    @property
+    def last(self) -> int:
+        """Last address in the network, as integer."""
+        return self.address | (IPV4_MAX >> self.prefix)
+
+    def __str__(self) -> str:
+        octets = (self.address >> shift & 0xFF for shift in (24, 16, 8, 0))
+        return f"{'.'.join(map(str, octets))}/{self.prefix}"
+
+
+@dataclass(slots=True, eq=False)
 class Rule:
     """
     Represent a rule for an IP Access Control Group (IP ACG).
+    Descriptions are interned, as many rules share the same description.
+    The network is parsed once, on creation, and set again on validation with the
+    configured default prefix; rules are equal and hashed by network and description.
 
     Attributes:
         ip: IP address
         desc: Description of the rule
+        network: Canonical network of the rule, None if the IP address is invalid
     """
 
     ip: str
     desc: str
+    network: Optional[Network] = field(default=None, repr=False)
 
+    def __post_init__(self) -> None:
+        if isinstance(self.desc, str):
+            self.desc = sys.intern(self.desc)
+        if self.network is None and isinstance(self.ip, str):
+            try:
+                self.network = Network.from_cidr(self.ip)
+            except ValueError:
+                self.network = None
 
-@dataclass
+    def _key(self) -> tuple:
+        return (self.network if self.network is not None else self.ip, self.desc)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Rule):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+
+@dataclass(slots=True)
 class IP_ACG:
     """
     Represent an IP Access Control Group (IP ACG).
@@ -27,6 +110,7 @@ class IP_ACG:
         rules: List of Rule objects containing IP addresses and descriptions
         id: AWS resource ID of the IP ACG
         origin: Origin of the IP ACG configuration in the organization
+        directories: Optional ids of the directories to associate the IP ACG with
     """
 
     name: str
@@ -34,9 +118,10 @@ class IP_ACG:
     rules: list[Rule]
     id: Optional[str] = None
     origin: Optional[str] = None
+    directories: Optional[list[str]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Directory:
     """
     Represent an AWS Directory Service directory, active and registered for WorkSpaces.
@@ -56,7 +141,7 @@ class Directory:
     state: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Validation:
     """
     Represent validation rules and constraints for IP ACG configuration.
@@ -76,7 +161,7 @@ class Validation:
     groups_per_directory_amt_max: int
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkInstruction:
     """
     Represent configuration for directories and IP ACGs, originating from settings.yaml.
@@ -92,7 +177,7 @@ class WorkInstruction:
     tags: dict
 
 
-@dataclass
+@dataclass(slots=True)
 class Inventory:
     """
     Represent current state of directories and IP ACGs in AWS.
@@ -106,7 +191,73 @@ class Inventory:
     ip_acgs: list[IP_ACG]
 
 
-@dataclass
+@dataclass(slots=True)
+class Plan:
+    """
+    Represent the operations to bring IP ACGs in AWS in line with the work instruction.
+
+    Attributes:
+        create: IP ACGs of the work instruction absent in the inventory
+        update: IP ACGs present in the inventory, with different rules (ids matched)
+        unchanged: IP ACGs present in the inventory, with the same rules (ids matched)
+    """
+
+    create: list[IP_ACG]
+    update: list[IP_ACG]
+    unchanged: list[IP_ACG]
+
+
+@dataclass(slots=True)
+class SyncPlan:
+    """
+    Represent the fewest operations to converge IP ACGs and their associations
+    in AWS with the work instruction.
+
+    Attributes:
+        create: IP ACGs of the work instruction absent in the inventory
+        update: IP ACGs with rules both added and removed, to replace in one call
+        authorize: IP ACGs with rules added only, each with the rules to add
+        revoke: IP ACGs with rules removed only, each with the rules to remove
+        tags: IP ACGs in AWS with other tags, each with the tags to create
+            or overwrite, and the keys of tags to delete
+        unchanged: IP ACGs present in the inventory, with the same rules
+        associate: directories, each with the IP ACGs to associate
+        disassociate: directories, each with the ids of the IP ACGs to disassociate
+        delete: IP ACGs in AWS absent in the work instruction, to delete
+        unmanaged: IP ACGs in AWS absent in the work instruction, to keep
+    """
+
+    create: list[IP_ACG]
+    update: list[IP_ACG]
+    authorize: list[tuple[IP_ACG, list[Rule]]]
+    revoke: list[tuple[IP_ACG, list[Rule]]]
+    tags: list[tuple[IP_ACG, dict, list[str]]]
+    unchanged: list[IP_ACG]
+    associate: list[tuple[Directory, list[IP_ACG]]]
+    disassociate: list[tuple[Directory, list[str]]]
+    delete: list[IP_ACG]
+    unmanaged: list[IP_ACG]
+
+
+@dataclass(slots=True)
+class Execution:
+    """
+    Represent how operations in AWS are executed.
+
+    Attributes:
+        concurrency: Maximum number of IP ACGs processed concurrently
+        rate_limit: Maximum number of AWS calls per second
+        wave_size: Optional maximum number of directories per rollout wave
+        wave_percentage: Optional maximum percentage of directories per rollout wave
+    """
+
+    concurrency: int = 1
+    rate_limit: float = 5.0
+    wave_size: Optional[int] = None
+    wave_percentage: Optional[float] = None
+
+
+@dataclass(slots=True)
 class Settings:
     """
     Represent application settings and configuration.
@@ -114,13 +265,15 @@ class Settings:
     Attributes:
         validation: Validation rules and constraints
         work_instruction: Optional WorkInstruction for desired state
+        execution: Optional execution settings (concurrency, rate limit)
     """
 
     validation: Validation
     work_instruction: Optional[WorkInstruction] = None
+    execution: Optional[Execution] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AppInput:
     """
     Represent all inputs needed to run the application.
@@ -0,0 +1,225 @@
+import csv
+import json
+import logging
+import sys
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, TextIO, Union
+
+from acgenius.resources.models import IP_ACG, Directory
+
+logger = logging.getLogger("acgenius")
+
+OUTPUT_FORMATS = ["table", "json", "ndjson", "csv"]
+
+CSV_FIELDS = [
+    "record",
+    "origin",
+    "id",
+    "name",
+    "description",
+    "type",
+    "state",
+    "ip_acgs",
+    "rule",
+    "rule_description",
+    "operation",
+    "directory_id",
+    "status",
+    "address",
+    "directory_ids",
+    "hits",
+    "planned_status",
+    "planned_name",
+    "planned_rule",
+    "change",
+    "scope",
+    "gained",
+    "lost",
+    "clients_lost",
+]
+
+
+class RecordWriter(ABC):
+    """
+    Write records to a stream, one at a time, as soon as they are emitted.
+
+    Subclasses define the serialization; the stream is flushed after each record,
+    so downstream tools can consume records while the app is still running.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.count = 0
+
+    def write(self, record: dict) -> None:
+        """
+        Write a single record and flush the stream.
+
+        :param record: record to write
+        """
+        self._write(record)
+        self.count += 1
+        self.stream.flush()
+
+    @abstractmethod
+    def _write(self, record: dict) -> None:
+        """
+        Serialize a single record to the stream.
+
+        :param record: record to write
+        """
+
+    def close(self) -> None:
+        """
+        Finish the output, e.g. by closing an open JSON array.
+        """
+        self.stream.flush()
+
+
+class NDJSONWriter(RecordWriter):
+    """
+    Write records as newline delimited JSON.
+    """
+
+    def _write(self, record: dict) -> None:
+        self.stream.write(f"{json.dumps(record, default=str)}\n")
+
+
+class JSONWriter(RecordWriter):
+    """
+    Write records as elements of a single JSON array, opened at the first record.
+    """
+
+    def _write(self, record: dict) -> None:
+        self.stream.write("[\n" if self.count == 0 else ",\n")
+        self.stream.write(json.dumps(record, default=str))
+
+    def close(self) -> None:
+        self.stream.write("[]\n" if self.count == 0 else "\n]\n")
+        super().close()
+
+
+class CSVWriter(RecordWriter):
+    """
+    Write records as CSV rows with a fixed set of columns.
+    IP ACGs are flattened to one row per rule; lists of ids are joined with ';'.
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        super().__init__(stream)
+        self.writer = csv.DictWriter(
+            stream, fieldnames=CSV_FIELDS, extrasaction="ignore"
+        )
+        self.writer.writeheader()
+
+    def _write(self, record: dict) -> None:
+        row = dict(record)
+        for field in ("ip_acgs", "directory_ids", "gained", "lost", "clients_lost"):
+            if isinstance(row.get(field), list):
+                row[field] = ";".join(row[field])
+
+        rules = row.pop("rules", None)
+        if not rules:
+            self.writer.writerow(row)
+            return
+
+        for rule in rules:
+            self.writer.writerow(
+                {**row, "rule": rule["ip"], "rule_description": rule["description"]}
+            )
+
+
+WRITERS = {"json": JSONWriter, "ndjson": NDJSONWriter, "csv": CSVWriter}
+
+_writer: Optional[RecordWriter] = None
+
+
+def set_output(fmt: str, stream: Optional[TextIO] = None) -> None:
+    """
+    Select the output format for reports and results.
+    For 'table', human readable tables are printed and no records are written.
+
+    :param fmt: output format, one of OUTPUT_FORMATS
+    :param stream: stream to write records to (default: stdout)
+    """
+    global _writer
+
+    logger.debug("Set output format [%s]...", fmt, extra={"depth": 1})
+    _writer = WRITERS[fmt](stream or sys.stdout) if fmt in WRITERS else None
+
+
+def output_is_table() -> bool:
+    """
+    See if human readable tables are the selected output.
+
+    :return: True if no machine-readable output format is selected, False otherwise
+    """
+    return _writer is None
+
+
+def emit_record(record: dict) -> None:
+    """
+    Write a record to the selected machine-readable output, if any.
+
+    :param record: record to write
+    """
+    if _writer is not None:
+        _writer.write(record)
+
+
+def close_output() -> None:
+    """
+    Finish the selected machine-readable output, if any, and reset to tables.
+    """
+    global _writer
+
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def to_records(
+    subject: Union[list[Directory], list[IP_ACG]], origin: str
+) -> Iterator[dict]:
+    """
+    Convert Directories or IP ACGs to records.
+
+    :param subject: list of Directories or IP_ACGs
+    :param origin: origin of the items, e.g. 'inventory' or 'work_instruction'
+    :return: iterator of records, one per item
+    """
+    for item in subject:
+        if isinstance(item, Directory):
+            yield {
+                "record": "directory",
+                "origin": origin,
+                "id": item.id,
+                "name": item.name,
+                "type": item.type,
+                "state": item.state,
+                "ip_acgs": item.ip_acgs or [],
+            }
+        else:
+            yield {
+                "record": "ip_acg",
+                "origin": origin,
+                "id": item.id,
+                "name": item.name,
+                "description": item.desc,
+                "rules": [
+                    {"ip": rule.ip, "description": rule.desc} for rule in item.rules
+                ],
+            }
+
+
+def emit_result(operation: str, status: str = "ok", **fields) -> None:
+    """
+    Write the result of an operation in AWS to the selected output, if any.
+
+    :param operation: name of the AWS WorkSpaces operation
+    :param status: outcome of the operation
+    :param fields: identifiers of the resources involved, e.g. id or directory_id
+    """
+    emit_record(
+        {"record": "result", "operation": operation, "status": status, **fields}
+    )
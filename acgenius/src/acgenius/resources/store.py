@@ -0,0 +1,414 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Optional, Union
+
+from acgenius.config import STD_INSTR_README
+from acgenius.resources.models import Inventory
+from acgenius.resources.output import emit_record, output_is_table
+from acgenius.routing.errors import get_error_code, process_error
+from acgenius.telemetry.tracing import traced
+
+logger = logging.getLogger("acgenius")
+
+# Rules with a prefix below this one are reported as wide by 'status'.
+WIDE_PREFIX = 24
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    generation INTEGER NOT NULL REFERENCES generations (id),
+    id TEXT NOT NULL,
+    name TEXT,
+    type TEXT,
+    state TEXT,
+    PRIMARY KEY (generation, id)
+);
+CREATE TABLE IF NOT EXISTS ip_acgs (
+    generation INTEGER NOT NULL REFERENCES generations (id),
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    desc TEXT,
+    PRIMARY KEY (generation, id)
+);
+CREATE TABLE IF NOT EXISTS rules (
+    generation INTEGER NOT NULL REFERENCES generations (id),
+    ip_acg_id TEXT NOT NULL,
+    network TEXT NOT NULL,
+    first INTEGER NOT NULL,
+    last INTEGER NOT NULL,
+    prefix INTEGER NOT NULL,
+    desc TEXT
+);
+CREATE TABLE IF NOT EXISTS associations (
+    generation INTEGER NOT NULL REFERENCES generations (id),
+    directory_id TEXT NOT NULL,
+    ip_acg_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_generations_fetched_at ON generations (fetched_at);
+CREATE INDEX IF NOT EXISTS idx_directories_id ON directories (id, generation);
+CREATE INDEX IF NOT EXISTS idx_ip_acgs_id ON ip_acgs (id, generation);
+CREATE INDEX IF NOT EXISTS idx_ip_acgs_name ON ip_acgs (name, generation);
+CREATE INDEX IF NOT EXISTS idx_rules_ip_acg_id ON rules (generation, ip_acg_id);
+CREATE INDEX IF NOT EXISTS idx_rules_prefix ON rules (generation, prefix);
+CREATE INDEX IF NOT EXISTS idx_rules_range ON rules (generation, first, last);
+CREATE INDEX IF NOT EXISTS idx_associations_directory_id
+    ON associations (generation, directory_id);
+CREATE INDEX IF NOT EXISTS idx_associations_ip_acg_id
+    ON associations (generation, ip_acg_id);
+"""
+
+
+def get_inventory_digest(inventory: Inventory) -> str:
+    """
+    Get a digest of an inventory: directories, associations, IP ACGs and rules.
+    Order does not matter, nor does the notation of rules.
+
+    :param inventory: Inventory object
+    :return: sha256 hex digest
+    """
+    directories = sorted(
+        (d.id or "", d.name or "", d.type or "", d.state or "", sorted(d.ip_acgs or []))
+        for d in inventory.directories or []
+    )
+    ip_acgs = sorted(
+        (
+            ip_acg.id or "",
+            ip_acg.name or "",
+            ip_acg.desc or "",
+            sorted(f"{rule.network}\t{rule.desc}" for rule in ip_acg.rules or []),
+        )
+        for ip_acg in inventory.ip_acgs or []
+    )
+    return hashlib.sha256(repr((directories, ip_acgs)).encode()).hexdigest()
+
+
+class InventoryStore:
+    """
+    Local SQLite store of inventory snapshots: directories, IP ACGs, rules
+    and associations.
+
+    Each fetch of the inventory is written as a new generation, in one
+    transaction; a fetch equal to the one written before is not written again,
+    so polling actions add a generation per change, not per poll. Rules are stored by canonical network, with the first and
+    last address as integers, so ranges can be queried on their index.
+    Queries run in SQLite, e.g. the IP ACGs with wide rules, or the changes
+    since a point in time, without loading the fleet or calling AWS.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.path: Optional[str] = None
+        self.connection: Optional[sqlite3.Connection] = None
+        self.written: Optional[tuple[str, int]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.connection is not None
+
+    def start(self, path: str) -> None:
+        """
+        Open the store, and create its tables and indexes if new.
+
+        :param path: path of the SQLite database file
+        """
+        try:
+            connection = sqlite3.connect(path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.executescript(SCHEMA)
+
+        except Exception as e:
+            msg_generic = f"Could not open inventory store [{path}]."
+            error_map = {
+                "OperationalError": {
+                    "msg": f"Please specify a writable file. {STD_INSTR_README}",
+                    "crash": True,
+                },
+                "DatabaseError": {
+                    "msg": "The file is not an inventory store. "
+                    "Please specify another file.",
+                    "crash": True,
+                },
+            }
+            error_code = get_error_code(e)
+            process_error(error_map, error_code, msg_generic, e)
+
+        self.path = path
+        self.connection = connection
+        self.written = None
+
+        logger.info(f"Store inventory in [{path}].", extra={"depth": 1})
+
+    def stop(self) -> None:
+        """
+        Close the store.
+        """
+        with self.lock:
+            if self.connection:
+                self.connection.close()
+            self.connection = None
+            self.written = None
+
+    @traced("store_inventory")
+    def write(self, inventory: Inventory, fetched_at: Optional[datetime] = None) -> int:
+        """
+        Write an inventory as a new generation, unless it equals the inventory
+        written before.
+
+        :param inventory: Inventory object
+        :param fetched_at: time of the fetch (default: now)
+        :return: generation, of the inventory written before if equal
+        """
+        fetched_at = (fetched_at or datetime.now()).isoformat()
+        digest = get_inventory_digest(inventory)
+
+        with self.lock, self.connection:
+            if self.written and self.written[0] == digest:
+                logger.debug(
+                    "Inventory unchanged since generation [%s]; not stored.",
+                    self.written[1],
+                    extra={"depth": 2},
+                )
+                return self.written[1]
+
+            generation = self.connection.execute(
+                "INSERT INTO generations (fetched_at) VALUES (?)", (fetched_at,)
+            ).lastrowid
+
+            self.connection.executemany(
+                "INSERT INTO directories VALUES (?, ?, ?, ?, ?)",
+                (
+                    (generation, d.id, d.name, d.type, d.state)
+                    for d in inventory.directories or []
+                ),
+            )
+            self.connection.executemany(
+                "INSERT INTO associations VALUES (?, ?, ?)",
+                (
+                    (generation, d.id, ip_acg_id)
+                    for d in inventory.directories or []
+                    for ip_acg_id in d.ip_acgs or []
+                ),
+            )
+            self.connection.executemany(
+                "INSERT INTO ip_acgs VALUES (?, ?, ?, ?)",
+                (
+                    (generation, ip_acg.id, ip_acg.name, ip_acg.desc)
+                    for ip_acg in inventory.ip_acgs or []
+                ),
+            )
+            self.connection.executemany(
+                "INSERT INTO rules VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        generation,
+                        ip_acg.id,
+                        str(rule.network),
+                        rule.network.first,
+                        rule.network.last,
+                        rule.network.prefix,
+                        rule.desc,
+                    )
+                    for ip_acg in inventory.ip_acgs or []
+                    for rule in ip_acg.rules or []
+                ),
+            )
+
+            self.written = (digest, generation)
+
+        logger.debug(
+            "Stored inventory as generation [%s].", generation, extra={"depth": 2}
+        )
+        return generation
+
+    def query(self, sql: str, params: Union[tuple, dict] = ()) -> list[dict]:
+        """
+        Run a query on the store.
+
+        :param sql: SQL query
+        :param params: parameters of the query
+        :return: rows, as dicts
+        """
+        with self.lock:
+            return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def get_generation(self, at: Optional[datetime] = None) -> Optional[int]:
+        """
+        Get the latest generation, or the latest fetched at or before a time.
+
+        :param at: point in time (default: now)
+        :return: generation, if any
+        """
+        sql = "SELECT MAX(id) AS id FROM generations"
+        params = ()
+        if at:
+            sql += " WHERE fetched_at <= ?"
+            params = (at.isoformat(),)
+        return self.query(sql, params)[0]["id"]
+
+    def get_wide_rules(
+        self, prefix: int = WIDE_PREFIX, generation: Optional[int] = None
+    ) -> list[dict]:
+        """
+        Get the rules wider than a prefix, with their IP ACG.
+
+        :param prefix: prefix, e.g. 24 for rules wider than /24
+        :param generation: generation (default: latest)
+        :return: IP ACG id and name, network and description per rule
+        """
+        generation = generation or self.get_generation()
+        return self.query(
+            "SELECT ip_acgs.id, ip_acgs.name, rules.network, rules.desc "
+            "FROM rules JOIN ip_acgs "
+            "ON ip_acgs.generation = rules.generation AND ip_acgs.id = rules.ip_acg_id "
+            "WHERE rules.generation = ? AND rules.prefix < ? "
+            "ORDER BY ip_acgs.name, rules.first",
+            (generation, prefix),
+        )
+
+    def get_rules_covering(
+        self, address: int, generation: Optional[int] = None
+    ) -> list[dict]:
+        """
+        Get the rules whose network range covers an address, with their IP ACG.
+
+        :param address: IPv4 address, as integer
+        :param generation: generation (default: latest)
+        :return: IP ACG id and name, network and description per rule
+        """
+        generation = generation or self.get_generation()
+        return self.query(
+            "SELECT ip_acgs.id, ip_acgs.name, rules.network, rules.desc "
+            "FROM rules JOIN ip_acgs "
+            "ON ip_acgs.generation = rules.generation AND ip_acgs.id = rules.ip_acg_id "
+            "WHERE rules.generation = ? AND rules.first <= ? AND rules.last >= ? "
+            "ORDER BY ip_acgs.name, rules.first",
+            (generation, address, address),
+        )
+
+    def get_changes(self, since: Optional[datetime] = None) -> list[dict]:
+        """
+        Get the IP ACGs added, removed or changed (rules or associations)
+        in the latest generation, compared to the generation at a point in time.
+
+        :param since: point in time (default: the generation before the latest);
+            the first generation, if none was fetched before
+        :return: id, name and change per IP ACG, with the generations compared
+        """
+        generation = self.get_generation()
+        if since:
+            previous = (
+                self.get_generation(since)
+                or self.query("SELECT MIN(id) AS id FROM generations")[0]["id"]
+            )
+        else:
+            previous = self.query(
+                "SELECT MAX(id) AS id FROM generations WHERE id < ?", (generation,)
+            )[0]["id"]
+        if generation is None or previous is None or previous == generation:
+            return []
+
+        params = {"generation": generation, "previous": previous}
+        rows = self.query(
+            """
+            WITH
+            current AS (SELECT id, name FROM ip_acgs WHERE generation = :generation),
+            earlier AS (SELECT id, name FROM ip_acgs WHERE generation = :previous),
+            changed_rules AS (
+                SELECT * FROM (
+                    SELECT ip_acg_id, network, desc FROM rules
+                    WHERE generation = :generation
+                    EXCEPT
+                    SELECT ip_acg_id, network, desc FROM rules
+                    WHERE generation = :previous
+                )
+                UNION
+                SELECT * FROM (
+                    SELECT ip_acg_id, network, desc FROM rules
+                    WHERE generation = :previous
+                    EXCEPT
+                    SELECT ip_acg_id, network, desc FROM rules
+                    WHERE generation = :generation
+                )
+            ),
+            changed_associations AS (
+                SELECT * FROM (
+                    SELECT ip_acg_id, directory_id FROM associations
+                    WHERE generation = :generation
+                    EXCEPT
+                    SELECT ip_acg_id, directory_id FROM associations
+                    WHERE generation = :previous
+                )
+                UNION
+                SELECT * FROM (
+                    SELECT ip_acg_id, directory_id FROM associations
+                    WHERE generation = :previous
+                    EXCEPT
+                    SELECT ip_acg_id, directory_id FROM associations
+                    WHERE generation = :generation
+                )
+            )
+            SELECT id, name, 'added' AS change FROM current
+            WHERE id NOT IN (SELECT id FROM earlier)
+            UNION ALL
+            SELECT id, name, 'removed' AS change FROM earlier
+            WHERE id NOT IN (SELECT id FROM current)
+            UNION ALL
+            SELECT id, name, 'changed' AS change FROM current
+            WHERE id IN (SELECT id FROM earlier)
+            AND (
+                id IN (SELECT ip_acg_id FROM changed_rules)
+                OR id IN (SELECT ip_acg_id FROM changed_associations)
+            )
+            ORDER BY name
+            """,
+            params,
+        )
+        return [{**row, **params} for row in rows]
+
+
+store = InventoryStore()
+
+
+def report_store(since: Optional[datetime] = None) -> None:
+    """
+    Report the IP ACGs with rules wider than /24, and the IP ACGs changed
+    since a point in time, from the store.
+
+    :param since: point in time (default: the generation before the latest)
+    """
+    wide_rules = store.get_wide_rules()
+    changes = store.get_changes(since)
+
+    if not output_is_table():
+        for row in wide_rules:
+            emit_record({"record": "wide_rule", **row})
+        for row in changes:
+            emit_record({"record": "change", **row})
+        return
+
+    logger.info(
+        f"[{len(wide_rules)}] rules wider than /{WIDE_PREFIX} in the inventory.",
+        extra={"depth": 1},
+    )
+    for row in wide_rules:
+        logger.info(
+            f"[{row['network']}] ({row['desc']}) in IP ACG "
+            f"[{row['id']} - {row['name']}].",
+            extra={"depth": 2},
+        )
+    logger.info(
+        f"[{len(changes)}] IP ACGs changed since "
+        f"[{since.isoformat() if since else 'the previous fetch'}].",
+        extra={"depth": 1},
+    )
+    for row in changes:
+        logger.info(
+            f"IP ACG [{row['id']} - {row['name']}] {row['change']}.",
+            extra={"depth": 2},
+        )
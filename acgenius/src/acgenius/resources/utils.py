@@ -1,14 +1,39 @@
+import io
 import logging
+import sys
 from textwrap import indent
-from typing import Union
-import pandas as pd
-from tabulate import tabulate
+from typing import Optional, TextIO, Union
 
 from acgenius.resources.ip_acgs.utils import format_rules
 from acgenius.resources.models import IP_ACG, Directory
+from acgenius.resources.output import emit_record, output_is_table, to_records
+from acgenius.telemetry.tracing import traced
 
 logger = logging.getLogger("acgenius")
 
+# Border characters per table format: (top, header separator, row separator, bottom)
+# with each line as (left, fill, junction, right), and the column separator.
+TABLE_FORMATS = {
+    "psql": {
+        "lines": (
+            ("+", "-", "+", "+"),
+            ("|", "-", "+", "|"),
+            None,
+            ("+", "-", "+", "+"),
+        ),
+        "sep": "|",
+    },
+    "fancy_grid": {
+        "lines": (
+            ("╒", "═", "╤", "╕"),
+            ("╞", "═", "╪", "╡"),
+            ("├", "─", "┼", "┤"),
+            ("╘", "═", "╧", "╛"),
+        ),
+        "sep": "│",
+    },
+}
+
 
 def specify_report(item: Union[Directory, IP_ACG]) -> dict:
     """
@@ -31,47 +56,110 @@ def specify_report(item: Union[Directory, IP_ACG]) -> dict:
         }
 
 
-def create_report(subject: Union[list[Directory], list[IP_ACG]], origin: str) -> None:
+def format_table(rows: list[tuple], headers: tuple, fmt: str) -> str:
+    """
+    Format rows as a text table, in the style of tabulate's 'psql' or 'fancy_grid'.
+
+    Cells are left-aligned; None is rendered as an empty cell.
+
+    :param rows: rows of cell values
+    :param headers: column headers
+    :param fmt: table format, key of TABLE_FORMATS
+    :return: formatted table
+    """
+    top, head_sep, row_sep, bottom = TABLE_FORMATS[fmt]["lines"]
+    sep = TABLE_FORMATS[fmt]["sep"]
+
+    cells = [["" if cell is None else str(cell) for cell in row] for row in rows]
+    widths = [len(header) + 2 for header in headers]
+    for row in cells:
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+
+    def line(chars: tuple) -> str:
+        left, fill, junction, right = chars
+        return f"{left}{junction.join(fill * (w + 2) for w in widths)}{right}"
+
+    def content(row: list) -> str:
+        padded = f" {sep} ".join(cell.ljust(w) for cell, w in zip(row, widths))
+        return f"{sep} {padded} {sep}"
+
+    body = [content(row) for row in cells]
+    if row_sep:
+        body = f"\n{line(row_sep)}\n".join(body).split("\n")
+
+    return "\n".join([line(top), content(headers), line(head_sep), *body, line(bottom)])
+
+
+def render_items(
+    items: Union[list[Directory], list[IP_ACG]], fmt: str, start: int = 1
+) -> str:
+    """
+    Render items of a single kind as one table, with an icon-numbered index.
+
+    :param items: list of Directories or IP_ACGs
+    :param fmt: table format
+    :param start: number of the first item in the index
+    :return: rendered table
+    """
+    icon = "□" if isinstance(items[0], Directory) else "■"
+    spec = specify_report(items[0])
+    headers = ("", "id", "name", *spec)
+    rows = [
+        (f"{icon} {i}", item.id, item.name, *specify_report(item).values())
+        for i, item in enumerate(items, start=start)
+    ]
+    return format_table(rows, headers, fmt)
+
+
+def render_rules(ip_acg: IP_ACG, fmt: str) -> str:
+    """
+    Render the rules of an IP ACG as a table.
+
+    :param ip_acg: IP ACG
+    :param fmt: table format
+    :return: rendered table
+    """
+    rows = [(rule["ipRule"], rule["ruleDesc"]) for rule in format_rules(ip_acg)]
+    return format_table(rows, ("rule", "description"), fmt)
+
+
+@traced("render_report")
+def create_report(
+    subject: Union[list[Directory], list[IP_ACG]],
+    origin: str,
+    stream: Optional[TextIO] = None,
+) -> None:
     """
     Create a report for a given subject.
 
+    Rows are collected as plain tuples and rendered per table,
+    into a buffer that is written to the stream at once.
+    If a machine-readable output format is selected, records are emitted instead.
+
     :param subject: list of Directories or IP_ACGs
     :param origin: origin of the report
+    :param stream: stream to write the report to (default: stdout)
     """
     logger.debug("Create report...", extra={"depth": 1})
 
-    data = []
-    fmt = "psql" if origin == "work_instruction" else "fancy_grid"
-
-    if subject:
-        i = 0
-        for item in subject:
-            i += 1
-            row = {"id": item.id, "name": item.name}
-            row.update(specify_report(item))
-            data.append(row)
-
-            df = pd.DataFrame(data)
-            icon = "□" if isinstance(item, Directory) else "■"
-            df.index = [f"{icon} {i}"]
-            subject_table = f"{tabulate(df, headers='keys', tablefmt=fmt)}"
-
-            if isinstance(item, IP_ACG):
-                rules_formatted = format_rules(item)
-                rules_table = [["rule", "description"]]
+    if not subject:
+        logger.warning("No item found for report.", extra={"depth": 1})
+        return
 
-                for item in rules_formatted:
-                    rules_table.append([item["ipRule"], item["ruleDesc"]])
+    if not output_is_table():
+        for record in to_records(subject, origin):
+            emit_record(record)
+        return
 
-                rules_table = tabulate(rules_table, headers="firstrow", tablefmt=fmt)
-                print(subject_table)
-                print("\____")
-                print(indent(rules_table, " " * 6))
-                print("\n")
-                data = []
+    fmt = "psql" if origin == "work_instruction" else "fancy_grid"
+    buffer = io.StringIO()
 
-            else:
-                print(f"\n{subject_table}\n")
+    if isinstance(subject[0], Directory):
+        buffer.write(f"\n{render_items(subject, fmt)}\n\n")
 
     else:
-        logger.warning("No item found for report.", extra={"depth": 1})
+        for i, ip_acg in enumerate(subject, start=1):
+            buffer.write(f"{render_items([ip_acg], fmt, start=i)}\n\\____\n")
+            buffer.write(f"{indent(render_rules(ip_acg, fmt), ' ' * 6)}\n\n\n")
+
+    (stream or sys.stdout).write(buffer.getvalue())
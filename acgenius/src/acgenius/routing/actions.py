@@ -1,18 +1,33 @@
 import logging
 
 from acgenius.config import STD_INSTR_README
+from acgenius.resources.directories.plan import get_unassociated, plan_associations
+from acgenius.resources.ip_acgs.plan import plan_ip_acgs
+from acgenius.resources.ip_acgs.tags import (
+    get_managed,
+    get_tag_concurrency,
+    plan_tags,
+    report_tags,
+)
 from acgenius.resources.ip_acgs.utils import match_ip_acgs
 from acgenius.resources.ip_acgs.work_instruction import (
     associate_ip_acg,
     create_ip_acg,
     delete_ip_acg,
     disassociate_ip_acg,
+    reconcile_tags,
     update_rules,
 )
-from acgenius.resources.models import AppInput
+from acgenius.resources.models import (
+    AppInput,
+    Directory,
+    Execution,
+)
+from acgenius.resources.store import report_store, store
 from acgenius.resources.utils import create_report
+from acgenius.routing.engine import run_concurrently
 from acgenius.routing.errors import process_error
-from acgenius.validation.directories import val_directories_specified
+from acgenius.routing.rollout import has_waves, roll_out
 
 logger = logging.getLogger("acgenius")
 
@@ -20,16 +35,25 @@ logger = logging.getLogger("acgenius")
 def status(app_input: AppInput) -> None:
     """
     Display status of current situation for IP ACGs.
+    With the inventory store enabled, also report the IP ACGs with wide rules,
+    and the IP ACGs changed since the previous fetch, or since --since.
 
     :param app_input: all input required for the action
-    (not required here, but required for the function signature)
     """
+    if store.enabled:
+        report_store(app_input.cli.get("since"))
+
     logger.info("✅ Completed display of status.", extra={"depth": 1})
 
 
 def create(app_input: AppInput) -> None:
     """
     Create new IP ACGs.
+    IP ACGs already in the inventory are skipped, without a call to AWS,
+    and only IP ACGs not yet associated with a directory are associated,
+    so a re-run after a partial failure only creates what is missing.
+    IP ACGs that list directories are associated with those only.
+    With rollout waves set, associations are rolled out wave by wave.
 
     :param app_input: all input required for the action
     """
@@ -39,25 +63,59 @@ def create(app_input: AppInput) -> None:
     work_instruction = app_input.settings.work_instruction
     inventory = app_input.inventory
 
-    create_report(subject=work_instruction.ip_acgs, origin="work_instruction")
+    plan = plan_ip_acgs(inventory.ip_acgs, work_instruction.ip_acgs)
+    existing = plan.update + plan.unchanged
+    for ip_acg in existing:
+        logger.info(
+            f"IP ACG [{ip_acg.name}] already exists with id [{ip_acg.id}]; "
+            "skip creation.",
+            extra={"depth": 2},
+        )
+    if plan.update:
+        logger.info(
+            f"[{len(plan.update)}] existing IP ACGs have other rules. "
+            "Run the 'update' action to apply them.",
+            extra={"depth": 2},
+        )
+
+    create_report(subject=plan.create, origin="work_instruction")
 
     if not cli["dryrun"]:
         tags = work_instruction.tags
 
-        if val_directories_specified(work_instruction):
-            directories = work_instruction.directories
-        else:
-            directories = inventory.directories
-
-        ip_acgs_created = []
-        for ip_acg in work_instruction.ip_acgs:
-            ip_acg_created = create_ip_acg(ip_acg, tags)
+        for ip_acg in plan.create:
+            create_ip_acg(ip_acg, tags)
 
-            if ip_acg_created:
-                ip_acgs_created.append(ip_acg_created)
-
-                for directory in directories:
-                    associate_ip_acg(ip_acgs_created, directory)
+        execution = app_input.settings.execution or Execution()
+        associations = plan_associations(work_instruction, inventory)
+        desired = {
+            directory.id: [ip_acg for ip_acg in ip_acgs if ip_acg.id]
+            for directory, ip_acgs in associations
+        }
+        directories = [
+            directory for directory, _ in associations if desired[directory.id]
+        ]
+
+        def associate_missing(directory: Directory) -> None:
+            ip_acgs_unassociated = get_unassociated(
+                desired[directory.id], directory, inventory
+            )
+            if ip_acgs_unassociated:
+                associate_ip_acg(ip_acgs_unassociated, directory)
+
+        if directories and has_waves(execution):
+            roll_out(
+                directories,
+                execution,
+                apply=associate_missing,
+                ip_acg_ids={
+                    directory_id: [ip_acg.id for ip_acg in ip_acgs]
+                    for directory_id, ip_acgs in desired.items()
+                },
+            )
+        else:
+            for directory in directories:
+                associate_missing(directory)
 
     logger.info(
         f"✅ Completed action: create IP ACGs{' (dryrun)' if cli['dryrun'] else ''}.",
@@ -67,7 +125,9 @@ def create(app_input: AppInput) -> None:
 
 def update(app_input: AppInput) -> None:
     """
-    Update rules of existing IP ACGs.
+    Update rules of existing IP ACGs whose rules differ from settings.yaml,
+    and reconcile their tags with settings.yaml:
+    only tags that differ are created or deleted, in parallel.
 
     :param app_input: all input required for the action
     """
@@ -81,9 +141,34 @@ def update(app_input: AppInput) -> None:
         match_ip_acgs(inventory, work_instruction)
         create_report(subject=work_instruction.ip_acgs, origin="work_instruction")
 
+        execution = app_input.settings.execution or Execution()
+        changes = plan_tags(
+            get_managed(work_instruction.ip_acgs, inventory),
+            work_instruction.tags,
+            execution,
+        )
+        report_tags(changes, cli["dryrun"])
+
+        plan = plan_ip_acgs(inventory.ip_acgs, work_instruction.ip_acgs)
+        if plan.create:
+            logger.warning(
+                f"⚠️  IP ACGs not found in AWS, skipped: "
+                f"{[ip_acg.name for ip_acg in plan.create]}. "
+                "Run the 'create' action to create them.",
+                extra={"depth": 1},
+            )
+        logger.info(
+            f"[{len(plan.update)}] IP ACGs with changed rules, "
+            f"[{len(plan.unchanged)}] unchanged.",
+            extra={"depth": 1},
+        )
+
         if not cli["dryrun"]:
-            for ip_acg in work_instruction.ip_acgs:
+            for ip_acg in plan.update:
                 update_rules(ip_acg)
+            run_concurrently(
+                reconcile_tags, changes, get_tag_concurrency(changes, execution)
+            )
 
     else:
         msg_generic = "Could not update IP ACGs."
@@ -127,7 +212,7 @@ def delete(app_input: AppInput) -> None:
                     disassociate_ip_acg(
                         ip_acg_ids_to_delete=[ip_acg_id], directory=directory
                     )
-                    delete_ip_acg(ip_acg_id)
+                delete_ip_acg(ip_acg_id)
 
     else:
         msg_generic = "Could not delete IP ACGs."
@@ -0,0 +1,345 @@
+import csv
+import gzip
+import io
+import logging
+from collections import Counter
+from itertools import islice
+from typing import Iterator, Optional, TextIO
+
+from acgenius.config import STD_INSTR_README
+from acgenius.resources.ip_acgs.lookup import (
+    IPLookupIndex,
+    build_lookup_index,
+    format_address,
+    get_numpy,
+    parse_address,
+)
+from acgenius.resources.ip_acgs.plan import plan_inventory
+from acgenius.resources.models import AppInput
+from acgenius.resources.output import emit_record, output_is_table
+from acgenius.routing.errors import get_error_code, process_error
+from acgenius.telemetry.tracing import span, traced
+
+logger = logging.getLogger("acgenius")
+
+# Lines read and parsed at once; memory does not grow with the log size.
+AUDIT_CHUNK_SIZE = 65536
+
+# Column names tried for the source address in CSV logs, in order.
+SOURCE_COLUMNS = ("source_ip", "src_ip", "client_ip", "src", "source", "ip")
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+# Changes in access of an address once settings.yaml is applied, as reported.
+CHANGES = ("kept", "opened", "locked_out", "denied")
+
+
+def open_log(path: str) -> TextIO:
+    """
+    Open a log file as text, gzipped or not (detected by its first bytes).
+
+    :param path: path of the log file
+    :return: text stream
+    """
+    try:
+        with open(path, "rb") as log_file:
+            gzipped = log_file.read(2) == GZIP_MAGIC
+        if gzipped:
+            return io.TextIOWrapper(gzip.open(path, "rb"), errors="replace")
+        return open(path, "r", errors="replace")
+
+    except Exception as e:
+        msg_generic = f"Could not read log [{path}]."
+        error_map = {
+            "FileNotFoundError": {
+                "msg": f"Please specify an existing file. {STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+def get_source_column(header: list[str], column: Optional[str] = None) -> int:
+    """
+    Get the position of the source address column in the header of a CSV log.
+
+    :param header: column names
+    :param column: name of the column, if specified
+    :return: position of the column
+    """
+    names = [name.strip().lower() for name in header]
+    for candidate in (column,) if column else SOURCE_COLUMNS:
+        if candidate.lower() in names:
+            return names.index(candidate.lower())
+
+    msg_generic = "Could not find the source address column in the log."
+    error_code = "AuditColumnException"
+    error_map = {
+        "AuditColumnException": {
+            "msg": f"Columns are {header}. "
+            "Please specify the column with --log-column. "
+            f"{STD_INSTR_README}",
+            "crash": True,
+        }
+    }
+    process_error(error_map, error_code, msg_generic)
+
+
+def read_addresses(stream: TextIO, column: Optional[str] = None) -> Iterator[str]:
+    """
+    Read the source addresses of a log, line by line: a plain list of
+    addresses, one per line, or a CSV log with a header.
+
+    :param stream: text stream of the log
+    :param column: name of the source address column of a CSV log
+    :return: iterator of addresses, as in the log
+    """
+    first = stream.readline()
+    if "," not in first and not column:
+        if first.strip():
+            yield first.strip()
+        for line in stream:
+            if line.strip():
+                yield line.strip()
+        return
+
+    position = get_source_column(next(csv.reader([first])), column)
+    for row in csv.reader(stream):
+        if len(row) > position:
+            yield row[position].strip()
+
+
+def get_admitting(index: IPLookupIndex) -> list[int]:
+    """
+    Get the rule admitting each interval of the index: the first matching rule
+    of an IP ACG associated with a directory.
+
+    :param index: lookup index
+    :return: position of the admitting rule in `index.rules` per interval,
+        -1 if denied
+    """
+    return [
+        next((i for i in matches if index.rules[i]["directory_ids"]), -1)
+        for matches in index.matches
+    ]
+
+
+def classify_addresses(
+    addresses: Iterator[str], current: IPLookupIndex, planned: IPLookupIndex
+) -> tuple[Counter, Counter, int]:
+    """
+    Classify the source addresses chunk by chunk, as they are read: look up
+    the rule admitting each address now and once applied. Vectorized with
+    numpy (uint32 addresses, np.searchsorted), if installed.
+
+    Hits are counted per pair of admitting rules, and per address only for
+    addresses that would be locked out, so memory does not grow with the
+    number of distinct addresses in the log.
+
+    :param addresses: iterator of addresses
+    :param current: lookup index of the rules in AWS
+    :param planned: lookup index of the rules once applied
+    :return: hits per pair of admitting rules (positions in the rules of the
+        indexes, -1 if denied), hits per locked out address (as integer),
+        and the number of invalid addresses
+    """
+    np = get_numpy()
+    current_admitting = get_admitting(current)
+    planned_admitting = get_admitting(planned)
+    if np is not None:
+        current_admitting = np.array(current_admitting, dtype=np.int64)
+        planned_admitting = np.array(planned_admitting, dtype=np.int64)
+    width = len(planned.rules) + 1
+
+    hits, locked_out, invalid = Counter(), Counter(), 0
+    while True:
+        chunk = list(islice(addresses, AUDIT_CHUNK_SIZE))
+        if not chunk:
+            return hits, locked_out, invalid
+
+        values = [parse_address(address) for address in chunk]
+        valid = [value for value in values if value is not None]
+        invalid += len(values) - len(valid)
+
+        if np is None:
+            pairs = zip(
+                (current_admitting[i] for i in current.search(valid)),
+                (planned_admitting[i] for i in planned.search(valid)),
+            )
+            for value, pair in zip(valid, pairs):
+                hits[pair] += 1
+                if pair[0] >= 0 and pair[1] < 0:
+                    locked_out[value] += 1
+            continue
+
+        array = np.array(valid, dtype=np.uint32)
+        current_rules = current_admitting[current.search_array(array)]
+        planned_rules = planned_admitting[planned.search_array(array)]
+        keys, counts = np.unique(
+            (current_rules + 1) * width + planned_rules + 1, return_counts=True
+        )
+        hits.update(
+            {
+                (key // width - 1, key % width - 1): count
+                for key, count in zip(keys.tolist(), counts.tolist())
+            }
+        )
+        locked_out.update(array[(current_rules >= 0) & (planned_rules < 0)].tolist())
+
+
+def get_change(current: Optional[dict], planned: Optional[dict]) -> str:
+    """
+    Get the change in access of an address once settings.yaml is applied.
+
+    :param current: admitting rule now, if any
+    :param planned: admitting rule once applied, if any
+    :return: 'locked_out', 'opened', 'kept' or 'denied'
+    """
+    if current and not planned:
+        return "locked_out"
+    if planned and not current:
+        return "opened"
+    return "kept" if current else "denied"
+
+
+@traced("audit_log")
+def audit_log(
+    app_input: AppInput, path: str, column: Optional[str] = None
+) -> list[dict]:
+    """
+    Classify the source addresses of a log against the rules in AWS,
+    and against the rules once settings.yaml is applied.
+
+    :param app_input: all input required for the action
+    :param path: path of the log, gzipped or not
+    :param column: name of the source address column of a CSV log
+    :return: 'audit' record per change and pair of admitting rules, with its
+        hits, followed by an 'audit_address' record per address that would be
+        locked out, with its hits
+    """
+    current = build_lookup_index(app_input.inventory)
+    planned = build_lookup_index(
+        plan_inventory(app_input.settings.work_instruction, app_input.inventory)
+    )
+    with span("audit_classify"):
+        with open_log(path) as stream:
+            hits, locked_out, invalid = classify_addresses(
+                read_addresses(stream, column), current, planned
+            )
+    if invalid:
+        logger.warning(
+            f"⚠️  Skipped [{invalid}] invalid addresses in the log.",
+            extra={"depth": 1},
+        )
+
+    records = []
+    for (current_position, planned_position), count in hits.items():
+        current_rule = current.rules[current_position] if current_position >= 0 else {}
+        planned_rule = planned.rules[planned_position] if planned_position >= 0 else {}
+        records.append(
+            {
+                "record": "audit",
+                "hits": count,
+                "status": "allowed" if current_rule else "denied",
+                "id": current_rule.get("id"),
+                "name": current_rule.get("name"),
+                "rule": current_rule.get("rule"),
+                "planned_status": "allowed" if planned_rule else "denied",
+                "planned_name": planned_rule.get("name"),
+                "planned_rule": planned_rule.get("rule"),
+                "change": get_change(current_rule, planned_rule),
+            }
+        )
+    records.sort(
+        key=lambda r: (
+            CHANGES.index(r["change"]),
+            -r["hits"],
+            r["name"] or r["planned_name"] or "",
+            r["rule"] or r["planned_rule"] or "",
+        )
+    )
+
+    admitting = get_admitting(current)
+    for value, count in sorted(locked_out.items()):
+        current_rule = current.rules[admitting[current.search([value])[0]]]
+        records.append(
+            {
+                "record": "audit_address",
+                "address": format_address(value),
+                "hits": count,
+                "status": "allowed",
+                "id": current_rule["id"],
+                "name": current_rule["name"],
+                "rule": current_rule["rule"],
+                "planned_status": "denied",
+                "change": "locked_out",
+            }
+        )
+    return records
+
+
+def report_audit(records: list[dict]) -> None:
+    """
+    Report the audit: a summary of hits per change, and the addresses
+    that would be locked out.
+
+    :param records: audit records
+    """
+    if not output_is_table():
+        for record in records:
+            emit_record(record)
+        return
+
+    hits = Counter()
+    for record in records:
+        if record["record"] == "audit":
+            hits[record["change"]] += record["hits"]
+    addresses = [record for record in records if record["record"] == "audit_address"]
+    for change in CHANGES:
+        logger.info(f"[{change}]: [{hits[change]}] hits.", extra={"depth": 1})
+    if addresses:
+        logger.info(
+            f"[locked_out]: [{len(addresses)}] addresses.", extra={"depth": 1}
+        )
+
+    for record in addresses:
+        logger.warning(
+            f"⚠️  [{record['address']}] ([{record['hits']}] hits), now allowed "
+            f"by IP ACG [{record['name']}] rule [{record['rule']}], "
+            "would be denied once settings.yaml is applied.",
+            extra={"depth": 2},
+        )
+
+
+def audit(app_input: AppInput) -> None:
+    """
+    Audit a connection or access log against the IP ACG rules: classify each
+    source address as allowed (and by which IP ACG) or denied, now and once
+    settings.yaml is applied, to find active users a rule change would lock out.
+    The log is streamed and classified in chunks; nothing is changed in AWS.
+
+    :param app_input: all input required for the action
+    """
+    logger.debug("Action: audit log...", extra={"depth": 1})
+
+    cli = app_input.cli
+    if not cli.get("log_file"):
+        msg_generic = "Could not audit log."
+        error_code = "AuditLogMissingException"
+        error_map = {
+            "AuditLogMissingException": {
+                "msg": f"Please specify the log with --log-file. {STD_INSTR_README}",
+                "crash": True,
+            }
+        }
+        process_error(error_map, error_code, msg_generic)
+
+    records = audit_log(app_input, cli["log_file"], cli.get("log_column"))
+    report_audit(records)
+
+    hits = sum(record["hits"] for record in records if record["record"] == "audit")
+    logger.info(
+        f"✅ Completed action: audit [{hits}] hits of [{cli['log_file']}].",
+        extra={"depth": 1},
+    )
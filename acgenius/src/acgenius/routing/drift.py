@@ -0,0 +1,257 @@
+import hashlib
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from acgenius.resources.directories.plan import get_ip_acg_directories
+from acgenius.resources.ip_acgs.utils import index_latest
+from acgenius.resources.models import AppInput, Directory, Inventory, Rule
+from acgenius.resources.output import (
+    NDJSONWriter,
+    RecordWriter,
+    emit_record,
+    output_is_table,
+)
+from acgenius.routing.watch import REFRESH_INTERVAL_DEFAULT, refresh_inventory
+
+logger = logging.getLogger("acgenius")
+
+
+def get_digest(rules: Iterable[Rule], directory_ids: Iterable[str]) -> str:
+    """
+    Get a digest of the rule set and associations of an IP ACG.
+    Rules are canonicalized and sorted, so notation and order do not matter.
+
+    :param rules: rules of the IP ACG
+    :param directory_ids: ids of the directories the IP ACG is associated with
+    :return: sha256 hex digest
+    """
+    rule_lines = sorted(f"{rule.network}\t{rule.desc}" for rule in rules)
+    directory_lines = sorted(directory_ids)
+    content = "\n".join(rule_lines + ["--"] + directory_lines)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def get_associations(directories: list[Directory]) -> dict[str, list[str]]:
+    """
+    Get the ids of the directories per associated IP ACG id.
+
+    :param directories: directories of the inventory
+    :return: directory ids per IP ACG id
+    """
+    associations = {}
+    for directory in directories or []:
+        for ip_acg_id in directory.ip_acgs or []:
+            associations.setdefault(ip_acg_id, []).append(directory.id)
+    return associations
+
+
+def get_inventory_digests(inventory: Inventory) -> dict[str, tuple[str, str]]:
+    """
+    Get the id and digest of each IP ACG in the inventory, by name.
+    Rotated IP ACGs are reported by base name, as their latest version.
+
+    :param inventory: Inventory object
+    :return: (id, digest) per IP ACG name
+    """
+    associations = get_associations(inventory.directories)
+    return {
+        name: (
+            ip_acg.id,
+            get_digest(ip_acg.rules, associations.get(ip_acg.id, [])),
+        )
+        for name, ip_acg in index_latest(inventory.ip_acgs).items()
+    }
+
+
+def get_desired_digests(app_input: AppInput, inventory: Inventory) -> dict[str, str]:
+    """
+    Get the digest of each IP ACG as the validated work instruction specifies it,
+    associated with the directories it lists, or else the specified directories,
+    or else all directories.
+
+    :param app_input: all input required for the action
+    :param inventory: Inventory object, for the directories if none specified
+    :return: digest per IP ACG name
+    """
+    work_instruction = app_input.settings.work_instruction
+    return {
+        ip_acg.name: get_digest(
+            ip_acg.rules,
+            [
+                directory.id
+                for directory in get_ip_acg_directories(
+                    ip_acg, work_instruction, inventory
+                )
+            ],
+        )
+        for ip_acg in work_instruction.ip_acgs
+    }
+
+
+def get_drift_status(name: str, digest: Optional[str], desired: dict) -> str:
+    """
+    Get the drift status of an IP ACG.
+
+    :param name: IP ACG name
+    :param digest: digest in AWS, None if absent
+    :param desired: desired digest per IP ACG name
+    :return: 'in_sync', 'drifted', 'missing' or 'unmanaged'
+    """
+    if name not in desired:
+        return "unmanaged"
+    if digest is None:
+        return "missing"
+    return "in_sync" if digest == desired[name] else "drifted"
+
+
+def get_change(digest: Optional[str], previous_digest: Optional[str]) -> str:
+    """
+    Get the kind of change of an IP ACG digest since the previous poll.
+
+    :param digest: digest in AWS, None if absent
+    :param previous_digest: digest in AWS at the previous poll, None if absent
+    :return: 'new', 'changed' or 'removed'
+    """
+    if previous_digest is None:
+        return "new"
+    if digest is None:
+        return "removed"
+    return "changed"
+
+
+def detect_drift(
+    app_input: AppInput, inventory: Inventory, previous: Optional[dict] = None
+) -> tuple[dict, list[dict]]:
+    """
+    Compare the digests of the inventory with those of the previous poll,
+    and report only the IP ACGs whose digest changed.
+    Without a previous poll, all IP ACGs are reported, as baseline.
+
+    :param app_input: all input required for the action
+    :param inventory: freshly fetched Inventory object
+    :param previous: (id, digest) per IP ACG name of the previous poll, if any
+    :return: (id, digest) per IP ACG name of this poll, and drift records
+    """
+    current = get_inventory_digests(inventory)
+    desired = get_desired_digests(app_input, inventory)
+    polled_at = datetime.now().isoformat()
+    baseline = previous is None
+    previous = previous or {}
+
+    records = []
+    for name in sorted(set(current) | set(previous) | set(desired)):
+        ip_acg_id, digest = current.get(name, (None, None))
+        previous_id, previous_digest = previous.get(name, (None, None))
+        if digest == previous_digest and not baseline:
+            continue
+
+        records.append(
+            {
+                "record": "drift",
+                "time": polled_at,
+                "name": name,
+                "id": ip_acg_id or previous_id,
+                "status": get_drift_status(name, digest, desired),
+                "change": "baseline"
+                if baseline
+                else get_change(digest, previous_digest),
+                "digest": digest,
+                "previous_digest": previous_digest,
+                "desired_digest": desired.get(name),
+            }
+        )
+
+    return current, records
+
+
+def report_drift(record: dict, writer: Optional[RecordWriter] = None) -> None:
+    """
+    Report a drift record: to the writer, if any, or else to the selected output.
+    For 'table', the change is logged.
+
+    :param record: drift record
+    :param writer: writer for the drift records
+    """
+    if writer is not None:
+        writer.write(record)
+    elif not output_is_table():
+        emit_record(record)
+    else:
+        logger.info(
+            f"[{record['name']}] ({record['id']}): {record['change']}, "
+            f"{record['status']}.",
+            extra={"depth": 2},
+        )
+
+
+def drift(
+    app_input: AppInput,
+    cycles: Optional[int] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    writer: Optional[RecordWriter] = None,
+) -> None:
+    """
+    Poll the inventory, and report IP ACGs whose rules or associations changed
+    since the previous poll, with their drift against the work instruction.
+
+    A poll costs the paginated describe calls of the inventory and a digest
+    comparison per IP ACG. The first poll reports all IP ACGs, as baseline.
+    Records are appended as NDJSON to the drift file, if any, or else written in the
+    selected output format; for 'table', changes are logged. Stop with Ctrl+C.
+
+    :param app_input: all input required for the action
+    :param cycles: number of polls (default: until interrupted)
+    :param sleep: function to wait between polls
+    :param writer: writer for the drift records (default: NDJSON to the drift file,
+        if any, or else the selected output)
+    """
+    cli = app_input.cli
+    interval = cli.get("refresh_interval") or REFRESH_INTERVAL_DEFAULT
+    drift_file = cli.get("drift_file")
+
+    logger.info(
+        f"Poll inventory for drift every [{interval}] s, "
+        f"report to [{drift_file or 'stdout'}]. Stop with Ctrl+C.",
+        extra={"depth": 1},
+    )
+
+    stream = open(drift_file, "a") if drift_file and writer is None else None
+    if stream:
+        writer = NDJSONWriter(stream)
+
+    inventory = app_input.inventory
+    digests = None
+    cycle = 0
+
+    try:
+        while cycles is None or cycle < cycles:
+            cycle += 1
+            try:
+                if cycle > 1:
+                    inventory = refresh_inventory()
+                digests, records = detect_drift(app_input, inventory, digests)
+                for record in records:
+                    report_drift(record, writer)
+
+                logger.info(
+                    f"Poll [{cycle}]: [{len(records)}] IP ACGs changed.",
+                    extra={"depth": 1},
+                )
+            except SystemExit:
+                logger.warning(
+                    "⚠️  Poll failed. Retrying at the next poll...", extra={"depth": 1}
+                )
+
+            if cycles is None or cycle < cycles:
+                sleep(interval)
+
+    except KeyboardInterrupt:
+        logger.info("Stopped polling.", extra={"depth": 1})
+
+    finally:
+        if stream:
+            stream.close()
+
+    logger.info("✅ Completed action: drift.", extra={"depth": 1})
@@ -0,0 +1,153 @@
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator
+
+from acgenius.config import get_workspaces, set_workspaces
+from acgenius.telemetry.metrics import instrument
+
+logger = logging.getLogger("acgenius")
+
+
+class RateLimiter:
+    """
+    Limit the rate of calls with a token bucket, shared by all threads.
+
+    Tokens are added at `rate` per second, up to `burst`; each call takes one,
+    and waits for it if the bucket is empty.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        :param rate: tokens added per second
+        :param burst: maximum tokens in the bucket
+        :param clock: clock, in seconds
+        :param sleep: function to wait for a token
+        """
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting until one is available.
+
+        :return: time waited, in seconds
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if wait:
+            self.sleep(wait)
+        return wait
+
+
+class RateLimitedWorkSpaces:
+    """
+    Wrap a WorkSpaces client, to take a token of the rate limiter for every call.
+    Calls are instrumented inside the limiter, so recorded latencies exclude
+    the wait for a token.
+    """
+
+    instruments_calls = True
+
+    def __init__(self, client: Any, limiter: RateLimiter) -> None:
+        self.client = client
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.client, name)
+        if not callable(attr):
+            return attr
+
+        call = instrument(name, attr)
+
+        def limited(*args, **kwargs) -> Any:
+            self.limiter.acquire()
+            return call(*args, **kwargs)
+
+        return limited
+
+
+def limit_workspaces(rate_limit: float) -> Any:
+    """
+    Limit the rate of all WorkSpaces calls from now on: wrap the client
+    with a single rate limiter, shared by all concurrent operations.
+
+    :param rate_limit: maximum number of calls per second
+    :return: client before wrapping, to restore after the run
+    """
+    client = get_workspaces()
+    set_workspaces(RateLimitedWorkSpaces(client, RateLimiter(rate_limit)))
+    return client
+
+
+class KeyedLocks:
+    """
+    Hand out a lock per key, e.g. per IP ACG name, created at first use.
+    """
+
+    def __init__(self) -> None:
+        self.guard = threading.Lock()
+        self.locks: dict[str, threading.Lock] = {}
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Hold the lock of a key for the enclosed block.
+
+        :param key: key, e.g. IP ACG name
+        """
+        with self.guard:
+            key_lock = self.locks.setdefault(key, threading.Lock())
+        with key_lock:
+            yield
+
+
+def run_concurrently(fn: Callable, items: Iterable, concurrency: int) -> list:
+    """
+    Call a function for each item, on a pool of threads.
+    Each call runs in a copy of the caller's context (contextvars).
+    An exception (including the SystemExit of a crashing error) is raised
+    once all calls have finished.
+
+    :param fn: function to call with each item
+    :param items: items
+    :param concurrency: maximum number of concurrent calls
+    :return: results, in order of the items
+    """
+    items = list(items)
+    if concurrency <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+
+    logger.debug(
+        "Run [%s] calls with concurrency [%s]...",
+        len(items),
+        concurrency,
+        extra={"depth": 2},
+    )
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, fn, item) for item in items
+        ]
+
+    return [future.result() for future in futures]
@@ -2,8 +2,6 @@ import logging
 import sys
 from typing import Optional
 
-from botocore.exceptions import ClientError
-
 from acgenius.config import EXC_UNEXPECTED_GENERIC, EXIT_APP
 
 logger = logging.getLogger("acgenius")
@@ -12,6 +10,8 @@ logger = logging.getLogger("acgenius")
 def get_error_code(e: Exception) -> str:
     """
     Get error code in exception style.
+    For a botocore ClientError, this is the error code in the AWS response.
+    The type is compared by name, so that botocore is not imported for it.
 
     :param e: Exception
     :return: error code
@@ -19,7 +19,7 @@ def get_error_code(e: Exception) -> str:
     exception_type = type(e).__name__
 
     error_code = str(exception_type)
-    if exception_type == ClientError:
+    if exception_type == "ClientError":
         error_code = e.response["Error"]["Code"]
 
     return error_code
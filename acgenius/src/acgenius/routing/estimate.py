@@ -0,0 +1,291 @@
+import json
+import logging
+import math
+from typing import Optional
+
+from acgenius.config import STD_INSTR_README
+from acgenius.resources.directories.plan import get_unassociated, plan_associations
+from acgenius.resources.ip_acgs.plan import plan_ip_acgs
+from acgenius.resources.ip_acgs.tags import get_managed, plan_tags
+from acgenius.resources.models import AppInput, Execution
+from acgenius.resources.output import emit_record, output_is_table
+from acgenius.resources.utils import format_table
+from acgenius.routing.rollout import DESCRIBE_DIRECTORIES_MAX, get_waves, has_waves
+from acgenius.routing.rotate import get_rotation_directories, get_rotations
+from acgenius.routing.sync import count_sync_calls, plan_sync
+from acgenius.routing.errors import get_error_code, process_error
+from acgenius.telemetry.metrics import metrics
+
+logger = logging.getLogger("acgenius")
+
+# Latency per call, if neither a latency profile nor this run measured it.
+DEFAULT_LATENCY_MS = 250.0
+
+
+def count_checks(directories: list, execution: Execution) -> int:
+    """
+    Count the describe calls of a single check of each rollout wave.
+
+    :param directories: directories to roll out to
+    :param execution: execution settings, with the rollout waves
+    :return: number of describe calls
+    """
+    return sum(
+        math.ceil(len(wave) / DESCRIBE_DIRECTORIES_MAX)
+        for wave in get_waves(directories, execution)
+    )
+
+
+def count_calls(app_input: AppInput) -> dict[str, int]:
+    """
+    Count the calls per WorkSpaces operation the action would make, without dryrun.
+    This follows the action routes: e.g. 'create' skips existing IP ACGs,
+    and associates per directory only the IP ACGs not associated yet;
+    'update' updates only existing IP ACGs whose rules changed.
+    A single check per rollout wave is counted.
+
+    :param app_input: all input required for the action
+    :return: number of calls per client method, e.g. 'create_ip_group'
+    """
+    cli = app_input.cli
+    work_instruction = app_input.settings.work_instruction
+    inventory = app_input.inventory
+    execution = app_input.settings.execution or Execution()
+    calls = {}
+
+    if cli["action"] == "create":
+        plan = plan_ip_acgs(inventory.ip_acgs, work_instruction.ip_acgs)
+        associations = plan_associations(work_instruction, inventory)
+        directories = [directory for directory, ip_acgs in associations if ip_acgs]
+
+        calls["create_ip_group"] = len(plan.create)
+        calls["associate_ip_groups"] = sum(
+            1
+            for directory, ip_acgs in associations
+            if get_unassociated(ip_acgs, directory, inventory)
+        )
+        if directories and has_waves(execution):
+            calls["describe_workspace_directories"] = count_checks(
+                directories, execution
+            )
+
+    elif cli["action"] == "update":
+        plan = plan_ip_acgs(inventory.ip_acgs, work_instruction.ip_acgs)
+        calls["update_rules_of_ip_group"] = len(plan.update)
+        changes = plan_tags(
+            get_managed(work_instruction.ip_acgs, inventory),
+            work_instruction.tags,
+            execution,
+        )
+        calls["create_tags"] = sum(1 for _, to_create, _ in changes if to_create)
+        calls["delete_tags"] = sum(1 for _, _, to_delete in changes if to_delete)
+
+    elif cli["action"] == "rotate":
+        for _, current in get_rotations(work_instruction, inventory):
+            directories = get_rotation_directories(current, work_instruction, inventory)
+            for operation, amount in (
+                ("create_ip_group", 1),
+                ("associate_ip_groups", len(directories)),
+                (
+                    "describe_workspace_directories",
+                    count_checks(directories, execution),
+                ),
+                ("disassociate_ip_groups", len(directories)),
+                ("delete_ip_group", 1),
+            ):
+                calls[operation] = calls.get(operation, 0) + amount
+
+    elif cli["action"] == "sync":
+        sync_plan = plan_sync(
+            work_instruction, inventory, prune=cli["prune"], execution=execution
+        )
+        calls = count_sync_calls(sync_plan)
+
+    elif cli["action"] == "delete":
+        ip_acg_ids = cli["ip_acg_ids_to_delete"] or ()
+        calls["disassociate_ip_groups"] = len(ip_acg_ids) * len(
+            inventory.directories or []
+        )
+        calls["delete_ip_group"] = len(ip_acg_ids)
+
+    return {operation: amount for operation, amount in calls.items() if amount}
+
+
+def get_latency_profile(path: Optional[str]) -> dict[str, dict]:
+    """
+    Get the latency per operation from the stats of an earlier run,
+    as written with --stats-file.
+
+    :param path: path of the stats JSON file, if any
+    :return: p50 and p95 latency in ms per operation
+    """
+    if not path:
+        return {}
+
+    try:
+        with open(path, "r") as profile_file:
+            operations = json.load(profile_file)["operations"]
+        return {
+            operation: {"p50_ms": stats["p50_ms"], "p95_ms": stats["p95_ms"]}
+            for operation, stats in operations.items()
+        }
+
+    except Exception as e:
+        msg_generic = f"Could not load latency profile [{path}]."
+        error_map = {
+            "FileNotFoundError": {
+                "msg": "Please specify a file written with --stats-file. "
+                f"{STD_INSTR_README}",
+                "crash": True,
+            },
+            "JSONDecodeError": {
+                "msg": "Please specify a file written with --stats-file.",
+                "crash": True,
+            },
+            "KeyError": {
+                "msg": "Please specify a file written with --stats-file.",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+def get_duration(calls: int, latency_ms: float, execution: Execution) -> float:
+    """
+    Get the expected duration of a number of calls of one operation:
+    the calls run `concurrency` at a time, but never faster than the rate limit.
+
+    :param calls: number of calls
+    :param latency_ms: latency per call, in ms
+    :param execution: concurrency and rate limit
+    :return: duration, in seconds
+    """
+    by_latency = math.ceil(calls / execution.concurrency) * latency_ms / 1000
+    by_rate = calls / execution.rate_limit
+    return max(by_latency, by_rate)
+
+
+def estimate(
+    calls: dict[str, int],
+    profile: dict[str, dict],
+    execution: Execution,
+    measured: Optional[dict] = None,
+) -> dict:
+    """
+    Estimate the calls and duration of a run.
+    Latencies are taken from the profile, else from the calls measured in this
+    run, else the default. Operations run one after another, as in the routes.
+
+    :param calls: number of calls per operation still to be made
+    :param profile: p50 and p95 latency in ms per operation
+    :param execution: concurrency and rate limit
+    :param measured: summary of the calls made in this run (e.g. the inventory)
+    :return: calls, latency and duration per operation, plus totals
+    """
+    measured = measured or {"operations": {}}
+    operations = {}
+
+    for operation, stats in measured["operations"].items():
+        operations[operation] = {
+            "calls": stats["calls"],
+            "source": "measured",
+            "p50_ms": stats["p50_ms"],
+            "p95_ms": stats["p95_ms"],
+            "expected_s": stats["total_ms"] / 1000,
+            "upper_s": stats["total_ms"] / 1000,
+        }
+
+    for operation, amount in calls.items():
+        if operation in profile:
+            latency, source = profile[operation], "profile"
+        elif operation in measured["operations"]:
+            latency, source = measured["operations"][operation], "run"
+        else:
+            latency = {"p50_ms": DEFAULT_LATENCY_MS, "p95_ms": DEFAULT_LATENCY_MS}
+            source = "default"
+
+        operations[operation] = {
+            "calls": amount,
+            "source": source,
+            "p50_ms": latency["p50_ms"],
+            "p95_ms": latency["p95_ms"],
+            "expected_s": get_duration(amount, latency["p50_ms"], execution),
+            "upper_s": get_duration(amount, latency["p95_ms"], execution),
+        }
+
+    return {
+        "calls": sum(op["calls"] for op in operations.values()),
+        "expected_s": sum(op["expected_s"] for op in operations.values()),
+        "upper_s": sum(op["upper_s"] for op in operations.values()),
+        "concurrency": execution.concurrency,
+        "rate_limit": execution.rate_limit,
+        "operations": operations,
+    }
+
+
+def format_estimate(run_estimate: dict) -> str:
+    """
+    Render an estimate as a human readable table.
+
+    :param run_estimate: estimate from `estimate`
+    :return: rendered estimate
+    """
+    rows = [
+        (
+            operation,
+            stats["calls"],
+            stats["source"],
+            f"{stats['p50_ms']:.1f}",
+            f"{stats['p95_ms']:.1f}",
+            f"{stats['expected_s']:.1f}",
+            f"{stats['upper_s']:.1f}",
+        )
+        for operation, stats in run_estimate["operations"].items()
+    ]
+    table = format_table(
+        rows,
+        (
+            "operation",
+            "calls",
+            "source",
+            "p50 [ms]",
+            "p95 [ms]",
+            "expected [s]",
+            "upper [s]",
+        ),
+        "psql",
+    )
+    return (
+        f"{table}\n"
+        f"Calls: {run_estimate['calls']}, "
+        f"expected duration: {run_estimate['expected_s']:.1f} s "
+        f"(upper: {run_estimate['upper_s']:.1f} s), "
+        f"at concurrency {run_estimate['concurrency']} "
+        f"and {run_estimate['rate_limit']} calls/s\n"
+    )
+
+
+def report_estimate(app_input: AppInput) -> None:
+    """
+    Report the calls and duration the action would take, without dryrun.
+
+    :param app_input: all input required for the action
+    """
+    logger.debug("Estimate calls and duration of the action...", extra={"depth": 1})
+
+    run_estimate = estimate(
+        calls=count_calls(app_input),
+        profile=get_latency_profile(app_input.cli.get("latency_profile")),
+        execution=app_input.settings.execution or Execution(),
+        measured=metrics.summary(),
+    )
+
+    if output_is_table():
+        logger.info(
+            "Estimate of the run without dryrun:\n%s",
+            format_estimate(run_estimate),
+            extra={"depth": 1},
+        )
+    else:
+        emit_record({"record": "estimate", **run_estimate})
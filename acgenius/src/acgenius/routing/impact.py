@@ -0,0 +1,201 @@
+import logging
+from typing import Optional
+
+from acgenius.resources.ip_acgs.intervals import (
+    Interval,
+    count_interval_addresses,
+    get_address_space,
+    get_covered,
+    merge_intervals,
+    subtract_intervals,
+    to_networks,
+)
+from acgenius.resources.ip_acgs.lookup import format_address, parse_address
+from acgenius.resources.ip_acgs.plan import plan_inventory
+from acgenius.resources.models import AppInput, Inventory
+from acgenius.resources.output import emit_record, output_is_table
+from acgenius.routing.lookup import get_addresses
+from acgenius.telemetry.tracing import traced
+
+logger = logging.getLogger("acgenius")
+
+
+def get_ip_acg_spaces(inventory: Inventory) -> dict[str, list[Interval]]:
+    """
+    Get the address space each IP ACG admits.
+
+    :param inventory: Inventory object
+    :return: interval set per IP ACG id
+    """
+    return {
+        ip_acg.id: get_address_space(ip_acg.rules or [])
+        for ip_acg in inventory.ip_acgs or []
+    }
+
+
+def get_directory_spaces(
+    inventory: Inventory, ip_acg_spaces: dict[str, list[Interval]]
+) -> dict[str, list[Interval]]:
+    """
+    Get the address space each directory admits: the union of the address
+    spaces of its associated IP ACGs.
+
+    :param inventory: Inventory object
+    :param ip_acg_spaces: interval set per IP ACG id
+    :return: interval set per directory id
+    """
+    return {
+        directory.id: merge_intervals(
+            interval
+            for ip_acg_id in directory.ip_acgs or []
+            for interval in ip_acg_spaces.get(ip_acg_id, [])
+        )
+        for directory in inventory.directories or []
+    }
+
+
+def get_impact(
+    scope: str,
+    key: str,
+    name: str,
+    current: list[Interval],
+    planned: list[Interval],
+    clients: list[int],
+) -> Optional[dict]:
+    """
+    Get the impact of a change in address space: the address space gained and
+    lost, as networks, and the known clients that lose access.
+
+    :param scope: 'ip_acg' or 'directory'
+    :param key: id of the IP ACG or directory
+    :param name: name of the IP ACG or directory
+    :param current: interval set now
+    :param planned: interval set once applied
+    :param clients: known client addresses, as integers
+    :return: impact record, None if the address space is unchanged
+    """
+    gained = subtract_intervals(planned, current)
+    lost = subtract_intervals(current, planned)
+    if not gained and not lost:
+        return None
+
+    return {
+        "record": "impact",
+        "scope": scope,
+        "id": key,
+        "name": name,
+        "gained": [str(network) for network in to_networks(gained)],
+        "lost": [str(network) for network in to_networks(lost)],
+        "gained_addresses": count_interval_addresses(gained),
+        "lost_addresses": count_interval_addresses(lost),
+        "clients_lost": [format_address(value) for value in get_covered(lost, clients)],
+    }
+
+
+@traced("analyze_impact")
+def analyze_impact(
+    current: Inventory, planned: Inventory, clients: Optional[list[int]] = None
+) -> list[dict]:
+    """
+    Compare the address space each IP ACG and each directory admits now
+    with what it admits in the planned inventory, as interval set differences.
+    Only IP ACGs and directories whose address space changes are reported.
+
+    :param current: Inventory object, now
+    :param planned: Inventory object, once applied
+    :param clients: known client addresses, as integers, sorted
+    :return: impact records, first of IP ACGs, then of directories
+    """
+    clients = clients or []
+    current_spaces = get_ip_acg_spaces(current)
+    planned_spaces = get_ip_acg_spaces(planned)
+
+    names = {
+        ip_acg.id: ip_acg.name
+        for ip_acg in (current.ip_acgs or []) + (planned.ip_acgs or [])
+    }
+    impacts = [
+        get_impact(
+            "ip_acg",
+            ip_acg_id,
+            names[ip_acg_id],
+            current_spaces.get(ip_acg_id, []),
+            planned_spaces.get(ip_acg_id, []),
+            clients,
+        )
+        for ip_acg_id in dict.fromkeys(list(current_spaces) + list(planned_spaces))
+    ]
+
+    current_directories = get_directory_spaces(current, current_spaces)
+    planned_directories = get_directory_spaces(planned, planned_spaces)
+    impacts += [
+        get_impact(
+            "directory",
+            directory.id,
+            directory.name,
+            current_directories.get(directory.id, []),
+            planned_directories.get(directory.id, []),
+            clients,
+        )
+        for directory in current.directories or []
+    ]
+    return [impact for impact in impacts if impact]
+
+
+def report_impact(impacts: list[dict]) -> None:
+    """
+    Report the address space gained and lost per IP ACG and per directory,
+    and the known clients that would lose access.
+
+    :param impacts: impact records
+    """
+    if not output_is_table():
+        for impact in impacts:
+            emit_record(impact)
+        return
+
+    if not impacts:
+        logger.info("No address space gained or lost.", extra={"depth": 1})
+
+    for impact in impacts:
+        scope = "IP ACG" if impact["scope"] == "ip_acg" else "Directory"
+        logger.info(
+            f"{scope} [{impact['id']} - {impact['name']}]: "
+            f"gains [{impact['gained_addresses']}] addresses {impact['gained']}, "
+            f"loses [{impact['lost_addresses']}] addresses {impact['lost']}.",
+            extra={"depth": 1},
+        )
+        if impact["clients_lost"]:
+            logger.warning(
+                f"⚠️  Known clients that would lose access: {impact['clients_lost']}.",
+                extra={"depth": 2},
+            )
+
+
+def impact(app_input: AppInput) -> None:
+    """
+    Analyze the impact of settings.yaml before an 'update' or 'sync': which
+    address space each IP ACG and each directory gains and loses, and which
+    known clients (--address, --address-file) would lose access.
+    Nothing is changed in AWS.
+
+    :param app_input: all input required for the action
+    """
+    logger.debug("Action: analyze impact...", extra={"depth": 1})
+
+    clients = sorted(
+        {
+            value
+            for value in map(parse_address, get_addresses(app_input.cli))
+            if value is not None
+        }
+    )
+    planned = plan_inventory(app_input.settings.work_instruction, app_input.inventory)
+    impacts = analyze_impact(app_input.inventory, planned, clients)
+    report_impact(impacts)
+
+    logger.info(
+        f"✅ Completed action: analyze impact, [{len(impacts)}] IP ACGs "
+        "and directories changed.",
+        extra={"depth": 1},
+    )
@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional, TextIO
+
+from acgenius.config import STD_INSTR_README
+from acgenius.resources.output import emit_result
+from acgenius.routing.errors import get_error_code, process_error
+
+logger = logging.getLogger("acgenius")
+
+
+class Journal:
+    """
+    Write-ahead journal of the operations applied in AWS, as JSON lines.
+
+    Each operation is recorded as 'planned' before its call, and as 'completed'
+    (with the ids returned) or 'failed' after it. Entries are flushed to disk
+    one by one, so the journal survives a crash halfway a rollout.
+
+    On resume, the completed operations of an earlier journal are loaded, and
+    skipped when they come up again; the journal is appended to.
+    Operations are identified by name and key, e.g. the IP ACG name for a
+    create, or the directory and IP ACG ids for an association.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.path: Optional[str] = None
+        self.stream: Optional[TextIO] = None
+        self.completed: dict[tuple[str, str], dict] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.stream is not None
+
+    def start(self, path: str, resume: bool = False) -> None:
+        """
+        Start journaling operations to a file.
+
+        :param path: path of the journal file
+        :param resume: load completed operations of the journal, to skip them
+        """
+        self.completed = load_completed(path) if resume else {}
+        self.path = path
+        self.stream = open(path, "a" if resume else "w")
+
+        logger.info(
+            f"{'Resume from' if resume else 'Journal operations to'} [{path}]"
+            f"{f', [{len(self.completed)}] operations completed' if resume else ''}.",
+            extra={"depth": 1},
+        )
+
+    def stop(self) -> None:
+        """
+        Stop journaling, and close the journal file.
+        """
+        with self.lock:
+            if self.stream:
+                self.stream.close()
+            self.stream = None
+
+    def get_completed(self, operation: str, key: str) -> Optional[dict]:
+        """
+        Get the completed entry of an operation, from the resumed journal.
+
+        :param operation: operation, e.g. 'create_ip_group'
+        :param key: key of the operation, e.g. the IP ACG name
+        :return: completed entry, if any
+        """
+        return self.completed.get((operation, key))
+
+    def resume(self, operation: str, key: str) -> Optional[dict]:
+        """
+        See if an operation was completed in the resumed journal; if so,
+        report that it is skipped. Each completed entry is skipped once.
+
+        :param operation: operation, e.g. 'create_ip_group'
+        :param key: key of the operation, e.g. the IP ACG name
+        :return: completed entry, if any
+        """
+        entry = self.completed.pop((operation, key), None)
+        if entry:
+            logger.info(
+                f"☑ Skipped [{operation}] of [{key}]: completed before, "
+                "according to the journal.",
+                extra={"depth": 2},
+            )
+            emit_result(operation, status="resumed", key=key)
+        return entry
+
+    def record(self, event: str, operation: str, key: str, **fields) -> None:
+        """
+        Append an entry to the journal, and flush it to disk.
+
+        :param event: 'planned', 'completed' or 'failed'
+        :param operation: operation, e.g. 'create_ip_group'
+        :param key: key of the operation, e.g. the IP ACG name
+        :param fields: details, e.g. ids returned by AWS
+        """
+        if not self.enabled:
+            return
+
+        entry = {
+            "time": datetime.now().isoformat(),
+            "event": event,
+            "operation": operation,
+            "key": key,
+            **fields,
+        }
+        with self.lock:
+            self.stream.write(json.dumps(entry, default=str) + "\n")
+            self.stream.flush()
+            os.fsync(self.stream.fileno())
+
+    @contextmanager
+    def step(self, operation: str, key: str, **fields) -> Iterator[dict]:
+        """
+        Journal an operation around its execution: 'planned' before,
+        'completed' or 'failed' after. Ids returned by AWS are recorded
+        by adding them to the yielded dict.
+
+        :param operation: operation, e.g. 'create_ip_group'
+        :param key: key of the operation, e.g. the IP ACG name
+        :param fields: details of the planned operation
+        :return: dict for the details of the completed operation
+        """
+        self.record("planned", operation, key, **fields)
+        result = {}
+        try:
+            yield result
+        except Exception as e:
+            self.record("failed", operation, key, error=get_error_code(e))
+            raise
+        self.record("completed", operation, key, **fields, **result)
+
+
+journal = Journal()
+
+
+def get_key(*parts) -> str:
+    """
+    Get the key of an operation, from its parts; lists are sorted,
+    so the key does not depend on their order.
+
+    :param parts: e.g. directory id and list of IP ACG ids
+    :return: key, e.g. 'd-123:wsipg-1,wsipg-2'
+    """
+    return ":".join(
+        ",".join(sorted(part)) if isinstance(part, (list, tuple)) else str(part)
+        for part in parts
+    )
+
+
+def load_completed(path: str) -> dict[tuple[str, str], dict]:
+    """
+    Load the completed operations of a journal.
+    A truncated last line, from a crash while writing, is ignored.
+
+    :param path: path of the journal file
+    :return: completed entry per operation and key
+    """
+    completed = {}
+    try:
+        with open(path, "r") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(
+                        f"⚠️  Skipped unreadable journal entry: [{line.strip()}]",
+                        extra={"depth": 2},
+                    )
+                    continue
+                if entry.get("event") == "completed":
+                    completed[(entry["operation"], entry["key"])] = entry
+        return completed
+
+    except Exception as e:
+        msg_generic = f"Could not resume from journal [{path}]."
+        error_map = {
+            "FileNotFoundError": {
+                "msg": "Please specify the journal of an earlier run. "
+                f"{STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
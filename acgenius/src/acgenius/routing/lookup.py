@@ -0,0 +1,104 @@
+import logging
+
+from acgenius.config import STD_INSTR_README
+from acgenius.resources.ip_acgs.lookup import build_lookup_index, parse_address
+from acgenius.resources.models import AppInput
+from acgenius.resources.output import emit_record, output_is_table
+from acgenius.routing.errors import get_error_code, process_error
+from acgenius.telemetry.tracing import span
+
+logger = logging.getLogger("acgenius")
+
+
+def get_addresses(cli: dict) -> list[str]:
+    """
+    Get the addresses to look up: those given with --address, followed by
+    those in the --address-file, one per line.
+
+    :param cli: CLI input
+    :return: addresses
+    """
+    addresses = list(cli.get("addresses") or [])
+    address_file = cli.get("address_file")
+    if not address_file:
+        return addresses
+
+    try:
+        with open(address_file, "r") as lines:
+            return addresses + [line.strip() for line in lines if line.strip()]
+
+    except Exception as e:
+        msg_generic = f"Could not read addresses from [{address_file}]."
+        error_map = {
+            "FileNotFoundError": {
+                "msg": f"Please specify an existing file. {STD_INSTR_README}",
+                "crash": True,
+            },
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
+def report_lookup(address: str, matches: list[dict]) -> None:
+    """
+    Report the IP ACGs and directories that admit an address.
+
+    :param address: IPv4 address
+    :param matches: matching rules of the address
+    """
+    admitted = any(match["directory_ids"] for match in matches)
+    status = "admitted" if admitted else "not_admitted"
+    if parse_address(address) is None:
+        status = "invalid"
+
+    if not output_is_table():
+        for match in matches or [{}]:
+            emit_record(
+                {"record": "lookup", "address": address, "status": status, **match}
+            )
+        return
+
+    if status == "invalid":
+        logger.warning(
+            f"⚠️  [{address}] is not a valid IPv4 address.", extra={"depth": 1}
+        )
+        return
+
+    logger.info(
+        f"[{address}] is {'admitted' if admitted else 'not admitted'}"
+        f"{f' by [{len(matches)}] rules' if matches else ''}.",
+        extra={"depth": 1},
+    )
+    for match in matches:
+        logger.info(
+            f"Rule [{match['rule']}] ({match['rule_description']}) of IP ACG "
+            f"[{match['id']} - {match['name']}], in directories "
+            f"{match['directory_ids']}.",
+            extra={"depth": 2},
+        )
+
+
+def lookup(app_input: AppInput) -> None:
+    """
+    Look up which IP ACGs, and through them which directories,
+    admit the given addresses, from the inventory without further calls to AWS.
+    An address is admitted if a rule covering it belongs to an IP ACG
+    associated with a directory.
+
+    :param app_input: all input required for the action
+    """
+    logger.debug("Action: look up addresses...", extra={"depth": 1})
+
+    addresses = get_addresses(app_input.cli)
+    index = build_lookup_index(app_input.inventory)
+
+    with span("lookup_addresses", addresses=len(addresses)):
+        results = index.lookup(addresses)
+
+    for address, matches in zip(addresses, results):
+        report_lookup(address, matches)
+
+    logger.info(
+        f"✅ Completed action: look up [{len(addresses)}] addresses.",
+        extra={"depth": 1},
+    )
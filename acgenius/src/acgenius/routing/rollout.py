@@ -0,0 +1,202 @@
+import logging
+import math
+import time
+from typing import Any, Callable, Optional, Union
+
+from acgenius.resources.directories.inventory import get_directories
+from acgenius.resources.models import Directory, Execution
+from acgenius.routing.engine import run_concurrently
+from acgenius.routing.errors import process_error
+from acgenius.telemetry.tracing import span
+
+logger = logging.getLogger("acgenius")
+
+# Directories handled at the same time within a wave, at least.
+WAVE_CONCURRENCY = 16
+# Directories per describe call, the maximum of AWS.
+DESCRIBE_DIRECTORIES_MAX = 25
+SETTLE_INTERVAL = 1.0
+SETTLE_TIMEOUT = 60.0
+
+
+def has_waves(execution: Execution) -> bool:
+    """
+    See if rollout waves are set.
+
+    :param execution: execution settings
+    :return: True if a wave size or wave percentage is set, False otherwise
+    """
+    return bool(execution.wave_size or execution.wave_percentage)
+
+
+def get_wave_size(total: int, execution: Execution) -> int:
+    """
+    Get the number of directories per wave: the smallest of the wave size
+    and the wave percentage of all directories, if set; else all directories.
+
+    :param total: number of directories to roll out to
+    :param execution: execution settings
+    :return: number of directories per wave, at least 1
+    """
+    sizes = [total]
+    if execution.wave_size:
+        sizes.append(execution.wave_size)
+    if execution.wave_percentage:
+        sizes.append(math.ceil(total * execution.wave_percentage / 100))
+    return max(1, min(sizes))
+
+
+def get_waves(
+    directories: list[Directory], execution: Execution
+) -> list[list[Directory]]:
+    """
+    Split directories in rollout waves, in the order given.
+
+    :param directories: directories to roll out to
+    :param execution: execution settings
+    :return: waves of directories
+    """
+    directories = list(directories or [])
+    size = get_wave_size(len(directories), execution)
+    return [directories[i : i + size] for i in range(0, len(directories), size)]
+
+
+def get_wave_concurrency(wave: list[Directory], execution: Execution) -> int:
+    """
+    Get the number of directories of a wave handled at the same time:
+    the full wave, up to the configured or the default concurrency.
+
+    :param wave: directories of the wave
+    :param execution: execution settings
+    :return: concurrency
+    """
+    return min(len(wave), max(execution.concurrency, WAVE_CONCURRENCY))
+
+
+def get_expected(
+    ip_acg_ids: Union[list[str], dict[str, list[str]]], directory_id: str
+) -> list[str]:
+    """
+    Get the ids of the IP ACGs a directory should list as associated.
+
+    :param ip_acg_ids: ids of the IP ACGs, for all directories or per directory id
+    :param directory_id: directory id
+    :return: ids of the IP ACGs
+    """
+    if isinstance(ip_acg_ids, dict):
+        return ip_acg_ids.get(directory_id, [])
+    return ip_acg_ids
+
+
+def get_unsettled(
+    ip_acg_ids: Union[list[str], dict[str, list[str]]],
+    directories: list[Directory],
+    timeout: float = SETTLE_TIMEOUT,
+    interval: float = SETTLE_INTERVAL,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> list[str]:
+    """
+    Wait until all directories list the IP ACGs as associated, and are registered.
+    Each poll describes the pending directories only, 25 per call.
+
+    :param ip_acg_ids: ids of the associated IP ACGs, for all directories
+        or per directory id
+    :param directories: directories the IP ACGs were associated with
+    :param timeout: maximum time to wait, in seconds
+    :param interval: time between polls, in seconds
+    :param sleep: function to wait between polls
+    :param clock: clock, in seconds
+    :return: ids of the directories still pending at the timeout
+    """
+    pending = sorted({directory.id for directory in directories})
+    deadline = clock() + timeout
+    polls = 0
+
+    while pending:
+        polls += 1
+        settled = set()
+        for start in range(0, len(pending), DESCRIBE_DIRECTORIES_MAX):
+            chunk = pending[start : start + DESCRIBE_DIRECTORIES_MAX]
+            for directory in get_directories(chunk) or []:
+                associated = directory.get("ipGroupIds") or []
+                expected = get_expected(ip_acg_ids, directory.get("DirectoryId"))
+                if directory.get("State", "REGISTERED") == "REGISTERED" and all(
+                    ip_acg_id in associated for ip_acg_id in expected
+                ):
+                    settled.add(directory.get("DirectoryId"))
+        pending = [
+            directory_id for directory_id in pending if directory_id not in settled
+        ]
+
+        if not pending or clock() >= deadline:
+            break
+        sleep(interval)
+
+    logger.debug(
+        "Associations of %s checked in [%s] polls; pending: %s.",
+        ip_acg_ids,
+        polls,
+        pending,
+        extra={"depth": 2},
+    )
+    return pending
+
+
+def roll_out(
+    directories: list[Directory],
+    execution: Execution,
+    apply: Callable[[Directory], Any],
+    ip_acg_ids: Union[list[str], dict[str, list[str]]],
+    after: Optional[Callable[[Directory], Any]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """
+    Roll out to directories in waves. Within a wave, `apply` runs for all
+    directories in parallel; then the wave is checked with a describe of its
+    directories only, and `after` runs for all of them in parallel.
+    The next wave only starts if all directories of the wave have the IP ACGs
+    associated; otherwise the rollout stops.
+
+    :param directories: directories to roll out to
+    :param execution: execution settings, with the wave size and percentage
+    :param apply: function to call per directory, e.g. to associate IP ACGs
+    :param ip_acg_ids: ids of the IP ACGs each directory should have associated,
+        for all directories or per directory id
+    :param after: function to call per directory of a checked wave, if any
+    :param sleep: function to wait between checks
+    :param clock: clock, in seconds
+    """
+    waves = get_waves(directories, execution)
+
+    for number, wave in enumerate(waves, start=1):
+        concurrency = get_wave_concurrency(wave, execution)
+        with span("wave", number=number, directories=len(wave)):
+            run_concurrently(apply, wave, concurrency)
+            pending = get_unsettled(ip_acg_ids, wave, sleep=sleep, clock=clock)
+
+            if pending:
+                msg_generic = f"Could not complete rollout wave [{number}]."
+                error_code = "RolloutWaveCheckException"
+                error_map = {
+                    "RolloutWaveCheckException": {
+                        "msg": f"Directories {pending} do not list IP ACGs "
+                        f"{[get_expected(ip_acg_ids, d) for d in pending]} "
+                        f"as associated within [{SETTLE_TIMEOUT}] s, "
+                        "or are not registered. "
+                        f"[{len(waves) - number}] later waves are not started. "
+                        "Please inspect the directories in the AWS console.",
+                        "crash": True,
+                    }
+                }
+                process_error(error_map, error_code, msg_generic)
+
+            if after:
+                run_concurrently(after, wave, concurrency)
+
+        logger.info(
+            f"☑ Completed rollout wave [{number}/{len(waves)}] "
+            f"of [{len(wave)}] directories.",
+            extra={"depth": 2},
+        )
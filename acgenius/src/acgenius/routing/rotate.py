@@ -0,0 +1,216 @@
+import logging
+import time
+from typing import Callable, Optional
+
+from acgenius.resources.ip_acgs.plan import get_rule_set
+from acgenius.resources.ip_acgs.utils import (
+    get_versioned_name,
+    index_latest,
+    split_version,
+)
+from acgenius.resources.ip_acgs.work_instruction import (
+    associate_ip_acg,
+    create_ip_acg,
+    delete_ip_acg,
+    disassociate_ip_acg,
+)
+from acgenius.resources.models import (
+    IP_ACG,
+    AppInput,
+    Directory,
+    Execution,
+    Inventory,
+    WorkInstruction,
+)
+from acgenius.resources.utils import create_report
+from acgenius.routing.rollout import roll_out
+from acgenius.telemetry.tracing import span
+from acgenius.validation.directories import val_directories_specified
+
+logger = logging.getLogger("acgenius")
+
+
+def get_rotation_directories(
+    current: IP_ACG, work_instruction: WorkInstruction, inventory: Inventory
+) -> list[Directory]:
+    """
+    Get the directories to cut over: those the current IP ACG is associated with,
+    or else the directories specified, or else all directories.
+
+    :param current: current IP ACG in AWS
+    :param work_instruction: validated work instruction
+    :param inventory: Inventory object
+    :return: directories to cut over
+    """
+    associated = [
+        directory
+        for directory in inventory.directories or []
+        if current.id in (directory.ip_acgs or [])
+    ]
+    if associated:
+        return associated
+    if val_directories_specified(work_instruction):
+        return work_instruction.directories
+    return inventory.directories or []
+
+
+def rotate_ip_acg(
+    ip_acg: IP_ACG,
+    current: IP_ACG,
+    directories: list[Directory],
+    tags: dict,
+    execution: Execution,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> Optional[IP_ACG]:
+    """
+    Rotate an IP ACG blue/green: create the next version with the new rules,
+    and cut over the directories in rollout waves. Per wave, the next version
+    is associated with all directories at once, the associations are checked
+    until they settle, and the current version is disassociated at once.
+    After the last wave, the current version is deleted.
+
+    :param ip_acg: IP ACG of the work instruction
+    :param current: current version of the IP ACG in AWS
+    :param directories: directories to cut over
+    :param tags: base tags
+    :param execution: execution settings, with the rollout waves
+    :param sleep: function to wait between checks
+    :param clock: clock, in seconds
+    :return: new version of the IP ACG, if created
+    """
+    base_name, version = split_version(current.name)
+    rotated = IP_ACG(
+        name=get_versioned_name(base_name, version + 1),
+        desc=ip_acg.desc,
+        rules=ip_acg.rules,
+        origin=ip_acg.origin,
+    )
+    if not create_ip_acg(rotated, dict(tags)):
+        return None
+
+    start = clock()
+    with span("cutover", ip_acg=rotated.name, directories=len(directories)):
+        roll_out(
+            directories,
+            execution,
+            apply=lambda directory: associate_ip_acg([rotated], directory),
+            ip_acg_ids=[rotated.id],
+            after=lambda directory: disassociate_ip_acg([current.id], directory),
+            sleep=sleep,
+            clock=clock,
+        )
+    window = clock() - start
+
+    delete_ip_acg(current.id)
+    ip_acg.id = rotated.id
+
+    logger.info(
+        f"☑ Rotated IP ACG [{current.id} - {current.name}] to "
+        f"[{rotated.id} - {rotated.name}] across [{len(directories)}] directories, "
+        f"with a cut-over of [{window:.1f}] s.",
+        extra={"depth": 1},
+    )
+    return rotated
+
+
+def get_rotations(
+    work_instruction: WorkInstruction,
+    inventory: Inventory,
+    name_length_max: Optional[int] = None,
+) -> list[tuple[IP_ACG, IP_ACG]]:
+    """
+    Get the IP ACGs to rotate, with their current version in AWS.
+    IP ACGs with the same rules in AWS are not rotated, nor are IP ACGs
+    whose next versioned name would exceed the maximum name length.
+
+    :param work_instruction: validated work instruction
+    :param inventory: Inventory object
+    :param name_length_max: maximum length of IP ACG names, if any
+    :return: pairs of IP ACG of the work instruction and its current version
+    """
+    index = index_latest(inventory.ip_acgs)
+    rotations = []
+    for ip_acg in work_instruction.ip_acgs:
+        current = index.get(split_version(ip_acg.name)[0])
+        if current is None:
+            logger.warning(
+                f"⚠️  IP ACG [{ip_acg.name}] not found in AWS; skip rotation. "
+                "Run the 'create' action to create it.",
+                extra={"depth": 1},
+            )
+            continue
+        if get_rule_set(ip_acg) == get_rule_set(current):
+            logger.info(
+                f"IP ACG [{current.name}] has the same rules in AWS; skip rotation.",
+                extra={"depth": 1},
+            )
+            continue
+        base_name, version = split_version(current.name)
+        name = get_versioned_name(base_name, version + 1)
+        if name_length_max is not None and len(name) > name_length_max:
+            logger.warning(
+                f"⚠️  Name [{name}] of the next version of IP ACG [{current.name}] "
+                f"is longer than [{name_length_max}] characters; skip rotation. "
+                "Shorten the name of the IP ACG to rotate it.",
+                extra={"depth": 1},
+            )
+            continue
+        rotations.append((ip_acg, current))
+    return rotations
+
+
+def rotate(
+    app_input: AppInput,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """
+    Replace the rules of existing IP ACGs by rotation, instead of in place:
+    directories keep an IP ACG associated during the cut-over.
+
+    :param app_input: all input required for the action
+    :param sleep: function to wait between polls
+    :param clock: clock, in seconds
+    """
+    logger.debug("Action: rotate IP ACGs...", extra={"depth": 1})
+
+    cli = app_input.cli
+    work_instruction = app_input.settings.work_instruction
+    inventory = app_input.inventory
+    execution = app_input.settings.execution or Execution()
+
+    validation = app_input.settings.validation
+    rotations = get_rotations(
+        work_instruction,
+        inventory,
+        validation.ip_acg_name_length_max if validation else None,
+    )
+    create_report(
+        subject=[ip_acg for ip_acg, _ in rotations], origin="work_instruction"
+    )
+
+    for ip_acg, current in rotations:
+        base_name, version = split_version(current.name)
+        directories = get_rotation_directories(current, work_instruction, inventory)
+        logger.info(
+            f"IP ACG [{current.name}] {'would' if cli['dryrun'] else 'will'} be "
+            f"rotated to [{get_versioned_name(base_name, version + 1)}], "
+            f"across [{len(directories)}] directories.",
+            extra={"depth": 2},
+        )
+        if not cli["dryrun"]:
+            rotate_ip_acg(
+                ip_acg,
+                current,
+                directories,
+                work_instruction.tags,
+                execution,
+                sleep=sleep,
+                clock=clock,
+            )
+
+    logger.info(
+        f"✅ Completed action: rotate IP ACGs{' (dryrun)' if cli['dryrun'] else ''}.",
+        extra={"depth": 1},
+    )
@@ -2,34 +2,55 @@ import logging
 
 from acgenius.resources.directories.inventory import show_directories
 from acgenius.resources.ip_acgs.inventory import show_ip_acgs
-from acgenius.resources.models import AppInput, Inventory, Settings
+from acgenius.resources.models import AppInput, Execution, Inventory, Settings
+from acgenius.resources.store import store
 from acgenius.routing.actions import create, delete, status, update
+from acgenius.routing.audit import audit
+from acgenius.routing.drift import drift
+from acgenius.routing.engine import limit_workspaces
+from acgenius.routing.estimate import report_estimate
 from acgenius.routing.errors import get_error_code, process_error
+from acgenius.routing.impact import impact
+from acgenius.routing.lookup import lookup
+from acgenius.routing.rotate import rotate
+from acgenius.routing.sync import sync
+from acgenius.routing.watch import watch
+from acgenius.telemetry.tracing import span, traced
 from acgenius.validation import val_work_instruction
 from acgenius.validation.utils import parse_settings
 
 logger = logging.getLogger("acgenius")
 
 
+@traced("common_route")
 def run_common_route() -> tuple[Settings, Inventory]:
     """
     Run route for all actions.
     Whatever action is picked, inventory and settings are always retrieved.
+    Settings come first, so all AWS calls, the inventory included,
+    are rate limited as set in the execution settings.
+    With the inventory store enabled, the inventory is written to it.
 
     :return: Settings and Inventory objects
     """
     logger.debug("Run common route...", extra={"depth": 1})
 
-    directories = show_directories()
-    ip_acgs = show_ip_acgs()
-    inventory = Inventory(directories=directories, ip_acgs=ip_acgs)
-
     settings = parse_settings()
     validation_baseline = settings.validation
     work_instruction = val_work_instruction(settings)
     settings = Settings(
-        validation=validation_baseline, work_instruction=work_instruction
+        validation=validation_baseline,
+        work_instruction=work_instruction,
+        execution=settings.execution,
     )
+    limit_workspaces((settings.execution or Execution()).rate_limit)
+
+    with span("inventory"):
+        directories = show_directories()
+        ip_acgs = show_ip_acgs()
+    inventory = Inventory(directories=directories, ip_acgs=ip_acgs)
+    if store.enabled:
+        store.write(inventory)
 
     return settings, inventory
 
@@ -46,7 +67,14 @@ def run_selected_route(app_input: AppInput) -> None:
         "status": status,
         "create": create,
         "update": update,
+        "rotate": rotate,
+        "sync": sync,
         "delete": delete,
+        "watch": watch,
+        "drift": drift,
+        "lookup": lookup,
+        "audit": audit,
+        "impact": impact,
     }
     try:
         action = app_input.cli["action"]
@@ -59,10 +87,21 @@ def run_selected_route(app_input: AppInput) -> None:
 
     cli = app_input.cli
 
-    if not cli["action"] == "status":
+    if cli["action"] not in (
+        "status",
+        "watch",
+        "drift",
+        "lookup",
+        "audit",
+        "impact",
+    ):
         logger.info(
             "These IP ACGs "
             f"{'would' if cli['dryrun'] else 'will'} be attempted to {cli['action']}: ",
             extra={"depth": 1},
         )
-    action_map[action](app_input)
+    with span(f"action_{action}", dryrun=cli["dryrun"]):
+        action_map[action](app_input)
+
+    if cli["dryrun"] and action in ("create", "update", "rotate", "sync", "delete"):
+        report_estimate(app_input)
@@ -0,0 +1,285 @@
+import logging
+from typing import Optional
+
+from acgenius.resources.directories.plan import diff_associations, plan_associations
+from acgenius.resources.ip_acgs.plan import get_rule_set, plan_ip_acgs
+from acgenius.resources.ip_acgs.tags import get_managed, plan_tags, report_tags
+from acgenius.resources.ip_acgs.work_instruction import (
+    associate_ip_acg,
+    authorize_rules,
+    create_ip_acg,
+    delete_ip_acg,
+    disassociate_ip_acg,
+    reconcile_tags,
+    revoke_rules,
+    update_rules,
+)
+from acgenius.resources.models import (
+    IP_ACG,
+    AppInput,
+    Directory,
+    Execution,
+    Inventory,
+    SyncPlan,
+    WorkInstruction,
+)
+from acgenius.resources.utils import create_report
+from acgenius.routing.engine import run_concurrently
+from acgenius.telemetry.tracing import span, traced
+
+logger = logging.getLogger("acgenius")
+
+
+def plan_rules(ip_acg: IP_ACG, current: IP_ACG, sync_plan: SyncPlan) -> None:
+    """
+    Plan the fewest calls to bring the rules of an IP ACG in AWS in line:
+    only rules added, one call to authorize them; only rules removed,
+    one call to revoke them; both (also a changed description), one call
+    to replace all rules.
+
+    :param ip_acg: IP ACG of the work instruction
+    :param current: IP ACG in AWS
+    :param sync_plan: SyncPlan object to add the operation to
+    """
+    rule_set, rule_set_current = get_rule_set(ip_acg), get_rule_set(current)
+    added = rule_set - rule_set_current
+    removed = rule_set_current - rule_set
+
+    if added and removed:
+        sync_plan.update.append(ip_acg)
+    elif added:
+        rules = [rule for rule in ip_acg.rules if (rule.network, rule.desc) in added]
+        sync_plan.authorize.append((ip_acg, rules))
+    elif removed:
+        rules = [rule for rule in current.rules if (rule.network, rule.desc) in removed]
+        sync_plan.revoke.append((ip_acg, rules))
+    else:
+        sync_plan.unchanged.append(ip_acg)
+
+
+@traced("plan_sync")
+def plan_sync(
+    work_instruction: WorkInstruction,
+    inventory: Inventory,
+    prune: bool = False,
+    execution: Optional[Execution] = None,
+) -> SyncPlan:
+    """
+    Plan the operations to converge AWS with the work instruction, as the
+    difference of both: IP ACGs to create, rules and tags to change
+    (tags are fetched from AWS, through the cache), and per directory,
+    the IP ACGs to associate and to disassociate, each in a single call,
+    from the desired associations of each IP ACG.
+    IP ACGs in AWS absent in the work instruction (e.g. an earlier version
+    of a rotated IP ACG) are deleted if pruned, and left alone otherwise.
+
+    :param work_instruction: validated work instruction
+    :param inventory: Inventory object
+    :param prune: delete IP ACGs absent in the work instruction
+    :param execution: execution settings, with the concurrency to fetch tags
+    :return: SyncPlan object
+    """
+    logger.debug("Plan sync of IP ACGs...", extra={"depth": 1})
+
+    plan = plan_ip_acgs(inventory.ip_acgs, work_instruction.ip_acgs)
+    sync_plan = SyncPlan(
+        create=plan.create,
+        update=[],
+        authorize=[],
+        revoke=[],
+        tags=[],
+        unchanged=[],
+        associate=[],
+        disassociate=[],
+        delete=[],
+        unmanaged=[],
+    )
+
+    index = {ip_acg.id: ip_acg for ip_acg in inventory.ip_acgs or []}
+    for ip_acg in plan.update + plan.unchanged:
+        plan_rules(ip_acg, index[ip_acg.id], sync_plan)
+
+    managed = plan.update + plan.unchanged
+    sync_plan.tags = plan_tags(
+        get_managed(managed, inventory),
+        work_instruction.tags,
+        execution or Execution(),
+    )
+
+    managed_ids = {ip_acg.id for ip_acg in managed}
+    for ip_acg_id, ip_acg in index.items():
+        if ip_acg_id not in managed_ids:
+            (sync_plan.delete if prune else sync_plan.unmanaged).append(ip_acg)
+
+    delete_ids = {ip_acg.id for ip_acg in sync_plan.delete}
+    sync_plan.associate, sync_plan.disassociate = diff_associations(
+        plan_associations(work_instruction, inventory),
+        inventory,
+        managed_ids | delete_ids,
+    )
+
+    logger.debug(
+        "Planned sync: [%s] to create, [%s] to update, [%s] to authorize, "
+        "[%s] to revoke, [%s] to tag, [%s] unchanged, [%s] to delete; "
+        "[%s] directories to associate, [%s] to disassociate.",
+        len(sync_plan.create),
+        len(sync_plan.update),
+        len(sync_plan.authorize),
+        len(sync_plan.revoke),
+        len(sync_plan.tags),
+        len(sync_plan.unchanged),
+        len(sync_plan.delete),
+        len(sync_plan.associate),
+        len(sync_plan.disassociate),
+        extra={"depth": 2},
+    )
+    return sync_plan
+
+
+def count_sync_calls(sync_plan: SyncPlan) -> dict[str, int]:
+    """
+    Count the calls per WorkSpaces operation to apply a sync plan.
+
+    :param sync_plan: SyncPlan object
+    :return: number of calls per client method, e.g. 'create_ip_group'
+    """
+    return {
+        "create_ip_group": len(sync_plan.create),
+        "update_rules_of_ip_group": len(sync_plan.update),
+        "authorize_ip_rules": len(sync_plan.authorize),
+        "revoke_ip_rules": len(sync_plan.revoke),
+        "create_tags": sum(1 for _, to_create, _ in sync_plan.tags if to_create),
+        "delete_tags": sum(1 for _, _, to_delete in sync_plan.tags if to_delete),
+        "associate_ip_groups": len(sync_plan.associate),
+        "disassociate_ip_groups": len(sync_plan.disassociate),
+        "delete_ip_group": len(sync_plan.delete),
+    }
+
+
+def report_sync(sync_plan: SyncPlan, dryrun: bool) -> None:
+    """
+    Report the operations of a sync plan.
+
+    :param sync_plan: SyncPlan object
+    :param dryrun: dry run mode enabled
+    """
+    verb = "would" if dryrun else "will"
+
+    create_report(
+        subject=sync_plan.create
+        + sync_plan.update
+        + [ip_acg for ip_acg, _ in sync_plan.authorize + sync_plan.revoke],
+        origin="work_instruction",
+    )
+    for ip_acg in sync_plan.create:
+        logger.info(f"IP ACG [{ip_acg.name}] {verb} be created.", extra={"depth": 2})
+    for ip_acg in sync_plan.update:
+        logger.info(
+            f"Rules of IP ACG [{ip_acg.name}] {verb} be replaced.", extra={"depth": 2}
+        )
+    for ip_acg, rules in sync_plan.authorize:
+        logger.info(
+            f"[{len(rules)}] rules {verb} be added to IP ACG [{ip_acg.name}].",
+            extra={"depth": 2},
+        )
+    for ip_acg, rules in sync_plan.revoke:
+        logger.info(
+            f"[{len(rules)}] rules {verb} be removed from IP ACG [{ip_acg.name}].",
+            extra={"depth": 2},
+        )
+    report_tags(sync_plan.tags, dryrun)
+    for directory, ip_acgs in sync_plan.associate:
+        logger.info(
+            f"IP ACGs {[ip_acg.name for ip_acg in ip_acgs]} {verb} be associated "
+            f"with directory [{directory.id} - {directory.name}].",
+            extra={"depth": 2},
+        )
+    for directory, ip_acg_ids in sync_plan.disassociate:
+        logger.info(
+            f"IP ACGs {ip_acg_ids} {verb} be disassociated "
+            f"from directory [{directory.id} - {directory.name}].",
+            extra={"depth": 2},
+        )
+    for ip_acg in sync_plan.delete:
+        logger.info(
+            f"IP ACG [{ip_acg.id} - {ip_acg.name}] {verb} be deleted.",
+            extra={"depth": 2},
+        )
+    if sync_plan.unmanaged:
+        logger.info(
+            f"[{len(sync_plan.unmanaged)}] IP ACGs in AWS are not in the work "
+            f"instruction: {[ip_acg.name for ip_acg in sync_plan.unmanaged]}. "
+            "Add --prune to delete them.",
+            extra={"depth": 2},
+        )
+
+
+def apply_sync(sync_plan: SyncPlan, tags: dict, execution: Execution) -> None:
+    """
+    Apply a sync plan in stages, each stage on the concurrent engine:
+    create IP ACGs, change rules and tags, associate, disassociate, and delete.
+    Directories are handled in parallel, with one call to associate and one
+    to disassociate per directory.
+    Associating comes before disassociating, so directories moved between
+    IP ACGs are never left without; IP ACGs are deleted once disassociated.
+
+    :param sync_plan: SyncPlan object
+    :param tags: base tags, for IP ACGs to create
+    :param execution: execution settings, with the concurrency
+    """
+
+    def associate(item: tuple[Directory, list[IP_ACG]]) -> None:
+        directory, ip_acgs = item
+        ip_acgs_created = [ip_acg for ip_acg in ip_acgs if ip_acg.id]
+        if ip_acgs_created:
+            associate_ip_acg(ip_acgs_created, directory)
+
+    stages = (
+        (
+            "create",
+            lambda ip_acg: create_ip_acg(ip_acg, dict(tags)),
+            sync_plan.create,
+        ),
+        ("update", update_rules, sync_plan.update),
+        ("authorize", lambda item: authorize_rules(*item), sync_plan.authorize),
+        ("revoke", lambda item: revoke_rules(*item), sync_plan.revoke),
+        ("tags", reconcile_tags, sync_plan.tags),
+        ("associate", associate, sync_plan.associate),
+        (
+            "disassociate",
+            lambda item: disassociate_ip_acg(item[1], item[0]),
+            sync_plan.disassociate,
+        ),
+        ("delete", lambda ip_acg: delete_ip_acg(ip_acg.id), sync_plan.delete),
+    )
+    for stage, fn, items in stages:
+        if items:
+            with span(f"sync_{stage}", items=len(items)):
+                run_concurrently(fn, items, execution.concurrency)
+
+
+def sync(app_input: AppInput) -> None:
+    """
+    Converge IP ACGs, their rules, tags and associations in AWS with the
+    work instruction, with the fewest calls: only what differs is applied.
+
+    :param app_input: all input required for the action
+    """
+    logger.debug("Action: sync IP ACGs...", extra={"depth": 1})
+
+    cli = app_input.cli
+    work_instruction = app_input.settings.work_instruction
+    execution = app_input.settings.execution or Execution()
+
+    sync_plan = plan_sync(
+        work_instruction, app_input.inventory, prune=cli["prune"], execution=execution
+    )
+    report_sync(sync_plan, cli["dryrun"])
+
+    if not cli["dryrun"]:
+        apply_sync(sync_plan, work_instruction.tags, execution)
+
+    logger.info(
+        f"✅ Completed action: sync IP ACGs{' (dryrun)' if cli['dryrun'] else ''}.",
+        extra={"depth": 1},
+    )
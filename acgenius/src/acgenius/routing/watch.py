@@ -0,0 +1,318 @@
+import logging
+import time
+from dataclasses import replace
+from typing import Callable, Optional
+
+from acgenius.resources.directories.inventory import get_directories, sel_directories
+from acgenius.resources.directories.plan import diff_associations, plan_associations
+from acgenius.resources.ip_acgs.inventory import get_ip_acgs, sel_ip_acgs
+from acgenius.resources.ip_acgs.plan import plan_ip_acgs
+from acgenius.resources.ip_acgs.tags import tag_cache
+from acgenius.resources.ip_acgs.work_instruction import (
+    associate_ip_acg,
+    create_ip_acg,
+    disassociate_ip_acg,
+    update_rules,
+)
+from acgenius.resources.models import (
+    IP_ACG,
+    AppInput,
+    Directory,
+    Inventory,
+    Plan,
+    WorkInstruction,
+)
+from acgenius.resources.store import store
+from acgenius.resources.utils import create_report
+from acgenius.telemetry.tracing import span
+from acgenius.validation.ip_acgs import val_ip_acgs
+from acgenius.validation.rules import val_rules
+from acgenius.validation.utils import get_settings_mtime, parse_settings
+
+logger = logging.getLogger("acgenius")
+
+POLL_INTERVAL_DEFAULT = 2.0
+REFRESH_INTERVAL_DEFAULT = 300.0
+
+# Key of the fingerprint of everything in settings.yaml but the IP ACGs.
+BASE = None
+
+
+def get_fingerprint(ip_acg: IP_ACG) -> tuple:
+    """
+    Get a fingerprint of an IP ACG as specified in settings.yaml, before validation.
+
+    :param ip_acg: IP ACG
+    :return: fingerprint, equal for equal specifications
+    """
+    return (
+        ip_acg.desc,
+        ip_acg.origin,
+        tuple((rule.ip, rule.desc) for rule in ip_acg.rules),
+        tuple(ip_acg.directories or ()),
+    )
+
+
+def refresh_inventory() -> Inventory:
+    """
+    Refresh the inventory with describe calls only, without reports.
+    Cached tags are forgotten, to be fetched again when needed.
+    With the inventory store enabled, the inventory is written to it.
+
+    :return: Inventory object
+    """
+    logger.info("Refresh inventory...", extra={"depth": 1})
+
+    tag_cache.clear()
+
+    inventory = Inventory(
+        directories=sel_directories(get_directories() or []),
+        ip_acgs=sel_ip_acgs(get_ip_acgs() or []),
+    )
+    if store.enabled:
+        store.write(inventory)
+    return inventory
+
+
+def update_associations(
+    inventory: Inventory,
+    associated: list[tuple[Directory, list[IP_ACG]]],
+    disassociated: list[tuple[Directory, list[str]]],
+) -> None:
+    """
+    Update the associations of the directories in the inventory, in place,
+    after they are applied in AWS.
+
+    :param inventory: cached inventory
+    :param associated: directories, each with the IP ACGs associated
+    :param disassociated: directories, each with the ids of the IP ACGs disassociated
+    """
+    index = {directory.id: directory for directory in inventory.directories or []}
+    for directory, ip_acgs in associated:
+        if directory.id in index:
+            current = index[directory.id]
+            current.ip_acgs = list(current.ip_acgs or []) + [
+                ip_acg.id for ip_acg in ip_acgs
+            ]
+    for directory, ip_acg_ids in disassociated:
+        if directory.id in index:
+            current = index[directory.id]
+            current.ip_acgs = [
+                ip_acg_id
+                for ip_acg_id in current.ip_acgs or []
+                if ip_acg_id not in ip_acg_ids
+            ]
+
+
+def apply_plan(
+    plan: Plan, work_instruction: WorkInstruction, inventory: Inventory, dryrun: bool
+) -> None:
+    """
+    Apply a plan: create new IP ACGs, update rules of changed ones
+    (of a rotated IP ACG, the latest version), and associate and disassociate
+    the IP ACGs of the plan with their directories, where changed.
+    The inventory is updated in place with the applied IP ACGs and
+    associations, as in AWS.
+
+    :param plan: Plan object
+    :param work_instruction: validated work instruction
+    :param inventory: cached inventory
+    :param dryrun: only report the plan
+    """
+    existing = plan.update + plan.unchanged
+    to_associate, to_disassociate = diff_associations(
+        plan_associations(
+            WorkInstruction(
+                directories=work_instruction.directories,
+                ip_acgs=plan.create + existing,
+                tags=work_instruction.tags,
+            ),
+            inventory,
+        ),
+        inventory,
+        {ip_acg.id for ip_acg in existing},
+    )
+
+    changed = plan.create + plan.update
+    if not (changed or to_associate or to_disassociate):
+        logger.info("✅ All IP ACGs are up to date.", extra={"depth": 1})
+        return
+
+    verb = "would" if dryrun else "will"
+    if changed:
+        logger.info(
+            f"These IP ACGs {verb} be attempted to create or update: ",
+            extra={"depth": 1},
+        )
+        create_report(subject=changed, origin="work_instruction")
+    for directory, ip_acgs in to_associate:
+        logger.info(
+            f"IP ACGs {[ip_acg.name for ip_acg in ip_acgs]} {verb} be associated "
+            f"with directory [{directory.id} - {directory.name}].",
+            extra={"depth": 1},
+        )
+    for directory, ip_acg_ids in to_disassociate:
+        logger.info(
+            f"IP ACGs {ip_acg_ids} {verb} be disassociated "
+            f"from directory [{directory.id} - {directory.name}].",
+            extra={"depth": 1},
+        )
+    if dryrun:
+        return
+
+    created = [
+        ip_acg
+        for ip_acg in plan.create
+        if create_ip_acg(ip_acg, dict(work_instruction.tags))
+    ]
+    applied_ids = {ip_acg.id for ip_acg in created + existing}
+    associated = [
+        (directory, [ip_acg for ip_acg in ip_acgs if ip_acg.id in applied_ids])
+        for directory, ip_acgs in to_associate
+    ]
+    associated = [(directory, ip_acgs) for directory, ip_acgs in associated if ip_acgs]
+    for directory, ip_acgs in associated:
+        associate_ip_acg(ip_acgs, directory)
+    for directory, ip_acg_ids in to_disassociate:
+        disassociate_ip_acg(ip_acg_ids, directory)
+
+    for ip_acg in plan.update:
+        update_rules(ip_acg)
+
+    index = {ip_acg.id: i for i, ip_acg in enumerate(inventory.ip_acgs or [])}
+    inventory.ip_acgs = list(inventory.ip_acgs or []) + created
+    for ip_acg in plan.update:
+        current = inventory.ip_acgs[index[ip_acg.id]]
+        inventory.ip_acgs[index[ip_acg.id]] = replace(current, rules=ip_acg.rules)
+    update_associations(inventory, associated, to_disassociate)
+
+
+def reconcile(app_input: AppInput, fingerprints: dict) -> dict:
+    """
+    Reconcile the IP ACGs changed in settings.yaml since the previous cycle.
+    Only changed IP ACGs are validated on rule level, planned and applied.
+    If anything but the IP ACGs changed (validation baseline, tags, directories),
+    all IP ACGs are considered changed.
+
+    :param app_input: all input required; settings are replaced by the new ones
+    :param fingerprints: fingerprints of the previous cycle (empty at first)
+    :return: fingerprints of this cycle
+    """
+    settings = parse_settings()
+    work_instruction = settings.work_instruction
+
+    new_fingerprints = {
+        BASE: (
+            settings.validation,
+            tuple(sorted((work_instruction.tags or {}).items())),
+            work_instruction.directories,
+        ),
+        **{ip_acg.name: get_fingerprint(ip_acg) for ip_acg in work_instruction.ip_acgs},
+    }
+    if new_fingerprints[BASE] != fingerprints.get(BASE):
+        changed = list(work_instruction.ip_acgs)
+    else:
+        changed = [
+            ip_acg
+            for ip_acg in work_instruction.ip_acgs
+            if new_fingerprints[ip_acg.name] != fingerprints.get(ip_acg.name)
+        ]
+
+    removed = sorted(set(fingerprints) - set(new_fingerprints))
+    if removed:
+        logger.info(
+            f"IP ACGs removed from settings.yaml are kept in AWS: {removed}. "
+            "Use the 'delete' action to delete them.",
+            extra={"depth": 1},
+        )
+
+    logger.info(
+        f"Changed IP ACGs in settings.yaml: {[ip_acg.name for ip_acg in changed]}",
+        extra={"depth": 1},
+    )
+    if changed:
+        val_rules(
+            WorkInstruction(
+                directories=work_instruction.directories,
+                ip_acgs=changed,
+                tags=work_instruction.tags,
+            ),
+            settings,
+        )
+        val_ip_acgs(work_instruction, settings)
+
+        plan = plan_ip_acgs(app_input.inventory.ip_acgs, changed)
+        apply_plan(plan, work_instruction, app_input.inventory, app_input.cli["dryrun"])
+
+    app_input.settings = settings
+    return new_fingerprints
+
+
+def watch(
+    app_input: AppInput,
+    cycles: Optional[int] = None,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """
+    Watch settings.yaml, and reconcile IP ACGs in AWS on each change.
+
+    The WorkSpaces client and the inventory are kept warm between cycles.
+    settings.yaml is polled for changes; the inventory is refreshed
+    on an interval. A failing cycle (e.g. invalid settings) is reported,
+    and retried at the next change of settings.yaml. Stop with Ctrl+C.
+
+    :param app_input: all input required for the action
+    :param cycles: number of cycles to run (default: until interrupted)
+    :param sleep: function to wait between cycles
+    :param clock: clock for the inventory refresh interval, in seconds
+    """
+    cli = app_input.cli
+    poll_interval = cli.get("poll_interval") or POLL_INTERVAL_DEFAULT
+    refresh_interval = cli.get("refresh_interval") or REFRESH_INTERVAL_DEFAULT
+
+    logger.info(
+        f"Watch settings.yaml every [{poll_interval}] s; "
+        f"refresh inventory every [{refresh_interval}] s. Stop with Ctrl+C.",
+        extra={"depth": 1},
+    )
+
+    fingerprints = {}
+    mtime = None
+    refreshed = clock()
+    cycle = 0
+
+    try:
+        while cycles is None or cycle < cycles:
+            cycle += 1
+            try:
+                if clock() - refreshed >= refresh_interval:
+                    app_input.inventory = refresh_inventory()
+                    refreshed = clock()
+
+                current_mtime = get_settings_mtime()
+                if current_mtime != mtime:
+                    mtime = current_mtime
+                    with span("reconcile", cycle=cycle):
+                        fingerprints = reconcile(app_input, fingerprints)
+
+            except OSError as e:
+                logger.warning(
+                    f"⚠️  Could not read settings.yaml: {e}", extra={"depth": 1}
+                )
+            except SystemExit:
+                logger.warning(
+                    "⚠️  Cycle failed. Waiting for the next change of settings.yaml...",
+                    extra={"depth": 1},
+                )
+
+            if cycles is None or cycle < cycles:
+                sleep(poll_interval)
+
+    except KeyboardInterrupt:
+        logger.info("Stopped watching.", extra={"depth": 1})
+
+    logger.info(
+        f"✅ Completed action: watch{' (dryrun)' if cli['dryrun'] else ''}.",
+        extra={"depth": 1},
+    )
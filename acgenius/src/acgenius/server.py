@@ -0,0 +1,440 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import replace
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlparse
+
+import click
+import yaml
+
+from acgenius.config import click_help, setup_logger
+from acgenius.resources.directories.plan import get_ip_acg_directories
+from acgenius.resources.ip_acgs.plan import get_rule_set, plan_ip_acgs
+from acgenius.resources.ip_acgs.utils import index_latest, split_version
+from acgenius.resources.ip_acgs.work_instruction import (
+    associate_ip_acg,
+    create_ip_acg,
+    update_rules,
+)
+from acgenius.resources.models import (
+    IP_ACG,
+    Directory,
+    Execution,
+    Inventory,
+    Plan,
+    Settings,
+)
+from acgenius.resources.output import to_records
+from acgenius.routing.engine import KeyedLocks, limit_workspaces, run_concurrently
+from acgenius.routing.watch import (
+    REFRESH_INTERVAL_DEFAULT,
+    refresh_inventory,
+    update_associations,
+)
+from acgenius.validation import val_work_instruction
+from acgenius.validation.utils import parse_settings
+
+logger = logging.getLogger("acgenius")
+
+HOST_DEFAULT = "127.0.0.1"
+PORT_DEFAULT = 8080
+
+
+class InventoryCache:
+    """
+    Keep the inventory warm, shared by all requests.
+
+    The status response is serialized once per change of the inventory,
+    so reads cost no AWS calls and no serialization. When the inventory is
+    older than the refresh interval, the first request to notice refreshes it;
+    concurrent requests are served the current inventory meanwhile. Applies put
+    while a refresh is running are put again on the refreshed inventory.
+    """
+
+    def __init__(self, refresh_interval: float = REFRESH_INTERVAL_DEFAULT) -> None:
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.inventory = Inventory(directories=[], ip_acgs=[])
+        self.refreshed = 0.0
+        self.status_body: Optional[bytes] = None
+        self.pending: Optional[list[tuple[IP_ACG, list[Directory]]]] = None
+
+    def refresh(self) -> None:
+        """
+        Refresh the inventory from AWS, with describe calls only.
+        """
+        with self.lock:
+            self.pending = []
+        try:
+            inventory = refresh_inventory()
+            with self.lock:
+                self.inventory = inventory
+                for ip_acg, directories in self.pending:
+                    self._put(ip_acg, directories)
+                self.refreshed = time.time()
+                self.status_body = None
+        finally:
+            with self.lock:
+                self.pending = None
+
+    def get(self) -> Inventory:
+        """
+        Get the inventory, refreshing it first if due and not already refreshing.
+
+        :return: Inventory object
+        """
+        if time.time() - self.refreshed >= self.refresh_interval:
+            if self.refresh_lock.acquire(blocking=False):
+                try:
+                    self.refresh()
+                finally:
+                    self.refresh_lock.release()
+        return self.inventory
+
+    def find(self, name: str) -> Optional[IP_ACG]:
+        """
+        Find an IP ACG in the inventory by base name, as in `plan_ip_acgs`:
+        of a rotated IP ACG, the latest version.
+
+        :param name: IP ACG name
+        :return: IP ACG, if any
+        """
+        with self.lock:
+            return index_latest(self.inventory.ip_acgs).get(split_version(name)[0])
+
+    def put(self, ip_acg: IP_ACG, directories: Optional[list[Directory]] = None) -> None:
+        """
+        Add or replace an IP ACG in the inventory, by id, after it is applied in AWS.
+
+        :param ip_acg: applied IP ACG, as in AWS
+        :param directories: directories the IP ACG is associated with in AWS
+        """
+        with self.lock:
+            self._put(ip_acg, directories or [])
+            if self.pending is not None:
+                self.pending.append((ip_acg, directories or []))
+            self.status_body = None
+
+    def _put(self, ip_acg: IP_ACG, directories: list[Directory]) -> None:
+        ip_acgs = [item for item in self.inventory.ip_acgs if item.id != ip_acg.id]
+        self.inventory = Inventory(
+            directories=self.inventory.directories,
+            ip_acgs=sorted(ip_acgs + [ip_acg], key=lambda x: x.name),
+        )
+        associated = {
+            directory.id
+            for directory in self.inventory.directories
+            if ip_acg.id in (directory.ip_acgs or [])
+        }
+        update_associations(
+            self.inventory,
+            [
+                (directory, [ip_acg])
+                for directory in directories
+                if directory.id not in associated
+            ],
+            [],
+        )
+
+    def get_status_body(self) -> bytes:
+        """
+        Get the status response: the inventory as JSON records.
+
+        :return: serialized status
+        """
+        inventory = self.get()
+        body = self.status_body
+        if body is None:
+            body = json.dumps(
+                {
+                    "refreshed_at": datetime.fromtimestamp(self.refreshed).isoformat(),
+                    "directories": list(to_records(inventory.directories, "inventory")),
+                    "ip_acgs": list(to_records(inventory.ip_acgs, "inventory")),
+                }
+            ).encode()
+            self.status_body = body
+        return body
+
+
+class Service:
+    """
+    Serve status, validation, plan and apply, over one shared WorkSpaces client,
+    rate limiter and inventory cache. Applies are serialized per IP ACG.
+    """
+
+    def __init__(self, cache: InventoryCache, execution: Execution) -> None:
+        self.cache = cache
+        self.execution = execution
+        self.locks = KeyedLocks()
+
+    def validate(self, payload: dict) -> Settings:
+        """
+        Parse and validate a settings document.
+
+        :param payload: contents of a settings document
+        :return: validated Settings
+        """
+        settings = parse_settings(payload)
+        settings.work_instruction = val_work_instruction(settings)
+        return settings
+
+    def plan(self, settings: Settings) -> Plan:
+        """
+        Plan the IP ACGs of validated settings against the cached inventory.
+
+        :param settings: validated Settings
+        :return: Plan object
+        """
+        return plan_ip_acgs(self.cache.get().ip_acgs, settings.work_instruction.ip_acgs)
+
+    def apply_ip_acg(self, ip_acg: IP_ACG, settings: Settings) -> dict:
+        """
+        Create or update a single IP ACG, holding its lock.
+        The IP ACG is planned again under the lock, against the cache,
+        so concurrent applies of the same IP ACG are applied once.
+        A rotated IP ACG is updated in its latest version, as planned.
+
+        :param ip_acg: IP ACG of the work instruction
+        :param settings: validated Settings
+        :return: result of the operation
+        """
+        work_instruction = settings.work_instruction
+
+        with self.locks.lock(split_version(ip_acg.name)[0]):
+            current = self.cache.find(ip_acg.name)
+
+            if current is None:
+                if not create_ip_acg(ip_acg, dict(work_instruction.tags)):
+                    return {
+                        "name": ip_acg.name,
+                        "operation": "create",
+                        "status": "skipped",
+                    }
+
+                directories = get_ip_acg_directories(
+                    ip_acg, work_instruction, self.cache.get()
+                )
+                for directory in directories:
+                    associate_ip_acg([ip_acg], directory)
+                self.cache.put(ip_acg, directories)
+                operation = "create"
+
+            elif get_rule_set(ip_acg) != get_rule_set(current):
+                ip_acg.id = current.id
+                update_rules(ip_acg)
+                self.cache.put(replace(current, rules=ip_acg.rules))
+                operation = "update"
+
+            else:
+                return {"name": ip_acg.name, "id": current.id, "operation": "none"}
+
+        return {"name": ip_acg.name, "id": ip_acg.id, "operation": operation}
+
+    def apply(self, settings: Settings) -> list[dict]:
+        """
+        Apply the IP ACGs of validated settings that differ from the cache,
+        concurrently up to the configured concurrency.
+
+        :param settings: validated Settings
+        :return: results of the operations
+        """
+        plan = self.plan(settings)
+        return run_concurrently(
+            lambda ip_acg: self.apply_ip_acg(ip_acg, settings),
+            plan.create + plan.update,
+            self.execution.concurrency,
+        )
+
+
+def to_plan_body(plan: Plan) -> dict:
+    """
+    Convert a plan to a response body.
+
+    :param plan: Plan object
+    :return: IP ACGs per operation, as records
+    """
+    return {
+        operation: list(to_records(getattr(plan, operation), "work_instruction"))
+        for operation in ("create", "update", "unchanged")
+    }
+
+
+_messages: ContextVar[Optional[list[str]]] = ContextVar("messages", default=None)
+
+
+class MessageCollector(logging.Handler):
+    """
+    Collect log messages, e.g. validation errors, into the list of the current
+    request, if any. The list is a context variable, so messages logged by
+    worker threads of the request (see `run_concurrently`) are collected too.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(logging.INFO)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        messages = _messages.get()
+        if messages is not None:
+            messages.append(record.getMessage())
+
+
+@contextmanager
+def collect_messages() -> Iterator[list[str]]:
+    """
+    Collect the log messages of the enclosed block.
+
+    :return: list, filled with the messages
+    """
+    messages = []
+    token = _messages.set(messages)
+    try:
+        yield messages
+    finally:
+        _messages.reset(token)
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Handle requests:
+    - GET /status: cached inventory
+    - POST /validate: validate a settings document
+    - POST /plan: plan a settings document against the cached inventory
+    - POST /apply[?dryrun=true]: apply a settings document
+
+    Settings documents are posted as YAML or JSON.
+    """
+
+    service: Service = None
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format, *args, extra={"depth": 1})
+
+    def send_body(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, status: int, payload: dict) -> None:
+        self.send_body(status, json.dumps(payload, default=str).encode())
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/status":
+            self.send_body(200, self.service.cache.get_status_body())
+        else:
+            self.send_json(404, {"error": f"Unknown path [{self.path}]"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path not in ("/validate", "/plan", "/apply"):
+            self.send_json(404, {"error": f"Unknown path [{self.path}]"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = yaml.safe_load(self.rfile.read(length))
+        except (ValueError, yaml.YAMLError) as e:
+            self.send_json(400, {"error": f"Could not parse settings document: {e}"})
+            return
+        if not isinstance(payload, dict):
+            self.send_json(400, {"error": "Settings document is not a mapping."})
+            return
+
+        with collect_messages() as messages:
+            try:
+                settings = self.service.validate(payload)
+            except SystemExit:
+                self.send_json(422, {"valid": False, "messages": messages})
+                return
+
+            if url.path == "/validate":
+                self.send_json(200, {"valid": True})
+                return
+
+            dryrun = parse_qs(url.query).get("dryrun", ["false"])[0] == "true"
+            if url.path == "/plan" or dryrun:
+                self.send_json(200, to_plan_body(self.service.plan(settings)))
+                return
+
+            try:
+                results = self.service.apply(settings)
+            except SystemExit:
+                self.send_json(502, {"applied": False, "messages": messages})
+                return
+
+        self.send_json(200, {"applied": True, "results": results})
+
+
+def create_server(
+    host: str, port: int, execution: Execution, refresh_interval: float
+) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server, with one shared client, rate limiter and inventory cache.
+
+    :param host: host to bind to
+    :param port: port to bind to, 0 for any free port
+    :param execution: concurrency and rate limit of AWS calls
+    :param refresh_interval: seconds between refreshes of the inventory
+    :return: server, not yet serving
+    """
+    limit_workspaces(execution.rate_limit)
+    if not any(isinstance(h, MessageCollector) for h in logger.handlers):
+        logger.addHandler(MessageCollector())
+
+    cache = InventoryCache(refresh_interval)
+    cache.refresh()
+
+    handler = type("ServiceHandler", (Handler,), {"service": Service(cache, execution)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+@click.command()
+@click.option("--host", default=HOST_DEFAULT, help=click_help["host"])
+@click.option("--port", type=int, default=PORT_DEFAULT, help=click_help["port"])
+@click.option(
+    "--refresh-interval",
+    type=click.FloatRange(min=1),
+    default=REFRESH_INTERVAL_DEFAULT,
+    help=click_help["refresh_interval"],
+)
+@click.option("--debug", is_flag=True, default=False, help=click_help["debug"])
+def serve(host: str, port: int, refresh_interval: float, debug: bool) -> None:
+    """
+    Serve status, validation, plan and apply over HTTP.
+
+    :param host: host to bind to
+    :param port: port to bind to
+    :param refresh_interval: seconds between refreshes of the inventory
+    :param debug: debug mode enabled.
+    """
+    setup_logger("acgenius", debug)
+
+    execution = parse_settings().execution
+    server = create_server(host, port, execution, refresh_interval)
+
+    logger.info(
+        f"Serve on [http://{host}:{server.server_address[1]}] "
+        f"with concurrency [{execution.concurrency}] "
+        f"and rate limit [{execution.rate_limit}] calls/s. Stop with Ctrl+C.",
+        extra={"depth": 1},
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopped serving.", extra={"depth": 1})
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    serve()
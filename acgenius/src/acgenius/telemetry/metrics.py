@@ -0,0 +1,198 @@
+import json
+import threading
+import time
+from typing import Any, Callable
+
+from acgenius.telemetry.tracing import span
+
+OUTCOME_OK = "ok"
+
+
+class Metrics:
+    """
+    Collect the latency, outcome and retries of every AWS WorkSpaces call.
+    Thread safe, so calls made concurrently are recorded as well.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Drop all recorded calls and restart the wall clock.
+        """
+        with self.lock:
+            self.calls: dict[str, list[tuple[float, str, int]]] = {}
+            self.started = time.perf_counter()
+
+    def record(
+        self, operation: str, latency: float, outcome: str, retries: int
+    ) -> None:
+        """
+        Record a single call.
+
+        :param operation: name of the client method, e.g. 'describe_ip_groups'
+        :param latency: duration of the call, in seconds
+        :param outcome: 'ok', or the error code of the call
+        :param retries: retry attempts made by the client
+        """
+        with self.lock:
+            self.calls.setdefault(operation, []).append((latency, outcome, retries))
+
+    def summary(self) -> dict:
+        """
+        Summarize the recorded calls per operation.
+
+        :return: calls, errors per code, retries and p50/p95/max/total latency
+            per operation, plus the total wall time and time spent in calls
+        """
+        with self.lock:
+            calls = {
+                operation: list(records) for operation, records in self.calls.items()
+            }
+            wall_time = time.perf_counter() - self.started
+
+        operations = {}
+        for operation, records in sorted(calls.items()):
+            latencies = sorted(latency for latency, _, _ in records)
+            errors = {}
+            for _, outcome, _ in records:
+                if outcome != OUTCOME_OK:
+                    errors[outcome] = errors.get(outcome, 0) + 1
+
+            operations[operation] = {
+                "calls": len(records),
+                "errors": errors,
+                "retries": sum(retries for _, _, retries in records),
+                "p50_ms": percentile(latencies, 50) * 1000,
+                "p95_ms": percentile(latencies, 95) * 1000,
+                "max_ms": latencies[-1] * 1000,
+                "total_ms": sum(latencies) * 1000,
+            }
+
+        return {
+            "wall_time_s": wall_time,
+            "calls": sum(op["calls"] for op in operations.values()),
+            "call_time_s": sum(op["total_ms"] for op in operations.values()) / 1000,
+            "operations": operations,
+        }
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """
+    Get a percentile with the nearest-rank method.
+
+    :param values: sorted values
+    :param pct: percentile, between 0 and 100
+    :return: value at the percentile, or 0.0 if there are no values
+    """
+    if not values:
+        return 0.0
+    rank = max(1, -(-len(values) * pct // 100))
+    return values[int(rank) - 1]
+
+
+metrics = Metrics()
+
+
+def get_retries(payload: Any) -> int:
+    """
+    Get the retry attempts reported by botocore in a response or error response.
+
+    :param payload: response of a call, or `response` of a ClientError
+    :return: retry attempts, 0 if not reported
+    """
+    if not isinstance(payload, dict):
+        return 0
+    return payload.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+
+
+def instrument(operation: str, call: Callable) -> Callable:
+    """
+    Wrap a client method, to record each call in `metrics`,
+    and as a span in the trace, if tracing.
+
+    :param operation: name of the client method
+    :param call: client method
+    :return: wrapped client method
+    """
+
+    def instrumented(*args, **kwargs) -> Any:
+        ids = {key: value for key, value in kwargs.items() if isinstance(value, str)}
+        start = time.perf_counter()
+        try:
+            with span(operation, "aws", **ids):
+                response = call(*args, **kwargs)
+        except Exception as e:
+            from acgenius.routing.errors import get_error_code
+
+            metrics.record(
+                operation,
+                time.perf_counter() - start,
+                get_error_code(e),
+                get_retries(getattr(e, "response", None)),
+            )
+            raise
+
+        metrics.record(
+            operation, time.perf_counter() - start, OUTCOME_OK, get_retries(response)
+        )
+        return response
+
+    return instrumented
+
+
+def format_summary(summary: dict) -> str:
+    """
+    Render a metrics summary as a human readable table.
+
+    :param summary: summary from `Metrics.summary`
+    :return: rendered summary
+    """
+    from acgenius.resources.utils import format_table
+
+    rows = [
+        (
+            operation,
+            stats["calls"],
+            sum(stats["errors"].values()),
+            stats["retries"],
+            f"{stats['p50_ms']:.1f}",
+            f"{stats['p95_ms']:.1f}",
+            f"{stats['max_ms']:.1f}",
+            f"{stats['total_ms']:.1f}",
+        )
+        for operation, stats in summary["operations"].items()
+    ]
+    table = format_table(
+        rows,
+        (
+            "operation",
+            "calls",
+            "errors",
+            "retries",
+            "p50 [ms]",
+            "p95 [ms]",
+            "max [ms]",
+            "total [ms]",
+        ),
+        "psql",
+    )
+    return (
+        f"{table}\n"
+        f"Calls: {summary['calls']}, "
+        f"time in calls: {summary['call_time_s']:.3f} s, "
+        f"wall time: {summary['wall_time_s']:.3f} s\n"
+    )
+
+
+def write_summary(summary: dict, path: str) -> None:
+    """
+    Write a metrics summary as JSON.
+
+    :param summary: summary from `Metrics.summary`
+    :param path: path of the JSON file
+    """
+    with open(path, "w") as stats_file:
+        json.dump(summary, stats_file, indent=4)
@@ -0,0 +1,182 @@
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from typing import Optional, TextIO
+
+from acgenius.telemetry.tracing import tracer
+
+PROFILE_TOP_N = 25
+
+# Spans to measure memory for, and allocation sites to show per span.
+MEMORY_PHASES = (
+    "inventory",
+    "parse_settings",
+    "validate_work_instruction",
+    "render_report",
+)
+MEMORY_TOP_SITES = 5
+
+
+def start_profile() -> cProfile.Profile:
+    """
+    Start profiling the calling thread with cProfile.
+
+    :return: running profiler
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    return profile
+
+
+def write_profile(
+    profile: cProfile.Profile,
+    path: str,
+    top: int = PROFILE_TOP_N,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """
+    Stop profiling, dump the stats, and print the functions with most cumulative time.
+    The pstats file can be inspected with e.g. `python -m pstats` or snakeviz.
+
+    :param profile: running profiler
+    :param path: path of the pstats file
+    :param top: number of functions to print
+    :param stream: stream to print to (default: stderr)
+    """
+    profile.disable()
+    profile.dump_stats(path)
+
+    stats = pstats.Stats(profile, stream=stream or sys.stderr)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+
+
+class MemoryProfiler:
+    """
+    Measure peak memory and top allocation sites per phase, with tracemalloc.
+
+    Phases are the spans named in `phases`, entered on the thread that started
+    the profiler. The peak of a phase includes the peaks of its nested phases.
+    Allocation sites are the lines with the largest growth in traced memory
+    between the start and the end of the phase.
+    """
+
+    def __init__(
+        self, phases: tuple = MEMORY_PHASES, top: int = MEMORY_TOP_SITES
+    ) -> None:
+        self.phases = phases
+        self.top = top
+        self.thread = None
+        self.stack: list[dict] = []
+        self.results: list[dict] = []
+
+    def start(self) -> None:
+        """
+        Start tracing allocations, and listen to the spans of the tracer.
+        """
+        tracemalloc.start()
+        self.thread = threading.get_ident()
+        tracer.add_listener(self)
+
+    def stop(self) -> None:
+        """
+        Stop listening to spans and tracing allocations.
+        """
+        tracer.remove_listener(self)
+        tracemalloc.stop()
+
+    def _tracks(self, name: str) -> bool:
+        return name in self.phases and threading.get_ident() == self.thread
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+    def enter(self, name: str, cat: str) -> None:
+        if not self._tracks(name):
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self.stack:
+            self.stack[-1]["peak"] = max(self.stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+
+        self.stack.append(
+            {
+                "name": name,
+                "start": current,
+                "peak": current,
+                "snapshot": self._snapshot(),
+            }
+        )
+
+    def exit(self, name: str, cat: str) -> None:
+        if not self._tracks(name) or not self.stack or self.stack[-1]["name"] != name:
+            return
+
+        phase = self.stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(phase["peak"], peak)
+        if self.stack:
+            self.stack[-1]["peak"] = max(self.stack[-1]["peak"], peak)
+
+        sites = self._snapshot().compare_to(phase["snapshot"], "lineno")
+        self.results.append(
+            {
+                "phase": name,
+                "peak_bytes": peak,
+                "allocated_bytes": current - phase["start"],
+                "sites": [
+                    {
+                        "site": f"{get_short_path(site.traceback[0].filename)}:"
+                        f"{site.traceback[0].lineno}",
+                        "size_diff_bytes": site.size_diff,
+                        "count_diff": site.count_diff,
+                    }
+                    for site in sites[: self.top]
+                ],
+            }
+        )
+
+    def format_report(self) -> str:
+        """
+        Render the measured phases as a human readable table,
+        in order of completion.
+
+        :return: rendered report
+        """
+        from acgenius.resources.utils import format_table
+
+        rows = []
+        for result in self.results:
+            sites = result["sites"] or [{"site": "", "size_diff_bytes": 0}]
+            for i, site in enumerate(sites):
+                rows.append(
+                    (
+                        result["phase"] if i == 0 else "",
+                        f"{result['peak_bytes'] / 1024:.1f}" if i == 0 else "",
+                        f"{result['allocated_bytes'] / 1024:.1f}" if i == 0 else "",
+                        site["site"],
+                        f"{site['size_diff_bytes'] / 1024:.1f}",
+                    )
+                )
+
+        return format_table(
+            rows,
+            ("phase", "peak [KiB]", "retained [KiB]", "top allocation site", "[KiB]"),
+            "psql",
+        )
+
+
+def get_short_path(path: str) -> str:
+    """
+    Shorten a source path to its last three parts, for readable reports.
+
+    :param path: source path
+    :return: shortened path
+    """
+    return "/".join(path.split(os.sep)[-3:])
@@ -0,0 +1,174 @@
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+class Tracer:
+    """
+    Collect timing spans of a run, as Chrome trace events.
+
+    Spans are only recorded once the tracer is started, so instrumented code
+    costs next to nothing in regular runs. Spans of concurrent threads are
+    recorded with their thread id, so overlapping work shows on separate tracks.
+
+    Listeners (e.g. the memory profiler) are notified when a span is entered
+    and exited, whether or not spans are recorded.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.enabled = False
+        self.recording = False
+        self.listeners: list = []
+        self.events: list[dict] = []
+        self.origin = time.perf_counter()
+
+    def start(self) -> None:
+        """
+        Drop previous spans and start recording.
+        """
+        with self.lock:
+            self.events = []
+            self.origin = time.perf_counter()
+            self.recording = True
+            self.enabled = True
+
+    def stop(self) -> None:
+        """
+        Stop recording.
+        """
+        self.recording = False
+        self.enabled = bool(self.listeners)
+
+    def add_listener(self, listener) -> None:
+        """
+        Notify a listener of spans, through its `enter` and `exit` methods,
+        both called with the name and category of the span.
+
+        :param listener: listener to add
+        """
+        self.listeners.append(listener)
+        self.enabled = True
+
+    def remove_listener(self, listener) -> None:
+        """
+        Stop notifying a listener of spans.
+
+        :param listener: listener to remove
+        """
+        self.listeners.remove(listener)
+        self.enabled = self.recording or bool(self.listeners)
+
+    def add(self, name: str, cat: str, start: float, end: float, args: dict) -> None:
+        """
+        Record a completed span.
+
+        :param name: name of the span, e.g. 'fetch_ip_acgs'
+        :param cat: category of the span, e.g. 'phase' or 'aws'
+        :param start: start, from time.perf_counter
+        :param end: end, from time.perf_counter
+        :param args: details shown with the span in the trace viewer
+        """
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - self.origin) * 1_000_000,
+            "dur": (end - start) * 1_000_000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Get the recorded spans in Chrome trace event format,
+        with the threads named in order of appearance.
+
+        :return: trace, to be written as JSON
+        """
+        with self.lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+
+        thread_ids = list(dict.fromkeys(event["tid"] for event in events))
+        names = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": "main" if i == 0 else f"worker-{i}"},
+            }
+            for i, tid in enumerate(thread_ids)
+        ]
+
+        return {"traceEvents": names + events, "displayTimeUnit": "ms"}
+
+
+tracer = Tracer()
+
+
+@contextmanager
+def span(name: str, cat: str = "phase", **args) -> Iterator[None]:
+    """
+    Time the enclosed block as a span, if the tracer is started,
+    and notify the listeners of the tracer, if any.
+
+    :param name: name of the span
+    :param cat: category of the span
+    :param args: details shown with the span in the trace viewer
+    """
+    if not tracer.enabled:
+        yield
+        return
+
+    listeners = list(tracer.listeners)
+    for listener in listeners:
+        listener.enter(name, cat)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        for listener in reversed(listeners):
+            listener.exit(name, cat)
+        if tracer.recording:
+            tracer.add(name, cat, start, end, args)
+
+
+def traced(name: str, cat: str = "phase") -> Callable:
+    """
+    Decorate a function, to time each call as a span.
+
+    :param name: name of the span
+    :param cat: category of the span
+    :return: decorator
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, cat):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def write_trace(path: str) -> None:
+    """
+    Write the recorded spans as Chrome trace event JSON,
+    to open in chrome://tracing or https://ui.perfetto.dev.
+
+    :param path: path of the JSON file
+    """
+    tracer.stop()
+    with open(path, "w") as trace_file:
+        json.dump(tracer.to_chrome_trace(), trace_file)
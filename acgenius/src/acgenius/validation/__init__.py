@@ -1,12 +1,14 @@
 import logging
 
 from acgenius.resources.models import Settings, WorkInstruction
+from acgenius.telemetry.tracing import traced
 from acgenius.validation.ip_acgs import val_ip_acgs
 from acgenius.validation.rules import val_rules
 
 logger = logging.getLogger("acgenius")
 
 
+@traced("validate_work_instruction")
 def val_work_instruction(settings: Settings) -> WorkInstruction:
     """
     Validate work instruction: IP ACGs and their rules.
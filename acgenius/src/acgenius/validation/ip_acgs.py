@@ -4,6 +4,7 @@ from typing import Counter
 from acgenius.config import STD_INSTR_DEBUG, STD_INSTR_SETTINGS
 from acgenius.resources.models import IP_ACG, Inventory, Settings, WorkInstruction
 from acgenius.routing.errors import process_error
+from acgenius.telemetry.tracing import traced
 
 logger = logging.getLogger("acgenius")
 
@@ -95,7 +96,7 @@ def val_ip_acg_name_unique(ip_acg_name_list: list) -> None:
     logger.debug(
         "Validate that the IP ACG name is not a duplicate...", extra={"depth": 4}
     )
-    logger.debug(f"IP ACG name list: {ip_acg_name_list}", extra={"depth": 5})
+    logger.debug("IP ACG name list: %s", ip_acg_name_list, extra={"depth": 5})
 
     duplicates = [k for k, v in Counter(ip_acg_name_list).items() if v > 1]
 
@@ -155,6 +156,66 @@ def val_ip_acg_description_length_allowed(ip_acg: IP_ACG, settings: Settings) ->
         process_error(error_map, error_code, MSG_GENERIC)
 
 
+def val_ip_acg_directories(ip_acg: IP_ACG) -> None:
+    """
+    Validate that the directories an IP ACG lists, if any, are unique directory ids.
+
+    :param ip_acg: IP ACG
+    """
+    logger.debug(
+        "Validate that the directories of the IP ACG are unique ids...",
+        extra={"depth": 4},
+    )
+    if ip_acg.directories is None:
+        return
+
+    if not isinstance(ip_acg.directories, list) or not all(
+        isinstance(directory_id, str) and directory_id
+        for directory_id in ip_acg.directories
+    ):
+        error_code = "IPACGDirectoriesFormatException"
+        error_map = {
+            "IPACGDirectoriesFormatException": {
+                "msg": f"The directories of IP ACG [{ip_acg.name}] should be "
+                'a list of directory ids, e.g. - "d-1234567890". '
+                f"{STD_INSTR_SETTINGS}",
+                "crash": True,
+            }
+        }
+        process_error(error_map, error_code, MSG_GENERIC)
+
+    duplicates = [k for k, v in Counter(ip_acg.directories).items() if v > 1]
+    if duplicates:
+        error_code = "IPACGDirectoriesDuplicateException"
+        error_map = {
+            "IPACGDirectoriesDuplicateException": {
+                "msg": f"Duplicate directories found for IP ACG [{ip_acg.name}]: "
+                f"{duplicates}. {STD_INSTR_SETTINGS}",
+                "crash": True,
+            }
+        }
+        process_error(error_map, error_code, MSG_GENERIC)
+
+
+def get_ip_acg_names_per_directory(ip_acgs: list[IP_ACG]) -> dict:
+    """
+    Get the names of the IP ACGs that may be associated with each directory:
+    IP ACGs without directories of their own go to any directory,
+    IP ACGs with directories only to those.
+
+    :param ip_acgs: IP ACGs
+    :return: names of IP ACGs per directory id; key None for any other directory
+    """
+    names_any = [ip_acg.name for ip_acg in ip_acgs if not ip_acg.directories]
+    names_per_directory = {None: names_any}
+    for ip_acg in ip_acgs:
+        for directory_id in ip_acg.directories or []:
+            names_per_directory.setdefault(directory_id, list(names_any))
+            names_per_directory[directory_id].append(ip_acg.name)
+    return names_per_directory
+
+
+@traced("validate_ip_acgs")
 def val_ip_acgs(
     work_instruction: WorkInstruction, settings: Settings
 ) -> WorkInstruction:
@@ -171,12 +232,15 @@ def val_ip_acgs(
 
     ip_acg_name_list = []
     for ip_acg in work_instruction.ip_acgs:
-        logger.debug(f"Start: IP ACG [{ip_acg.name}]...", extra={"depth": 3})
+        logger.debug("Start: IP ACG [%s]...", ip_acg.name, extra={"depth": 3})
         ip_acg_name_list.append(ip_acg.name)
-        val_amt_groups_per_directory_allowed(ip_acg_name_list, settings)
         val_ip_acg_name_unique(ip_acg_name_list)
         val_ip_acg_name_length_allowed(ip_acg, settings)
         val_ip_acg_description_length_allowed(ip_acg, settings)
+        val_ip_acg_directories(ip_acg)
+
+    for names in get_ip_acg_names_per_directory(work_instruction.ip_acgs).values():
+        val_amt_groups_per_directory_allowed(names, settings)
 
     logger.debug("Finish: validate IP rules of settings.yaml...", extra={"depth": 2})
 
@@ -197,7 +261,7 @@ def val_ip_acgs_match_inventory(matches: int, inventory: Inventory) -> bool:
         "Validate if all IP ACGs from the inventory could be matched by name",
         extra={"depth": 1},
     )
-    logger.debug(f"Matches: [{matches}]...", extra={"depth": 1})
+    logger.debug("Matches: [%s]...", matches, extra={"depth": 1})
     logger.debug(
         f"Inventory [ip_acgs] length: [{len(inventory.ip_acgs)}]...", extra={"depth": 1}
     )
@@ -4,8 +4,9 @@ from collections import Counter
 from typing import Optional
 
 from acgenius.config import STD_INSTR_DEBUG, STD_INSTR_SETTINGS
-from acgenius.resources.models import Rule, Settings, WorkInstruction
+from acgenius.resources.models import Network, Rule, Settings, WorkInstruction
 from acgenius.routing.errors import process_error
+from acgenius.telemetry.tracing import traced
 from acgenius.validation.utils import remove_whitespaces, split_ip_and_prefix
 
 logger = logging.getLogger("acgenius")
@@ -21,7 +22,8 @@ def val_ip_linebreaks_absent(rule: Rule) -> Optional[bool]:
     :return: None if no linebreaks are found, False otherwise
     """
     logger.debug(
-        f"Validate that there are no linebreaks in IP rule [{rule.ip}]...",
+        "Validate that there are no linebreaks in IP rule [%s]...",
+        rule.ip,
         extra={"depth": 5},
     )
 
@@ -44,7 +46,7 @@ def val_ip_format_correct(ip: str) -> Optional[bool]:
     :param ip: IP address to validate
     :return: None if IP address follows IPv4 format, False otherwise
     """
-    logger.debug(f"Validate IPv4 format for ip [{ip}]...", extra={"depth": 5})
+    logger.debug("Validate IPv4 format for ip [%s]...", ip, extra={"depth": 5})
 
     pattern = r"^((25[0-5]|(2[0-4]|1\d|[1-9]|)\d)(\.(?!$)|$)){4}$"
 
@@ -69,7 +71,8 @@ def val_ip_allowed(ip: str, settings: Settings) -> Optional[bool]:
     :return: None if IP address is not in disallowed IPs, False otherwise
     """
     logger.debug(
-        f"Validate IP address [{ip}] against disallowed IPs from settings.yaml...",
+        "Validate IP address [%s] against disallowed IPs from settings.yaml...",
+        ip,
         extra={"depth": 5},
     )
 
@@ -100,7 +103,7 @@ def val_prefix_allowed(prefix: int, settings: Settings) -> bool:
     prefix_min = settings.validation.prefix_min
     prefix_default = settings.validation.prefix_default
 
-    logger.debug(f"Validate prefix [{prefix}]...", extra={"depth": 5})
+    logger.debug("Validate prefix [%s]...", prefix, extra={"depth": 5})
     if not prefix_min <= prefix <= prefix_default:
         error_code = "RulePrefixInvalidException"
         error_map = {
@@ -124,7 +127,7 @@ def val_rule_desc_length(rule: Rule, settings: Settings) -> Optional[bool]:
     rules_desc_length_max = settings.validation.rules_desc_length_max
 
     logger.debug(
-        f"Validate rule description length for rule [{rule}]...", extra={"depth": 5}
+        "Validate rule description length for rule [%s]...", rule, extra={"depth": 5}
     )
     if len(rule.desc) > rules_desc_length_max:
         error_code = "RuleDescriptionLengthException"
@@ -150,7 +153,7 @@ def val_rule_unique(rule_list: list) -> Optional[bool]:
         "Validate that there are no duplicate rules within the IP ACG...",
         extra={"depth": 4},
     )
-    logger.debug(f"Rule list: {rule_list}", extra={"depth": 5})
+    logger.debug("Rule list: %s", rule_list, extra={"depth": 5})
 
     duplicates = [k for k, v in Counter(rule_list).items() if v > 1]
 
@@ -180,7 +183,8 @@ def val_amt_rules_allowed(rule_list: list, settings: Settings) -> Optional[bool]
     amt_rules_max = settings.validation.rules_amt_max
 
     logger.debug(
-        f"Validate that the maximum number of IP rules is [{amt_rules_max}] or less...",
+        "Validate that the maximum number of IP rules is [%s] or less...",
+        amt_rules_max,
         extra={"depth": 5},
     )
     amt_rules = len(rule_list)
@@ -211,6 +215,7 @@ def val_amt_rules_allowed(rule_list: list, settings: Settings) -> Optional[bool]
         process_error(error_map, error_code, MSG_GENERIC)
 
 
+@traced("validate_rules")
 def val_rules(work_instruction: WorkInstruction, settings: Settings) -> WorkInstruction:
     """
     Integrate all Rule validations (Rule level).
@@ -221,11 +226,13 @@ def val_rules(work_instruction: WorkInstruction, settings: Settings) -> WorkInst
     """
     logger.debug("Start: validate IP rules of settings.yaml...", extra={"depth": 2})
     for ip_acg in work_instruction.ip_acgs:
-        logger.debug(f"Start: IP ACG [{ip_acg.name}]...", extra={"depth": 3})
+        logger.debug("Start: IP ACG [%s]...", ip_acg.name, extra={"depth": 3})
         rule_list = []
         for rule in ip_acg.rules:
             logger.debug(
-                f"Start: Rule: IP address [{rule.ip}]; description [{rule.desc}]...",
+                "Start: Rule: IP address [%s]; description [%s]...",
+                rule.ip,
+                rule.desc,
                 extra={"depth": 4},
             )
             rule.ip = remove_whitespaces(rule)
@@ -238,10 +245,11 @@ def val_rules(work_instruction: WorkInstruction, settings: Settings) -> WorkInst
             val_ip_allowed(ip, settings)
             val_prefix_allowed(prefix, settings)
             val_rule_desc_length(rule, settings)
+            rule.network = Network.from_cidr(f"{ip}/{prefix}")
 
         val_rule_unique(rule_list)
         val_amt_rules_allowed(rule_list, settings)
-        logger.debug(f"Finish: IP ACG [{ip_acg.name}]...", extra={"depth": 3})
+        logger.debug("Finish: IP ACG [%s]...", ip_acg.name, extra={"depth": 3})
 
     logger.debug("Finish: validate IP rules of settings.yaml...", extra={"depth": 2})
 
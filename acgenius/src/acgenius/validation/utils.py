@@ -1,11 +1,12 @@
-import json
 import logging
-from dataclasses import asdict
+import os
+from typing import Optional
 
 import yaml
 
-from acgenius.config import SETTINGS_FILE_PATH, STD_INSTR_SETTINGS
+from acgenius.config import SETTINGS_FILE_PATH, STD_INSTR_SETTINGS, LazyJSON
 from acgenius.resources.models import (
+    Execution,
     IP_ACG,
     Directory,
     Rule,
@@ -14,10 +15,21 @@ from acgenius.resources.models import (
     WorkInstruction,
 )
 from acgenius.routing.errors import get_error_code, process_error
+from acgenius.telemetry.tracing import span, traced
 
 logger = logging.getLogger("acgenius")
 
 
+def get_settings_mtime() -> float:
+    """
+    Get the time of the last modification of settings.yaml.
+
+    :return: modification time, in seconds since the epoch
+    """
+    return os.path.getmtime(SETTINGS_FILE_PATH)
+
+
+@traced("load_settings")
 def get_settings() -> dict:
     """
     Get settings from settings.yaml.
@@ -149,6 +161,61 @@ def get_validation_baseline(settings: Settings) -> Validation:
     )
 
 
+def get_execution(settings: Settings) -> Execution:
+    """
+    Get execution settings from the optional 'execution' section of settings.yaml.
+    Absent values fall back to the defaults of Execution.
+
+    :param settings: all settings required for the validation
+    :return: Execution object containing concurrency, rate limit and rollout waves
+    """
+    logger.debug("Get execution settings from settings.yaml...", extra={"depth": 2})
+
+    execution = settings.get("execution") or {}
+    default = Execution()
+
+    try:
+        concurrency = int(execution.get("concurrency", default.concurrency))
+        rate_limit = float(execution.get("rate_limit", default.rate_limit))
+        if concurrency < 1 or rate_limit <= 0:
+            raise ValueError(f"concurrency [{concurrency}], rate_limit [{rate_limit}]")
+
+        wave_size = execution.get("wave_size")
+        wave_percentage = execution.get("wave_percentage")
+        if wave_size is not None:
+            wave_size = int(wave_size)
+            if wave_size < 1:
+                raise ValueError(f"wave_size [{wave_size}]")
+        if wave_percentage is not None:
+            wave_percentage = float(wave_percentage)
+            if not 0 < wave_percentage <= 100:
+                raise ValueError(f"wave_percentage [{wave_percentage}]")
+
+        return Execution(
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            wave_size=wave_size,
+            wave_percentage=wave_percentage,
+        )
+
+    except Exception as e:
+        msg_generic = "Could not parse execution settings."
+        error_map = {
+            "ValueError": {
+                "msg": (
+                    "Please specify 'concurrency' as a whole number of 1 or more, "
+                    "'rate_limit' as a number of calls per second above 0, "
+                    "and if any, 'wave_size' as a whole number of 1 or more, "
+                    "and 'wave_percentage' as a number above 0, up to 100. "
+                    f"{STD_INSTR_SETTINGS}"
+                ),
+                "crash": True,
+            }
+        }
+        error_code = get_error_code(e)
+        process_error(error_map, error_code, msg_generic, e)
+
+
 def get_work_instruction(settings: Settings) -> WorkInstruction:
     """
     Parse retrieved settings to a WorkInstruction.
@@ -171,6 +238,7 @@ def get_work_instruction(settings: Settings) -> WorkInstruction:
                         name=ip_acg.get("name", ""),
                         desc=ip_acg.get("desc", ""),
                         origin=ip_acg.get("origin", ""),
+                        directories=ip_acg.get("directories") or None,
                         rules=[
                             Rule(ip, desc=desc)
                             for rule in (ip_acg.get("rules") or [])
@@ -203,38 +271,47 @@ def get_work_instruction(settings: Settings) -> WorkInstruction:
         process_error(error_map, error_code, msg_generic, e)
 
 
-def parse_settings() -> Settings:
+@traced("parse_settings")
+def parse_settings(settings: Optional[dict] = None) -> Settings:
     """
     Integrate parsing of settings.
 
-    :return: Settings object containing validation and work instruction
+    :param settings: contents of a settings document (default: read settings.yaml)
+    :return: Settings object containing validation, work instruction and execution
     """
     logger.debug("Parse settings...", extra={"depth": 1})
 
-    settings = get_settings()
-    val_settings_main_structure(settings)
-    val_settings_ip_acg_structure(settings)
+    if settings is None:
+        settings = get_settings()
+    with span("validate_structure"):
+        val_settings_main_structure(settings)
+        val_settings_ip_acg_structure(settings)
 
     logger.debug(
-        f"Settings retrieved from YAML file:\n{json.dumps(settings, indent=4)}",
+        "Settings retrieved from YAML file:\n%s",
+        LazyJSON(settings),
         extra={"depth": 2},
     )
 
     validation_baseline = get_validation_baseline(settings)
     logger.debug(
-        "Validation baseline parsed from YAML file:\n"
-        f"{json.dumps(asdict(validation_baseline), indent=4)}",
+        "Validation baseline parsed from YAML file:\n%s",
+        LazyJSON(validation_baseline),
         extra={"depth": 3},
     )
 
     work_instruction = get_work_instruction(settings)
     logger.debug(
-        "Work instruction parsed from YAML file:\n"
-        f"{json.dumps(asdict(work_instruction), indent=4)}",
+        "Work instruction parsed from YAML file:\n%s",
+        LazyJSON(work_instruction),
         extra={"depth": 3},
     )
 
-    return Settings(validation=validation_baseline, work_instruction=work_instruction)
+    return Settings(
+        validation=validation_baseline,
+        work_instruction=work_instruction,
+        execution=get_execution(settings),
+    )
 
 
 def split_ip_and_prefix(rule: Rule, settings: Settings) -> tuple[str, int]:
@@ -252,12 +329,12 @@ def split_ip_and_prefix(rule: Rule, settings: Settings) -> tuple[str, int]:
     if fwd_slash != -1:
         ip = rule.ip[:fwd_slash]
         prefix = int(rule.ip[fwd_slash + 1 :])
-        logger.debug(f"Prefix present, using user input: {prefix}", extra={"depth": 6})
+        logger.debug("Prefix present, using user input: %s", prefix, extra={"depth": 6})
 
     else:
         ip = rule.ip
         prefix = settings.validation.prefix_default
-        logger.debug(f"Prefix absent, using default: {prefix}", extra={"depth": 6})
+        logger.debug("Prefix absent, using default: %s", prefix, extra={"depth": 6})
 
     return ip, prefix
 
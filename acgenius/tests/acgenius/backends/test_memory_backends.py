@@ -0,0 +1,147 @@
+import pytest
+from botocore.exceptions import ClientError
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.directories.inventory import get_directories
+from acgenius.resources.ip_acgs.inventory import get_ip_acgs
+from acgenius.routing.errors import get_error_code
+
+
+def rules(n: int) -> list:
+    return [{"ipRule": f"10.0.0.{i}/32", "ruleDesc": f"rule{i}"} for i in range(n)]
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces(seed=1)
+    fake.add_directory("d-1", "corp.example.com")
+    return fake
+
+
+def get_code(call, *args, **kwargs) -> str:
+    with pytest.raises(ClientError) as exc_info:
+        call(*args, **kwargs)
+    return get_error_code(exc_info.value)
+
+
+def test_memory_lifecycle(fake):
+    group_id = fake.create_ip_group(
+        GroupName="acg1",
+        GroupDesc="desc1",
+        UserRules=rules(2),
+        Tags=[{"Key": "Owner", "Value": "team"}],
+    )["GroupId"]
+    fake.associate_ip_groups(DirectoryId="d-1", GroupIds=[group_id])
+    fake.authorize_ip_rules(GroupId=group_id, UserRules=rules(3)[2:])
+    fake.revoke_ip_rules(GroupId=group_id, UserRules=["10.0.0.0/32"])
+
+    group = fake.describe_ip_groups()["Result"][0]
+    assert [rule["ipRule"] for rule in group["userRules"]] == [
+        "10.0.0.1/32",
+        "10.0.0.2/32",
+    ]
+    directory = fake.describe_workspace_directories()["Directories"][0]
+    assert directory["ipGroupIds"] == [group_id]
+    assert fake.describe_tags(ResourceId=group_id)["TagList"] == [
+        {"Key": "Owner", "Value": "team"}
+    ]
+
+    assert get_code(fake.delete_ip_group, GroupId=group_id) == (
+        "ResourceAssociatedException"
+    )
+    fake.disassociate_ip_groups(DirectoryId="d-1", GroupIds=[group_id])
+    fake.delete_ip_group(GroupId=group_id)
+    assert fake.describe_ip_groups()["Result"] == []
+
+
+@pytest.mark.parametrize("call, kwargs, expected", [
+    # Too many rules
+    ("create_ip_group", {"GroupName": "acg", "UserRules": rules(11)},
+     "ResourceLimitExceededException"),
+    # Name too long
+    ("create_ip_group", {"GroupName": "a" * 51}, "InvalidParameterValuesException"),
+    # Unknown IP ACG
+    ("update_rules_of_ip_group", {"GroupId": "wsipg-x", "UserRules": []},
+     "ResourceNotFoundException"),
+    # Unknown directory
+    ("associate_ip_groups", {"DirectoryId": "d-x", "GroupIds": []},
+     "ResourceNotFoundException"),
+])
+def test_memory_limits(fake, call, kwargs, expected):
+    assert get_code(getattr(fake, call), **kwargs) == expected
+
+
+def test_memory_duplicate_name(fake):
+    fake.create_ip_group(GroupName="acg")
+    assert get_code(fake.create_ip_group, GroupName="acg") == (
+        "ResourceAlreadyExistsException"
+    )
+
+
+def test_memory_groups_per_directory(fake):
+    group_ids = [
+        fake.create_ip_group(GroupName=f"acg{i}")["GroupId"] for i in range(26)
+    ]
+    fake.associate_ip_groups(DirectoryId="d-1", GroupIds=group_ids[:25])
+    assert get_code(
+        fake.associate_ip_groups, DirectoryId="d-1", GroupIds=group_ids[25:]
+    ) == "ResourceLimitExceededException"
+
+
+def test_memory_pagination_followed_by_inventory(fake):
+    for i in range(60):
+        fake.create_ip_group(GroupName=f"acg{i}")
+        fake.add_directory(f"d-{i + 2}", f"dir{i}")
+
+    first_page = fake.describe_ip_groups()
+    assert len(first_page["Result"]) == 25
+    assert first_page["NextToken"]
+
+    config.set_workspaces(fake)
+    try:
+        assert len(get_ip_acgs()) == 60
+        assert len(get_directories()) == 61
+    finally:
+        config.set_workspaces(None)
+
+    assert fake.call_counts["DescribeIpGroups"] == 4
+    assert fake.call_counts["DescribeWorkspaceDirectories"] == 3
+
+
+def test_memory_throttling():
+    now = [0.0]
+    fake = InMemoryWorkSpaces(throttle_limit=2, throttle_window=1.0, clock=lambda: now[0])
+
+    fake.describe_ip_groups()
+    fake.describe_ip_groups()
+    assert get_code(fake.describe_ip_groups) == "ThrottlingException"
+
+    now[0] = 1.5
+    fake.describe_ip_groups()
+
+
+def test_memory_error_injection_is_reproducible():
+    def outcomes() -> list:
+        fake = InMemoryWorkSpaces(error_rate=0.5, seed=42)
+        result = []
+        for _ in range(20):
+            try:
+                fake.describe_ip_groups()
+                result.append("ok")
+            except ClientError as e:
+                result.append(get_error_code(e))
+        return result
+
+    assert outcomes() == outcomes()
+    assert set(outcomes()) == {"ok", "ServiceUnavailable"}
+
+
+def test_memory_latency():
+    waits = []
+    fake = InMemoryWorkSpaces(latency=0.2, jitter=0.1, seed=1, sleep=waits.append)
+
+    fake.describe_workspace_directories()
+
+    assert len(waits) == 1
+    assert 0.2 <= waits[0] <= 0.3
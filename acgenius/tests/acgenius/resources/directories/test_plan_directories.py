@@ -0,0 +1,72 @@
+import pytest
+
+from acgenius.resources.directories.plan import diff_associations, plan_associations
+from acgenius.resources.models import Directory, IP_ACG, Inventory, WorkInstruction
+
+
+def get_inventory():
+    return Inventory(
+        directories=[
+            Directory(id="d-0", name="dir0", ip_acgs=["wsipg-a", "wsipg-other"]),
+            Directory(id="d-1", name="dir1", ip_acgs=["wsipg-a"]),
+            Directory(id="d-2", name="dir2", ip_acgs=[]),
+        ],
+        ip_acgs=[],
+    )
+
+
+def get_work_instruction(directories_a, directories_b=None):
+    return WorkInstruction(
+        directories=[Directory(id=None, name=None)],
+        ip_acgs=[
+            IP_ACG(name="A", desc="", rules=[], id="wsipg-a", directories=directories_a),
+            IP_ACG(name="B", desc="", rules=[], directories=directories_b),
+        ],
+        tags={},
+    )
+
+
+@pytest.mark.parametrize("directories_a,directories_b,expected", [
+    # No directories listed: all IP ACGs go to all directories
+    (None, None, {"d-0": ["A", "B"], "d-1": ["A", "B"], "d-2": ["A", "B"]}),
+    # Listed directories only, the other IP ACG to all
+    (["d-2"], None, {"d-0": ["B"], "d-1": ["B"], "d-2": ["A", "B"]}),
+    # Each IP ACG its own directories; unknown directories are skipped
+    (["d-0"], ["d-1", "d-9"], {"d-0": ["A"], "d-1": ["B"], "d-2": []}),
+])
+def test_plan_associations(directories_a, directories_b, expected):
+    desired = plan_associations(
+        get_work_instruction(directories_a, directories_b), get_inventory()
+    )
+
+    assert {
+        directory.id: [ip_acg.name for ip_acg in ip_acgs]
+        for directory, ip_acgs in desired
+    } == expected
+
+
+def test_plan_associations_with_directories_specified():
+    work_instruction = get_work_instruction(None, ["d-2"])
+    work_instruction.directories = [Directory(id="d-0", name="dir0")]
+
+    desired = plan_associations(work_instruction, get_inventory())
+
+    assert {
+        directory.id: [ip_acg.name for ip_acg in ip_acgs]
+        for directory, ip_acgs in desired
+    } == {"d-0": ["A"], "d-1": [], "d-2": ["B"]}
+
+
+def test_diff_associations_changes_only_managed_ip_acgs():
+    inventory = get_inventory()
+    desired = plan_associations(get_work_instruction(["d-2"], ["d-1"]), inventory)
+
+    to_associate, to_disassociate = diff_associations(desired, inventory, {"wsipg-a"})
+
+    assert [
+        (directory.id, [ip_acg.name for ip_acg in ip_acgs])
+        for directory, ip_acgs in to_associate
+    ] == [("d-1", ["B"]), ("d-2", ["A"])]
+    assert [
+        (directory.id, ip_acg_ids) for directory, ip_acg_ids in to_disassociate
+    ] == [("d-0", ["wsipg-a"]), ("d-1", ["wsipg-a"])]
@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from acgenius.resources.ip_acgs.intervals import (
+    get_address_space, get_covered, merge_intervals, subtract_intervals, to_networks
+)
+from acgenius.resources.models import Network, Rule
+
+
+@pytest.mark.parametrize("intervals,expected", [
+    # Overlapping, nested and adjacent intervals are joined
+    ([(10, 20), (0, 5), (15, 30), (12, 13), (31, 40)], [(0, 5), (10, 40)]),
+    # Gap of one address is kept
+    ([(0, 5), (7, 9)], [(0, 5), (7, 9)]),
+    ([], []),
+])
+def test_merge_intervals(intervals, expected):
+    assert merge_intervals(intervals) == expected
+
+
+@pytest.mark.parametrize("a,b,expected", [
+    # Holes punched in one interval
+    ([(0, 100)], [(10, 20), (30, 40), (90, 200)], [(0, 9), (21, 29), (41, 89)]),
+    # One interval removing several
+    ([(0, 5), (10, 15), (20, 25)], [(3, 22)], [(0, 2), (23, 25)]),
+    # Nothing in common, and everything in common
+    ([(0, 5)], [(6, 10)], [(0, 5)]),
+    ([(0, 5)], [(0, 5)], []),
+])
+def test_subtract_intervals(a, b, expected):
+    assert subtract_intervals(a, b) == expected
+
+
+def test_subtract_intervals_brute_force():
+    rng = random.Random(0)
+    for _ in range(200):
+        a = merge_intervals(
+            (start, start + rng.randrange(20))
+            for start in rng.sample(range(200), 8)
+        )
+        b = merge_intervals(
+            (start, start + rng.randrange(20))
+            for start in rng.sample(range(200), 8)
+        )
+        expected = {
+            value for first, last in a for value in range(first, last + 1)
+        } - {value for first, last in b for value in range(first, last + 1)}
+
+        assert merge_intervals((v, v) for v in expected) == subtract_intervals(a, b)
+
+
+@pytest.mark.parametrize("cidrs,expected", [
+    # Range of 10 addresses
+    (["10.0.0.1/32", "10.0.0.2/31", "10.0.0.4/30", "10.0.0.8/31", "10.0.0.10/32"],
+     ["10.0.0.1/32", "10.0.0.2/31", "10.0.0.4/30", "10.0.0.8/31", "10.0.0.10/32"]),
+    # Adjacent networks join into a wider one
+    (["10.0.0.0/25", "10.0.0.128/25"], ["10.0.0.0/24"]),
+    # Whole address space
+    (["0.0.0.0/0", "10.0.0.0/8"], ["0.0.0.0/0"]),
+])
+def test_to_networks(cidrs, expected):
+    space = get_address_space(Rule(cidr, "") for cidr in cidrs)
+
+    assert [str(network) for network in to_networks(space)] == expected
+
+
+def test_get_covered():
+    space = get_address_space([Rule("10.0.0.0/24", ""), Rule("10.0.2.0/24", "")])
+    values = [Network.from_cidr(ip).address for ip in (
+        "10.0.2.255", "10.0.1.1", "9.255.255.255", "10.0.0.0"
+    )]
+
+    assert get_covered(space, values) == [values[0], values[3]]
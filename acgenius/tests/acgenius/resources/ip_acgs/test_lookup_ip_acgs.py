@@ -0,0 +1,125 @@
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+
+from acgenius.resources.ip_acgs.lookup import IPLookupIndex, lookup_addresses, parse_address
+from acgenius.resources.models import Directory, IP_ACG, Inventory, Network, Rule
+
+
+def get_inventory():
+    return Inventory(
+        directories=[
+            Directory(id="d-0", name="dir0", ip_acgs=["wsipg-office", "wsipg-host"]),
+            Directory(id="d-1", name="dir1", ip_acgs=["wsipg-office"]),
+        ],
+        ip_acgs=[
+            IP_ACG(id="wsipg-office", name="Office", desc="", rules=[
+                Rule("203.0.113.0/24", "office"),
+                Rule("198.51.100.0/30", "branch"),
+            ]),
+            IP_ACG(id="wsipg-host", name="Host", desc="", rules=[
+                Rule("203.0.113.57/32", "host"),
+            ]),
+            IP_ACG(id="wsipg-loose", name="Loose", desc="", rules=[
+                Rule("0.0.0.0/0", "anywhere"),
+            ]),
+        ],
+    )
+
+
+@pytest.mark.parametrize("address,expected", [
+    # Nested rules: the /24, the /32 within it, and the unassociated /0
+    ("203.0.113.57", [
+        ("wsipg-office", "203.0.113.0/24", ["d-0", "d-1"]),
+        ("wsipg-host", "203.0.113.57/32", ["d-0"]),
+        ("wsipg-loose", "0.0.0.0/0", []),
+    ]),
+    # Address right after the /32
+    ("203.0.113.58", [
+        ("wsipg-office", "203.0.113.0/24", ["d-0", "d-1"]),
+        ("wsipg-loose", "0.0.0.0/0", []),
+    ]),
+    # Last address of the /30
+    ("198.51.100.3", [
+        ("wsipg-office", "198.51.100.0/30", ["d-0", "d-1"]),
+        ("wsipg-loose", "0.0.0.0/0", []),
+    ]),
+    # Address right after the /30, and edges of the address space
+    ("198.51.100.4", [("wsipg-loose", "0.0.0.0/0", [])]),
+    ("0.0.0.0", [("wsipg-loose", "0.0.0.0/0", [])]),
+    ("255.255.255.255", [("wsipg-loose", "0.0.0.0/0", [])]),
+    # Invalid addresses
+    ("203.0.113", []),
+    ("203.0.113.256", []),
+])
+@pytest.mark.parametrize("numpy", [True, False])
+def test_lookup(address, expected, numpy):
+    with patch("acgenius.resources.ip_acgs.lookup.get_numpy") as mock_get_numpy:
+        if not numpy:
+            mock_get_numpy.return_value = None
+        else:
+            mock_get_numpy.side_effect = lambda: pytest.importorskip("numpy")
+
+        matches = lookup_addresses(address, get_inventory())
+
+    assert [
+        (match["id"], match["rule"], match["directory_ids"]) for match in matches
+    ] == expected
+
+
+def test_lookup_many_matches_brute_force():
+    rng = random.Random(0)
+    inventory = Inventory(
+        directories=[],
+        ip_acgs=[
+            IP_ACG(id=f"wsipg-{i}", name=f"G{i}", desc="", rules=[
+                Rule(f"10.{rng.randrange(4)}.{rng.randrange(256)}.0/{rng.choice((16, 22, 24, 28, 32))}", "")
+                for _ in range(10)
+            ])
+            for i in range(25)
+        ],
+    )
+    rules = [
+        (ip_acg.id, rule.network) for ip_acg in inventory.ip_acgs for rule in ip_acg.rules
+    ]
+    addresses = [
+        f"10.{rng.randrange(4)}.{rng.randrange(256)}.{rng.randrange(256)}"
+        for _ in range(2000)
+    ]
+
+    results = IPLookupIndex(inventory).lookup(addresses)
+
+    for address, matches in zip(addresses, results):
+        value = parse_address(address)
+        assert sorted((match["id"], match["rule"]) for match in matches) == sorted(
+            (ip_acg_id, str(network))
+            for ip_acg_id, network in rules
+            if network.first <= value <= network.last
+        )
+
+
+def test_lookup_bulk_is_fast():
+    pytest.importorskip("numpy")
+    rng = random.Random(0)
+    inventory = Inventory(
+        directories=[Directory(id="d-0", name="dir0", ip_acgs=[f"wsipg-{i}" for i in range(100)])],
+        ip_acgs=[
+            IP_ACG(id=f"wsipg-{i}", name=f"G{i}", desc="", rules=[
+                Rule(str(Network.from_cidr(f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.0/24")), "")
+                for _ in range(10)
+            ])
+            for i in range(100)
+        ],
+    )
+    addresses = [
+        ".".join(str(rng.randrange(256)) for _ in range(4)) for _ in range(100_000)
+    ]
+
+    index = IPLookupIndex(inventory)
+    start = time.perf_counter()
+    results = index.lookup(addresses)
+
+    assert len(results) == 100_000
+    assert time.perf_counter() - start < 1.0
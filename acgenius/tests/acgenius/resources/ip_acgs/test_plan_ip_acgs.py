@@ -0,0 +1,46 @@
+import pytest
+
+from acgenius.resources.ip_acgs.plan import plan_ip_acgs
+from acgenius.resources.models import IP_ACG, Rule
+
+
+def ip_acg(name, rules, id=None):
+    return IP_ACG(
+        id=id,
+        name=name,
+        desc=f"{name} description",
+        rules=[Rule(ip=ip, desc=desc) for ip, desc in rules],
+    )
+
+
+@pytest.mark.parametrize("inventory, desired, expected", [
+    # Empty inventory: create all
+    (None, [ip_acg("a", [("10.0.0.1", "x")])], (["a"], [], [])),
+    # Same rules, different notation and order: unchanged
+    ([ip_acg("a", [("10.0.0.2/32", "y"), ("10.0.0.1/32", "x")], id="wsipg-a")],
+     [ip_acg("a", [("10.0.0.1", "x"), ("10.0.0.2", "y")])],
+     ([], [], ["a"])),
+    # Different description of a rule: update
+    ([ip_acg("a", [("10.0.0.1/32", "x")], id="wsipg-a")],
+     [ip_acg("a", [("10.0.0.1", "z")])],
+     ([], ["a"], [])),
+    # Mixed
+    ([ip_acg("a", [("10.0.0.1/32", "x")], id="wsipg-a"),
+      ip_acg("b", [("10.0.0.2/32", "x")], id="wsipg-b")],
+     [ip_acg("a", [("10.0.0.1", "x")]),
+      ip_acg("b", [("10.0.0.3", "x")]),
+      ip_acg("c", [("10.0.0.4", "x")])],
+     (["c"], ["b"], ["a"])),
+])
+def test_plan_ip_acgs(inventory, desired, expected):
+    plan = plan_ip_acgs(inventory, desired)
+
+    names = tuple(
+        [item.name for item in items]
+        for items in (plan.create, plan.update, plan.unchanged)
+    )
+    assert names == expected
+    for item in plan.update + plan.unchanged:
+        assert item.id == f"wsipg-{item.name}"
+    for item in plan.create:
+        assert item.id is None
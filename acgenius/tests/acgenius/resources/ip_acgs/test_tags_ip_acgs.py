@@ -0,0 +1,79 @@
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.ip_acgs.tags import (
+    diff_tags, fetch_tags, get_desired_tags, plan_tags, tag_cache
+)
+from acgenius.resources.ip_acgs.work_instruction import reconcile_tags
+from acgenius.resources.models import Execution, IP_ACG
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    config.set_workspaces(fake)
+    tag_cache.clear()
+    yield fake
+    tag_cache.clear()
+    config.set_workspaces(None)
+
+
+@pytest.mark.parametrize("desired,current,expected", [
+    # Same tags
+    ({"Env": "test"}, {"Env": "test"}, ({}, [])),
+    # Changed and added tags are created, in one call
+    ({"Env": "prod", "Team": "a"}, {"Env": "test"}, ({"Env": "prod", "Team": "a"}, [])),
+    # Tags absent in settings.yaml are deleted
+    ({"Env": "test"}, {"Env": "test", "Owner": "x", "Cost": "y"}, ({}, ["Cost", "Owner"])),
+    # Creation timestamp and AWS tags are left alone
+    ({"Env": "test"}, {"Env": "test", "Created": "2024", "aws:stack": "s"}, ({}, [])),
+])
+def test_diff_tags(desired, current, expected):
+    assert diff_tags(desired, current) == expected
+
+
+def test_get_desired_tags_ignores_created():
+    tags = {"Env": "test"}
+
+    desired = get_desired_tags(tags, IP_ACG(name="G-v2", desc="", rules=[]))
+
+    assert desired == {"Env": "test", "IPACGName": "G-v2"}
+    assert tags == {"Env": "test"}
+
+
+def seed(fake, count):
+    return [
+        IP_ACG(
+            id=fake.create_ip_group(
+                GroupName=f"G{i}",
+                Tags=[
+                    {"Key": "IPACGName", "Value": f"G{i}"},
+                    {"Key": "Created", "Value": "2024"},
+                    {"Key": "Env", "Value": "test" if i % 2 else "old"},
+                ],
+            )["GroupId"],
+            name=f"G{i}",
+            desc="",
+            rules=[],
+        )
+        for i in range(count)
+    ]
+
+
+def test_plan_tags_fetches_once_and_converges(fake):
+    ip_acgs = seed(fake, 10)
+    execution = Execution(concurrency=1)
+
+    changes = plan_tags(ip_acgs, {"Env": "test"}, execution)
+    for change in changes:
+        reconcile_tags(change)
+
+    assert [ip_acg.name for ip_acg, _, _ in changes] == ["G0", "G2", "G4", "G6", "G8"]
+    assert fake.call_counts["DescribeTags"] == 10
+    assert fake.call_counts["CreateTags"] == 5
+    assert "DeleteTags" not in fake.call_counts
+    # The cache follows the tags applied: a next plan has nothing to do
+    assert plan_tags(ip_acgs, {"Env": "test"}, execution) == []
+    assert fake.call_counts["DescribeTags"] == 10
+    assert fetch_tags(ip_acgs[:1], execution)[ip_acgs[0].id]["Created"] == "2024"
@@ -4,7 +4,7 @@ from unittest import TestCase
 
 from acgenius.resources.models import IP_ACG, Rule, Inventory, WorkInstruction
 from acgenius.resources.ip_acgs.utils import (
-    match_ip_acgs, format_rules, extend_tags, format_tags
+    match_ip_acgs, format_rules, extend_tags, format_tags, split_version, index_latest
 )
 
 
@@ -57,6 +57,12 @@ class TestIPACGUtils(TestCase):
      [{"ipRule": "192.168.1.0/24", "ruleDesc": "First rule"},
       {"ipRule": "192.168.2.0/24", "ruleDesc": "Second rule"}]),
     
+    # Numeric, not textual, sorting
+    ([Rule(ip="10.0.0.0/24", desc="Second rule"),
+      Rule(ip="9.0.0.0", desc="First rule")],
+     [{"ipRule": "9.0.0.0", "ruleDesc": "First rule"},
+      {"ipRule": "10.0.0.0/24", "ruleDesc": "Second rule"}]),
+
     # Empty rules
     ([], []),
 ])
@@ -98,3 +104,40 @@ def test_extend_tags(initial_tags, ip_acg_name, expected_keys):
 def test_format_tags(input_tags, expected):
     result = format_tags(input_tags)
     assert sorted(result, key=lambda x: x["Key"]) == sorted(expected, key=lambda x: x["Key"])
+
+
+@pytest.mark.parametrize("name,expected", [
+    # Unversioned name is version 1
+    ("ThatGroup1", ("ThatGroup1", 1)),
+    # Versioned name
+    ("ThatGroup1-v12", ("ThatGroup1", 12)),
+    # Suffix without digits is part of the name
+    ("ThatGroup1-vx", ("ThatGroup1-vx", 1)),
+])
+def test_split_version(name, expected):
+    assert split_version(name) == expected
+
+
+def test_index_latest_and_match_rotated_ip_acgs():
+    inventory = Inventory(
+        directories=[],
+        ip_acgs=[
+            IP_ACG(name="Group-v3", desc="", rules=[], id="wsipg-3"),
+            IP_ACG(name="Group-v2", desc="", rules=[], id="wsipg-2"),
+            IP_ACG(name="Other", desc="", rules=[], id="wsipg-9"),
+        ],
+    )
+    assert {name: ip_acg.id for name, ip_acg in index_latest(inventory.ip_acgs).items()} == {
+        "Group": "wsipg-3", "Other": "wsipg-9"
+    }
+
+    work_instruction = WorkInstruction(
+        directories=[],
+        ip_acgs=[
+            IP_ACG(name="Group", desc="", rules=[]),
+            IP_ACG(name="Other", desc="", rules=[]),
+        ],
+        tags={},
+    )
+    match_ip_acgs(inventory, work_instruction)
+    assert [ip_acg.id for ip_acg in work_instruction.ip_acgs] == ["wsipg-3", "wsipg-9"]
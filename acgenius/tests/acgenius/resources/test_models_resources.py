@@ -0,0 +1,60 @@
+import pytest
+
+from acgenius.resources.models import IP_ACG, Network, Rule
+
+
+@pytest.mark.parametrize("cidr, expected", [
+    # Single IP address, default prefix
+    ("198.51.100.22", Network(address=0xC6336416, prefix=32)),
+    # Range with prefix
+    ("198.51.100.0/27", Network(address=0xC6336400, prefix=27)),
+    # Host bits are cleared
+    ("198.51.100.22/27", Network(address=0xC6336400, prefix=27)),
+])
+def test_network_from_cidr(cidr, expected):
+    assert Network.from_cidr(cidr) == expected
+
+
+@pytest.mark.parametrize("cidr", [
+    "198.51.100",
+    "198.51.100.256",
+    "198.51.100.0/33",
+    "not an ip",
+])
+def test_network_from_cidr_invalid(cidr):
+    with pytest.raises(ValueError):
+        Network.from_cidr(cidr)
+
+
+def test_network_str_first_last():
+    network = Network.from_cidr("10.0.0.0/27")
+    assert str(network) == "10.0.0.0/27"
+    assert network.last - network.first == 31
+
+
+def test_network_numeric_order_and_hash():
+    networks = [Network.from_cidr(cidr) for cidr in ["10.0.0.0", "9.0.0.0", "10.0.0.0/32"]]
+    assert [str(network) for network in sorted(networks)] == [
+        "9.0.0.0/32", "10.0.0.0/32", "10.0.0.0/32"
+    ]
+    assert len(set(networks)) == 2
+
+
+def test_rule_network_parsed_once():
+    rule = Rule(ip="10.0.0.1", desc="desc")
+    assert rule.network == Network.from_cidr("10.0.0.1/32")
+    assert Rule(ip="not an ip", desc="desc").network is None
+
+
+def test_rule_equal_and_hashed_by_network():
+    rules = {Rule(ip="10.0.0.1", desc="desc"), Rule(ip="10.0.0.1/32", desc="desc")}
+    assert len(rules) == 1
+    assert Rule(ip="10.0.0.1", desc="desc") != Rule(ip="10.0.0.1", desc="other")
+
+
+def test_models_are_slotted():
+    rule = Rule(ip="10.0.0.0/27", desc="desc")
+    ip_acg = IP_ACG(name="acg", desc="desc", rules=[rule])
+    for item in (rule, ip_acg):
+        assert not hasattr(item, "__dict__")
+    assert rule.network == Network.from_cidr("10.0.0.0/27")
@@ -0,0 +1,96 @@
+import csv
+import io
+import json
+import pytest
+
+from acgenius.resources.models import IP_ACG, Directory, Rule
+from acgenius.resources.output import (
+    RecordWriter,
+    close_output,
+    emit_result,
+    output_is_table,
+    set_output,
+)
+from acgenius.resources.utils import create_report
+
+
+@pytest.fixture
+def ip_acgs():
+    return [
+        IP_ACG(
+            id="wsipg-1",
+            name="acg1",
+            desc="description1",
+            rules=[Rule(ip="10.0.0.0/27", desc="rule1"), Rule(ip="9.0.0.1", desc="rule2")],
+        ),
+        IP_ACG(id="wsipg-2", name="acg2", desc="description2", rules=[]),
+    ]
+
+
+@pytest.fixture(autouse=True)
+def reset_output():
+    yield
+    close_output()
+
+
+def test_output_table_by_default():
+    set_output("table")
+    assert output_is_table()
+
+
+def test_output_ndjson_streams_records(ip_acgs):
+    stream = io.StringIO()
+    set_output("ndjson", stream)
+
+    create_report(ip_acgs, "inventory")
+    emit_result("delete_ip_group", id="wsipg-1")
+    close_output()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record["record"] for record in records] == ["ip_acg", "ip_acg", "result"]
+    assert records[0]["rules"][1] == {"ip": "9.0.0.1", "description": "rule2"}
+    assert records[2] == {
+        "record": "result",
+        "operation": "delete_ip_group",
+        "status": "ok",
+        "id": "wsipg-1",
+    }
+
+
+@pytest.mark.parametrize("records, expected", [
+    # No record emitted
+    (0, []),
+    # Records emitted
+    (2, ["directory", "directory"]),
+])
+def test_output_json_array(records, expected):
+    stream = io.StringIO()
+    set_output("json", stream)
+
+    directories = [Directory(id=f"d-{i}", name=f"dir{i}") for i in range(records)]
+    if directories:
+        create_report(directories, "inventory")
+    close_output()
+
+    assert [record["record"] for record in json.loads(stream.getvalue())] == expected
+
+
+def test_output_csv_flattens_rules(ip_acgs):
+    stream = io.StringIO()
+    set_output("csv", stream)
+
+    create_report(ip_acgs, "work_instruction")
+    close_output()
+
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [(row["name"], row["rule"]) for row in rows] == [
+        ("acg1", "10.0.0.0/27"),
+        ("acg1", "9.0.0.1"),
+        ("acg2", ""),
+    ]
+    assert rows[0]["origin"] == "work_instruction"
+
+
+def test_record_writer_is_abstract():
+    with pytest.raises(TypeError):
+        RecordWriter(io.StringIO())
@@ -0,0 +1,125 @@
+from datetime import datetime
+
+import pytest
+
+from acgenius.resources.models import Directory, IP_ACG, Inventory, Network, Rule
+from acgenius.resources.store import InventoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InventoryStore()
+    store.start(str(tmp_path / "inventory.db"))
+    yield store
+    store.stop()
+
+
+def get_inventory(rules_b=(("10.0.0.0/16", "office"),), directories_c=("d-0",)):
+    ip_acgs = [
+        IP_ACG(id="wsipg-a", name="A", desc="", rules=[Rule("10.1.1.1/32", "host")]),
+        IP_ACG(
+            id="wsipg-b",
+            name="B",
+            desc="",
+            rules=[Rule(ip, desc) for ip, desc in rules_b],
+        ),
+        IP_ACG(id="wsipg-c", name="C", desc="", rules=[Rule("10.2.0.0/24", "vpn")]),
+    ]
+    directories = [
+        Directory(id="d-0", name="dir0", ip_acgs=["wsipg-a", "wsipg-b"]),
+        Directory(id="d-1", name="dir1", ip_acgs=["wsipg-a"]),
+    ]
+    for directory in directories:
+        if directory.id in directories_c:
+            directory.ip_acgs.append("wsipg-c")
+    return Inventory(directories=directories, ip_acgs=ip_acgs)
+
+
+def test_write_creates_generations(store):
+    assert store.get_generation() is None
+
+    assert store.write(get_inventory()) == 1
+    assert store.write(get_inventory(directories_c=("d-0", "d-1"))) == 2
+
+    assert store.get_generation() == 2
+    assert store.query(
+        "SELECT COUNT(*) AS n FROM associations WHERE generation = 2"
+    ) == [{"n": 5}]
+
+
+def test_write_skips_unchanged_inventory(store):
+    assert store.write(get_inventory()) == 1
+    inventory = get_inventory(rules_b=(("10.0.1.0/16", "office"),))
+    inventory.ip_acgs.reverse()
+
+    # Same inventory, in another order and notation
+    assert store.write(inventory) == 1
+    assert store.query("SELECT COUNT(*) AS n FROM generations") == [{"n": 1}]
+
+    assert store.write(get_inventory(directories_c=())) == 2
+    assert store.write(get_inventory()) == 3
+
+
+def test_get_wide_rules(store):
+    store.write(get_inventory(rules_b=(("10.0.0.0/16", "office"), ("10.9.9.9", "x"))))
+
+    assert store.get_wide_rules() == [
+        {"id": "wsipg-b", "name": "B", "network": "10.0.0.0/16", "desc": "office"}
+    ]
+    assert [row["name"] for row in store.get_wide_rules(prefix=25)] == ["B", "C"]
+
+
+def test_get_rules_covering(store):
+    store.write(get_inventory())
+
+    rows = store.get_rules_covering(Network.from_cidr("10.0.200.1").address)
+
+    assert [row["name"] for row in rows] == ["B"]
+
+
+@pytest.mark.parametrize("rules_b,directories_c,expected", [
+    # Nothing changed
+    ((("10.0.0.0/16", "office"),), ("d-0",), []),
+    # Rule description changed
+    ((("10.0.0.0/16", "branch"),), ("d-0",), [("B", "changed")]),
+    # Rule in other notation of the same network
+    ((("10.0.1.0/16", "office"),), ("d-0",), []),
+    # Association added
+    ((("10.0.0.0/16", "office"),), ("d-0", "d-1"), [("C", "changed")]),
+])
+def test_get_changes(store, rules_b, directories_c, expected):
+    store.write(get_inventory())
+    store.write(get_inventory(rules_b=rules_b, directories_c=directories_c))
+
+    changes = store.get_changes()
+
+    assert [(row["name"], row["change"]) for row in changes] == expected
+
+
+def test_get_changes_since(store):
+    store.write(get_inventory(), fetched_at=datetime(2024, 1, 1))
+    inventory = get_inventory()
+    inventory.ip_acgs = inventory.ip_acgs[1:] + [
+        IP_ACG(id="wsipg-d", name="D", desc="", rules=[])
+    ]
+    store.write(get_inventory(), fetched_at=datetime(2024, 1, 2))
+    store.write(inventory, fetched_at=datetime(2024, 1, 3))
+
+    # Since the previous fetch
+    assert [(row["name"], row["change"]) for row in store.get_changes()] == [
+        ("A", "removed"),
+        ("D", "added"),
+    ]
+    # Since before the first fetch: compared to the first generation
+    changes = store.get_changes(since=datetime(2023, 12, 31))
+    assert changes[0]["previous"] == 1 and changes[0]["generation"] == 2
+    # Since the latest fetch
+    assert store.get_changes(since=datetime(2024, 1, 4)) == []
+
+
+def test_start_not_a_store(tmp_path):
+    path = tmp_path / "inventory.db"
+    path.write_text("not a database")
+
+    with pytest.raises(SystemExit):
+        InventoryStore().start(str(path))
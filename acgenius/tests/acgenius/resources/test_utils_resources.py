@@ -1,6 +1,7 @@
+import io
 import pytest
 
-from acgenius.resources.utils import specify_report, create_report
+from acgenius.resources.utils import specify_report, create_report, format_table
 from acgenius.resources.models import Directory, IP_ACG, Rule
 
 
@@ -128,3 +129,35 @@ def test_create_report_multiple_rules(capsys, subject, origin):
     assert "test rule 2" in captured.out
     assert "10.0.0.0/24" in captured.out
     assert "192.168.0.0/24" in captured.out
+
+
+@pytest.mark.parametrize("fmt, expected", [
+    ("psql", "+------+--------+\n"
+             "| ip   | desc   |\n"
+             "|------+--------|\n"
+             "| a    |        |\n"
+             "+------+--------+"),
+    ("fancy_grid", "╒══════╤════════╕\n"
+                   "│ ip   │ desc   │\n"
+                   "╞══════╪════════╡\n"
+                   "│ a    │        │\n"
+                   "├──────┼────────┤\n"
+                   "│ bbbb │ c      │\n"
+                   "╘══════╧════════╛"),
+])
+def test_format_table(fmt, expected):
+    rows = [("a", None)] if fmt == "psql" else [("a", None), ("bbbb", "c")]
+    assert format_table(rows, ("ip", "desc"), fmt) == expected
+
+
+def test_create_report_multiple_directories_single_write():
+    stream = io.StringIO()
+    directories = [
+        Directory(id=f"dir{i}", name=f"test_dir{i}", type="group", state="active")
+        for i in range(3)
+    ]
+    create_report(directories, "inventory", stream=stream)
+
+    output = stream.getvalue()
+    assert output.count("test_dir") == 3
+    assert "□ 3" in output
@@ -1,10 +1,14 @@
 import pytest
 from unittest.mock import patch
 
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.routing.watch import refresh_inventory
 from acgenius.routing.actions import status, create, update, delete
 from acgenius.resources.models import (
-    AppInput, Settings, WorkInstruction, Inventory, IP_ACG, Directory
+    AppInput, Settings, WorkInstruction, Inventory, IP_ACG, Directory, Rule
 )
+from acgenius.resources.store import store
 
 
 @pytest.mark.parametrize("app_input", [
@@ -16,6 +20,27 @@ def test_status(app_input, caplog):
         status(app_input)
     assert "✅ Completed display of status." in caplog.text
 
+
+def test_status_with_store(tmp_path, caplog):
+    config.set_workspaces(InMemoryWorkSpaces())
+    store.start(str(tmp_path / "inventory.db"))
+    try:
+        inventory = refresh_inventory()
+        inventory.ip_acgs.append(
+            IP_ACG(id="wsipg-a", name="A", desc="", rules=[Rule("10.0.0.0/16", "office")])
+        )
+        store.write(inventory)
+        app_input = AppInput(cli={}, settings=Settings(validation=None), inventory=inventory)
+
+        with caplog.at_level("INFO"):
+            status(app_input)
+    finally:
+        store.stop()
+        config.set_workspaces(None)
+
+    assert "[1] rules wider than /24 in the inventory." in caplog.text
+    assert "IP ACG [wsipg-a - A] added." in caplog.text
+
 @pytest.mark.parametrize("app_input,expected_calls", [
     # Dryrun mode - no actual creation
     (AppInput(
@@ -59,6 +84,37 @@ def test_create(app_input, expected_calls):
         create(app_input)
         assert mock_create.call_count == expected_calls
 
+def test_create_skips_existing_and_associates_missing_only():
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("dir-1", "Directory 1")
+    fake.add_directory("dir-2", "Directory 2")
+    existing_id = fake.create_ip_group(GroupName="Existing ACG")["GroupId"]
+    fake.associate_ip_groups(DirectoryId="dir-1", GroupIds=[existing_id])
+    config.set_workspaces(fake)
+    try:
+        app_input = AppInput(
+            cli={"dryrun": False},
+            settings=Settings(work_instruction=WorkInstruction(
+                ip_acgs=[
+                    IP_ACG(name="Existing ACG", desc="Test description", rules=[]),
+                    IP_ACG(name="New ACG", desc="Test description", rules=[]),
+                ],
+                tags={},
+                directories=[]
+            ), validation=True),
+            inventory=refresh_inventory()
+        )
+        create(app_input)
+    finally:
+        config.set_workspaces(None)
+
+    new_id = app_input.settings.work_instruction.ip_acgs[1].id
+    assert fake.call_counts["CreateIpGroup"] == 2  # incl. the seeded group
+    assert fake.call_counts["AssociateIpGroups"] == 3  # incl. the seeded association
+    assert fake.directories["dir-1"]["ipGroupIds"] == [existing_id, new_id]
+    assert sorted(fake.directories["dir-2"]["ipGroupIds"]) == [existing_id, new_id]
+
+
 @pytest.mark.parametrize("app_input,should_raise", [
     # No IP ACGs in inventory - should raise error
     (AppInput(
@@ -70,11 +126,11 @@ def test_create(app_input, expected_calls):
         ), validation=True),
         inventory=Inventory(ip_acgs=[], directories=[])
     ), True),
-    # IP ACGs exist - should update
+    # IP ACGs exist, with changed rules - should update
     (AppInput(
         cli={"dryrun": False},
         settings=Settings(work_instruction=WorkInstruction(
-            ip_acgs=[IP_ACG(id="test-id", name="Test ACG", desc="Test description", rules=[])],
+            ip_acgs=[IP_ACG(id="test-id", name="Test ACG", desc="Test description", rules=[Rule("10.0.0.1/32", "host")])],
             tags={},
             directories=[]
         ), validation=True),
@@ -94,6 +150,7 @@ def test_create(app_input, expected_calls):
 def test_update(app_input, should_raise):
     with patch('acgenius.routing.actions.match_ip_acgs') as mock_match, \
          patch('acgenius.routing.actions.update_rules') as mock_update, \
+         patch('acgenius.routing.actions.plan_tags', return_value=[]), \
          patch('acgenius.routing.actions.create_report') as mock_report:
         
         if should_raise:
@@ -104,6 +161,31 @@ def test_update(app_input, should_raise):
             if not app_input.cli["dryrun"]:
                 mock_update.assert_called_once()
 
+
+def test_update_skips_unchanged_ip_acgs():
+    app_input = AppInput(
+        cli={"dryrun": False},
+        settings=Settings(work_instruction=WorkInstruction(
+            ip_acgs=[
+                IP_ACG(id=None, name="A", desc="", rules=[Rule("10.0.0.1/32", "host")]),
+                IP_ACG(id=None, name="B", desc="", rules=[Rule("10.0.0.2/32", "host")]),
+            ],
+            tags={},
+            directories=[]
+        ), validation=True),
+        inventory=Inventory(ip_acgs=[
+            IP_ACG(id="wsipg-a", name="A", desc="", rules=[Rule("10.0.0.1/32", "host")]),
+            IP_ACG(id="wsipg-b", name="B-v2", desc="", rules=[Rule("10.0.0.3/32", "host")]),
+        ], directories=[])
+    )
+
+    with patch('acgenius.routing.actions.update_rules') as mock_update, \
+         patch('acgenius.routing.actions.plan_tags', return_value=[]), \
+         patch('acgenius.routing.actions.create_report'):
+        update(app_input)
+
+    assert [call.args[0].id for call in mock_update.call_args_list] == ["wsipg-b"]
+
 @pytest.mark.parametrize("app_input,should_raise", [
     # No IP ACGs specified for deletion - should raise error
     (AppInput(
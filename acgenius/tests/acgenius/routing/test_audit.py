@@ -0,0 +1,143 @@
+import gzip
+import io
+from unittest.mock import patch
+
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import (
+    AppInput, Directory, IP_ACG, Rule, Settings, WorkInstruction
+)
+from acgenius.routing.audit import audit, audit_log, read_addresses
+from acgenius.routing.watch import refresh_inventory
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-0", "dir0")
+    group_ids = [
+        fake.create_ip_group(
+            GroupName=name,
+            UserRules=[{"ipRule": ip, "ruleDesc": desc} for ip, desc in rules],
+        )["GroupId"]
+        for name, rules in (
+            ("Office", [("203.0.113.0/24", "office"), ("198.51.100.7/32", "home")]),
+            ("Other", [("192.0.2.0/24", "partner")]),
+        )
+    ]
+    fake.associate_ip_groups(DirectoryId="d-0", GroupIds=group_ids)
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_app_input(log_file=None, log_column=None):
+    return AppInput(
+        cli={"action": "audit", "dryrun": False, "log_file": log_file,
+             "log_column": log_column},
+        settings=Settings(
+            validation=None,
+            work_instruction=WorkInstruction(
+                directories=[Directory(id=None, name=None)],
+                ip_acgs=[
+                    # The home address is dropped, a VPN range is added
+                    IP_ACG(name="Office", desc="", rules=[
+                        Rule("203.0.113.0/24", "office"), Rule("10.8.0.0/16", "vpn"),
+                    ]),
+                ],
+                tags={},
+            ),
+        ),
+        inventory=refresh_inventory(),
+    )
+
+
+LOG = """time,src_ip,dst_port
+2024-01-01T00:00:00,203.0.113.57,443
+2024-01-01T00:00:01,198.51.100.7,443
+2024-01-01T00:00:02,198.51.100.7,443
+2024-01-01T00:00:03,10.8.1.1,443
+2024-01-01T00:00:04,192.0.2.10,443
+2024-01-01T00:00:05,8.8.8.8,443
+2024-01-01T00:00:06,-,443
+"""
+
+
+@pytest.mark.parametrize("log,expected", [
+    # Plain list of addresses
+    ("10.0.0.1\n\n10.0.0.2\n", ["10.0.0.1", "10.0.0.2"]),
+    # CSV log, with a known source column
+    (LOG, ["203.0.113.57", "198.51.100.7", "198.51.100.7", "10.8.1.1",
+           "192.0.2.10", "8.8.8.8", "-"]),
+])
+def test_read_addresses(log, expected):
+    assert list(read_addresses(io.StringIO(log))) == expected
+
+
+def test_read_addresses_unknown_column():
+    with pytest.raises(SystemExit):
+        list(read_addresses(io.StringIO("time,peer\n0,10.0.0.1\n")))
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_audit_log(fake, tmp_path, numpy):
+    log_file = tmp_path / "access.csv.gz"
+    with gzip.open(log_file, "wt") as stream:
+        stream.write(LOG)
+
+    with patch("acgenius.routing.audit.get_numpy") as mock_get_numpy:
+        if not numpy:
+            mock_get_numpy.return_value = None
+        else:
+            mock_get_numpy.side_effect = lambda: pytest.importorskip("numpy")
+
+        records = audit_log(get_app_input(), str(log_file))
+
+    assert [
+        (r["record"], r.get("address"), r["hits"], r["name"], r["rule"],
+         r["planned_status"], r["change"])
+        for r in records
+    ] == [
+        ("audit", None, 1, "Office", "203.0.113.0/24", "allowed", "kept"),
+        ("audit", None, 1, "Other", "192.0.2.0/24", "allowed", "kept"),
+        ("audit", None, 1, None, None, "allowed", "opened"),
+        ("audit", None, 2, "Office", "198.51.100.7/32", "denied", "locked_out"),
+        ("audit", None, 1, None, None, "denied", "denied"),
+        ("audit_address", "198.51.100.7", 2, "Office", "198.51.100.7/32",
+         "denied", "locked_out"),
+    ]
+    assert records[2]["planned_rule"] == "10.8.0.0/16"
+
+
+def test_audit_log_aggregates_per_rule(fake, tmp_path):
+    log_file = tmp_path / "access.log"
+    log_file.write_text(
+        "".join(f"203.0.113.{i % 256}\n" for i in range(1000)) + "198.51.100.7\n"
+    )
+
+    with patch("acgenius.routing.audit.AUDIT_CHUNK_SIZE", 64):
+        records = audit_log(get_app_input(), str(log_file))
+
+    assert [(r["record"], r["hits"], r["change"]) for r in records] == [
+        ("audit", 1000, "kept"),
+        ("audit", 1, "locked_out"),
+        ("audit_address", 1, "locked_out"),
+    ]
+
+
+def test_audit_reports_lockouts(fake, tmp_path, caplog):
+    log_file = tmp_path / "access.log"
+    log_file.write_text(LOG)
+    app_input = get_app_input(str(log_file), log_column="src_ip")
+    counts = dict(fake.call_counts)
+
+    with caplog.at_level("INFO"):
+        audit(app_input)
+
+    assert fake.call_counts == counts
+    assert "[locked_out]: [2] hits." in caplog.text
+    assert "[locked_out]: [1] addresses." in caplog.text
+    assert "[198.51.100.7] ([2] hits), now allowed by IP ACG [Office]" in caplog.text
+    assert "Skipped [1] invalid addresses in the log." in caplog.text
@@ -0,0 +1,185 @@
+import io
+import json
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import AppInput, Rule
+from acgenius.resources.output import close_output, set_output
+from acgenius.routing.drift import detect_drift, drift, get_digest
+from acgenius.routing.watch import refresh_inventory
+from acgenius.validation.utils import parse_settings
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-1", "corp.example.com")
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_app_input(drift_file=None):
+    return AppInput(
+        cli={
+            "action": "drift",
+            "dryrun": False,
+            "ip_acg_ids_to_delete": (),
+            "refresh_interval": 60.0,
+            "drift_file": drift_file,
+        },
+        settings=parse_settings(),
+        inventory=refresh_inventory(),
+    )
+
+
+def create_group(fake, name, rules, directory_id="d-1"):
+    group_id = fake.create_ip_group(
+        GroupName=name,
+        UserRules=[{"ipRule": ip, "ruleDesc": desc} for ip, desc in rules],
+    )["GroupId"]
+    fake.associate_ip_groups(DirectoryId=directory_id, GroupIds=[group_id])
+    return group_id
+
+
+THAT_GROUP_1 = [
+    ("45.33.32.22", "That trusted host"),
+    ("198.51.100.22/32", "This trusted series of hosts"),
+    ("198.51.101.22", "This trusted series of hosts"),
+]
+
+
+@pytest.mark.parametrize(
+    "rules_a,dirs_a,rules_b,dirs_b,expected_equal",
+    [
+        # Order and notation of rules do not matter
+        (
+            [Rule("10.0.0.1", "a"), Rule("10.0.0.2/32", "b")],
+            ["d-1", "d-2"],
+            [Rule("10.0.0.2", "b"), Rule("10.0.0.1/32", "a")],
+            ["d-2", "d-1"],
+            True,
+        ),
+        # Different description
+        ([Rule("10.0.0.1", "a")], ["d-1"], [Rule("10.0.0.1", "b")], ["d-1"], False),
+        # Different association
+        ([Rule("10.0.0.1", "a")], ["d-1"], [Rule("10.0.0.1", "a")], [], False),
+    ],
+)
+def test_get_digest(rules_a, dirs_a, rules_b, dirs_b, expected_equal):
+    assert (get_digest(rules_a, dirs_a) == get_digest(rules_b, dirs_b)) is expected_equal
+
+
+def test_detect_drift_reports_changed_groups_only(fake):
+    create_group(fake, "ThatGroup1", THAT_GROUP_1)
+    group_id = create_group(fake, "ThatGroup2", [("45.33.32.23", "Other host")])
+    create_group(fake, "OtherGroup", [("45.33.32.99", "Unmanaged host")])
+    app_input = get_app_input()
+
+    digests, records = detect_drift(app_input, app_input.inventory)
+
+    assert {r["name"]: (r["status"], r["change"]) for r in records} == {
+        "OtherGroup": ("unmanaged", "baseline"),
+        "ThatGroup1": ("in_sync", "baseline"),
+        "ThatGroup2": ("drifted", "baseline"),
+    }
+
+    # Nothing changed in AWS
+    digests, records = detect_drift(app_input, refresh_inventory(), digests)
+    assert records == []
+
+    # Fixed in AWS, and a group deleted
+    fake.update_rules_of_ip_group(
+        GroupId=group_id,
+        UserRules=[
+            {"ipRule": "45.33.32.23", "ruleDesc": "That trusted host"},
+            {"ipRule": "198.51.100.23/32", "ruleDesc": "This trusted series of hosts"},
+        ],
+    )
+    other_id = digests["OtherGroup"][0]
+    fake.disassociate_ip_groups(DirectoryId="d-1", GroupIds=[other_id])
+    fake.delete_ip_group(GroupId=other_id)
+
+    digests, records = detect_drift(app_input, refresh_inventory(), digests)
+    assert [(r["name"], r["status"], r["change"]) for r in records] == [
+        ("OtherGroup", "unmanaged", "removed"),
+        ("ThatGroup2", "in_sync", "changed"),
+    ]
+    assert records[0]["id"] == other_id
+    assert records[1]["digest"] == records[1]["desired_digest"]
+    assert records[1]["previous_digest"] != records[1]["digest"]
+
+
+def test_detect_drift_reports_missing_groups(fake):
+    app_input = get_app_input()
+
+    digests, records = detect_drift(app_input, app_input.inventory)
+    assert [(r["name"], r["status"], r["id"]) for r in records] == [
+        ("ThatGroup1", "missing", None),
+        ("ThatGroup2", "missing", None),
+    ]
+
+    create_group(fake, "ThatGroup1", THAT_GROUP_1)
+    digests, records = detect_drift(app_input, refresh_inventory(), digests)
+    assert [(r["name"], r["status"], r["change"]) for r in records] == [
+        ("ThatGroup1", "in_sync", "new"),
+    ]
+
+
+def test_detect_drift_with_directories_per_ip_acg(fake):
+    fake.add_directory("d-2", "branch.example.com")
+    create_group(fake, "ThatGroup1", THAT_GROUP_1, directory_id="d-2")
+    app_input = get_app_input()
+    app_input.settings.work_instruction.ip_acgs[0].directories = ["d-2"]
+
+    digests, records = detect_drift(app_input, app_input.inventory)
+    assert records[0]["name"] == "ThatGroup1"
+    assert records[0]["status"] == "in_sync"
+
+    # Also associated with a directory the IP ACG does not list
+    fake.associate_ip_groups(DirectoryId="d-1", GroupIds=[digests["ThatGroup1"][0]])
+    digests, records = detect_drift(app_input, refresh_inventory(), digests)
+    assert [(r["name"], r["status"], r["change"]) for r in records] == [
+        ("ThatGroup1", "drifted", "changed"),
+    ]
+
+
+def test_drift_writes_ndjson_per_poll(fake, tmp_path):
+    drift_file = tmp_path / "drift.ndjson"
+    create_group(fake, "ThatGroup1", THAT_GROUP_1)
+    app_input = get_app_input(drift_file=str(drift_file))
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        fake.create_ip_group(GroupName=f"Group{len(sleeps)}")
+
+    drift(app_input, cycles=3, sleep=sleep)
+
+    records = [json.loads(line) for line in drift_file.read_text().splitlines()]
+    assert [(r["name"], r["status"]) for r in records] == [
+        ("ThatGroup1", "in_sync"),
+        ("ThatGroup2", "missing"),
+        ("Group1", "unmanaged"),
+        ("Group2", "unmanaged"),
+    ]
+    assert sleeps == [60.0, 60.0]
+    assert fake.call_counts["DescribeIpGroups"] == 3
+
+
+def test_drift_writes_selected_output(fake):
+    create_group(fake, "ThatGroup1", THAT_GROUP_1)
+    app_input = get_app_input()
+    stream = io.StringIO()
+    set_output("json", stream)
+
+    try:
+        drift(app_input, cycles=1, sleep=lambda _: None)
+    finally:
+        close_output()
+
+    assert [(r["name"], r["status"]) for r in json.loads(stream.getvalue())] == [
+        ("ThatGroup1", "in_sync"),
+        ("ThatGroup2", "missing"),
+    ]
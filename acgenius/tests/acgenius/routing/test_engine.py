@@ -0,0 +1,103 @@
+import contextvars
+import threading
+import time
+import pytest
+
+from acgenius import config
+from acgenius.routing.engine import (
+    KeyedLocks,
+    RateLimitedWorkSpaces,
+    RateLimiter,
+    run_concurrently,
+)
+from acgenius.telemetry.metrics import metrics
+
+
+def test_rate_limiter_waits_for_tokens():
+    now = [0.0]
+    waits = []
+
+    def sleep(seconds):
+        waits.append(seconds)
+        now[0] += seconds
+
+    limiter = RateLimiter(rate=2, burst=2, clock=lambda: now[0], sleep=sleep)
+
+    assert [limiter.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 0.5]
+    now[0] += 10
+    assert limiter.acquire() == 0.0
+    assert waits == [0.5, 0.5]
+
+
+def test_rate_limited_workspaces():
+    class Client:
+        region = "eu-west-1"
+
+        def describe_ip_groups(self):
+            return {"Result": []}
+
+    limiter = RateLimiter(rate=1000, burst=1)
+    client = RateLimitedWorkSpaces(Client(), limiter)
+
+    assert client.describe_ip_groups() == {"Result": []}
+    assert client.region == "eu-west-1"
+    assert limiter.tokens < 1
+
+
+def test_rate_limited_calls_recorded_without_wait():
+    class Client:
+        def describe_ip_groups(self):
+            return {"Result": []}
+
+    metrics.reset()
+    config.set_workspaces(RateLimitedWorkSpaces(Client(), RateLimiter(rate=10)))
+    try:
+        for _ in range(3):
+            config.workspaces.describe_ip_groups()
+    finally:
+        config.set_workspaces(None)
+
+    latencies = [latency for latency, _, _ in metrics.calls["describe_ip_groups"]]
+    assert len(latencies) == 3
+    assert max(latencies) < 0.05  # waits of 0.1 s for a token are not included
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_run_concurrently_keeps_order_and_context(concurrency):
+    var = contextvars.ContextVar("var", default=None)
+    var.set("request")
+
+    results = run_concurrently(lambda i: (i * 2, var.get()), range(8), concurrency)
+
+    assert results == [(i * 2, "request") for i in range(8)]
+
+
+def test_run_concurrently_raises_system_exit():
+    def fn(i):
+        if i == 2:
+            raise SystemExit(1)
+        return i
+
+    with pytest.raises(SystemExit):
+        run_concurrently(fn, range(4), 4)
+
+
+def test_keyed_locks_serialize_per_key():
+    locks = KeyedLocks()
+    active = {"a": 0, "b": 0}
+    overlaps = []
+
+    def work(key):
+        with locks.lock(key):
+            active[key] += 1
+            overlaps.append(active[key])
+            time.sleep(0.01)
+            active[key] -= 1
+
+    threads = [threading.Thread(target=work, args=(key,)) for key in "aabb" * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(overlaps) == 1
@@ -6,7 +6,7 @@ from acgenius.routing.errors import get_error_code, process_error, set_app_respo
 @pytest.mark.parametrize("exception,expected", [
     (ValueError(), "ValueError"),
     (TypeError(), "TypeError"),
-    (ClientError({"Error": {"Code": "ResourceNotFoundException"}}, "operation"), "ClientError"),
+    (ClientError({"Error": {"Code": "ResourceNotFoundException"}}, "operation"), "ResourceNotFoundException"),
 ])
 def test_get_error_code(exception, expected):
     assert get_error_code(exception) == expected
@@ -0,0 +1,155 @@
+import json
+import pytest
+from unittest.mock import patch
+
+from acgenius.resources.models import (
+    AppInput, Directory, Execution, Inventory, IP_ACG, Rule, Settings, WorkInstruction
+)
+from acgenius.routing.estimate import (
+    DEFAULT_LATENCY_MS, count_calls, estimate, get_duration, get_latency_profile
+)
+
+
+def get_ip_acg(name, ip_acg_id=None):
+    return IP_ACG(
+        name=name, desc="", rules=[Rule("10.0.0.1/32", "host")], id=ip_acg_id
+    )
+
+
+def get_app_input(
+    action, ip_acgs=(), inventory_ip_acgs=(), directories=(), ids=(), execution=None
+):
+    return AppInput(
+        cli={"action": action, "dryrun": True, "ip_acg_ids_to_delete": ids},
+        settings=Settings(
+            validation=None,
+            work_instruction=WorkInstruction(
+                directories=[Directory(id=None, name=None)],
+                ip_acgs=list(ip_acgs),
+                tags={},
+            ),
+            execution=execution,
+        ),
+        inventory=Inventory(
+            directories=list(directories), ip_acgs=list(inventory_ip_acgs)
+        ),
+    )
+
+
+@pytest.mark.parametrize("app_input,expected", [
+    # 300 new IP ACGs across 20 directories: one association call per directory
+    (get_app_input(
+        "create",
+        ip_acgs=[get_ip_acg(f"Group{i}") for i in range(300)],
+        directories=[Directory(id=f"d-{i}", name=f"dir{i}") for i in range(20)],
+    ), {"create_ip_group": 300, "associate_ip_groups": 20}),
+    # Same, in waves of 25%: one check per wave
+    (get_app_input(
+        "create",
+        ip_acgs=[get_ip_acg(f"Group{i}") for i in range(300)],
+        directories=[Directory(id=f"d-{i}", name=f"dir{i}") for i in range(20)],
+        execution=Execution(wave_percentage=25),
+    ), {"create_ip_group": 300, "associate_ip_groups": 20,
+        "describe_workspace_directories": 4}),
+    # Existing and associated IP ACG: nothing to do
+    (get_app_input(
+        "create",
+        ip_acgs=[get_ip_acg("Group1")],
+        inventory_ip_acgs=[get_ip_acg("Group1", "wsipg-1")],
+        directories=[Directory(id="d-1", name="dir1", ip_acgs=["wsipg-1"])],
+    ), {}),
+    # Existing IP ACG, associated with one of two directories
+    (get_app_input(
+        "create",
+        ip_acgs=[get_ip_acg("Group1")],
+        inventory_ip_acgs=[get_ip_acg("Group1", "wsipg-1")],
+        directories=[
+            Directory(id="d-1", name="dir1", ip_acgs=["wsipg-1"]),
+            Directory(id="d-2", name="dir2", ip_acgs=[]),
+        ],
+    ), {"associate_ip_groups": 1}),
+    # Delete: disassociate from each directory, then delete
+    (get_app_input(
+        "delete",
+        directories=[Directory(id=f"d-{i}", name=f"dir{i}") for i in range(3)],
+        ids=("wsipg-1", "wsipg-2"),
+    ), {"disassociate_ip_groups": 6, "delete_ip_group": 2}),
+])
+def test_count_calls(app_input, expected):
+    assert count_calls(app_input) == expected
+
+
+def test_count_calls_update_changed_only():
+    app_input = get_app_input(
+        "update",
+        ip_acgs=[get_ip_acg("Group1"), get_ip_acg("Group2"), get_ip_acg("Group3")],
+        inventory_ip_acgs=[
+            IP_ACG(
+                name="Group1-v2", desc="", rules=[Rule("10.0.0.2/32", "host")],
+                id="wsipg-1",
+            ),
+            get_ip_acg("Group2", "wsipg-2"),
+        ],
+    )
+
+    with patch("acgenius.routing.estimate.plan_tags", return_value=[]):
+        assert count_calls(app_input) == {"update_rules_of_ip_group": 1}
+
+
+@pytest.mark.parametrize("calls,latency_ms,execution,expected", [
+    # Sequential: latency bound
+    (10, 500.0, Execution(concurrency=1, rate_limit=5.0), 5.0),
+    # Concurrent: rate bound
+    (10, 500.0, Execution(concurrency=10, rate_limit=5.0), 2.0),
+    # Concurrent, partial last batch
+    (10, 500.0, Execution(concurrency=4, rate_limit=100.0), 1.5),
+])
+def test_get_duration(calls, latency_ms, execution, expected):
+    assert get_duration(calls, latency_ms, execution) == pytest.approx(expected)
+
+
+def test_estimate_latency_sources():
+    measured = {
+        "operations": {
+            "describe_ip_groups": {
+                "calls": 2, "p50_ms": 100.0, "p95_ms": 150.0, "total_ms": 250.0
+            }
+        }
+    }
+    profile = {"create_ip_group": {"p50_ms": 400.0, "p95_ms": 800.0}}
+
+    result = estimate(
+        {"create_ip_group": 10, "associate_ip_groups": 2},
+        profile,
+        Execution(concurrency=1, rate_limit=5.0),
+        measured,
+    )
+
+    assert result["calls"] == 14
+    assert {op: s["source"] for op, s in result["operations"].items()} == {
+        "describe_ip_groups": "measured",
+        "create_ip_group": "profile",
+        "associate_ip_groups": "default",
+    }
+    assert result["operations"]["create_ip_group"]["upper_s"] == pytest.approx(8.0)
+    assert result["expected_s"] == pytest.approx(
+        0.25 + 4.0 + 2 * DEFAULT_LATENCY_MS / 1000
+    )
+
+
+def test_get_latency_profile(tmp_path):
+    path = tmp_path / "stats.json"
+    path.write_text(json.dumps({
+        "operations": {
+            "create_ip_group": {"calls": 3, "p50_ms": 120.0, "p95_ms": 300.0}
+        }
+    }))
+
+    assert get_latency_profile(str(path)) == {
+        "create_ip_group": {"p50_ms": 120.0, "p95_ms": 300.0}
+    }
+    assert get_latency_profile(None) == {}
+
+    path.write_text("{}")
+    with pytest.raises(SystemExit):
+        get_latency_profile(str(path))
@@ -0,0 +1,96 @@
+import io
+import json
+
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import (
+    AppInput, Directory, IP_ACG, Rule, Settings, WorkInstruction
+)
+from acgenius.resources.output import close_output, set_output
+from acgenius.routing.impact import impact
+from acgenius.routing.watch import refresh_inventory
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    for i in range(2):
+        fake.add_directory(f"d-{i}", f"dir{i}")
+    office, other = [
+        fake.create_ip_group(
+            GroupName=name,
+            UserRules=[{"ipRule": ip, "ruleDesc": ""} for ip in rules],
+        )["GroupId"]
+        for name, rules in (
+            ("Office", ["203.0.113.0/24", "198.51.100.0/30"]),
+            ("Other", ["198.51.100.2/32"]),
+        )
+    ]
+    fake.associate_ip_groups(DirectoryId="d-0", GroupIds=[office, other])
+    fake.associate_ip_groups(DirectoryId="d-1", GroupIds=[office])
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_app_input(addresses=()):
+    return AppInput(
+        cli={"action": "impact", "dryrun": False, "addresses": addresses},
+        settings=Settings(
+            validation=None,
+            work_instruction=WorkInstruction(
+                directories=[Directory(id=None, name=None)],
+                ip_acgs=[
+                    # The /30 is dropped, the /24 is narrowed to its first half
+                    IP_ACG(name="Office", desc="", rules=[
+                        Rule("203.0.113.0/25", ""), Rule("192.0.2.1/32", ""),
+                    ]),
+                ],
+                tags={},
+            ),
+        ),
+        inventory=refresh_inventory(),
+    )
+
+
+def test_impact(fake):
+    app_input = get_app_input(addresses=("198.51.100.2", "198.51.100.3", "203.0.113.200"))
+    counts = dict(fake.call_counts)
+    stream = io.StringIO()
+    set_output("ndjson", stream)
+
+    impact(app_input)
+    close_output()
+
+    assert fake.call_counts == counts
+    impacts = {
+        (record["scope"], record["name"]): record
+        for record in map(json.loads, stream.getvalue().splitlines())
+    }
+    assert set(impacts) == {("ip_acg", "Office"), ("directory", "dir0"), ("directory", "dir1")}
+    assert impacts[("ip_acg", "Office")]["gained"] == ["192.0.2.1/32"]
+    assert impacts[("ip_acg", "Office")]["lost"] == ["198.51.100.0/30", "203.0.113.128/25"]
+    assert impacts[("ip_acg", "Office")]["lost_addresses"] == 132
+    # In dir0, 198.51.100.2 is still admitted through the other IP ACG
+    assert impacts[("directory", "dir0")]["lost"] == [
+        "198.51.100.0/31", "198.51.100.3/32", "203.0.113.128/25"
+    ]
+    assert impacts[("directory", "dir0")]["clients_lost"] == ["198.51.100.3", "203.0.113.200"]
+    assert impacts[("directory", "dir1")]["clients_lost"] == [
+        "198.51.100.2", "198.51.100.3", "203.0.113.200"
+    ]
+
+
+def test_impact_new_ip_acg(fake, caplog):
+    app_input = get_app_input()
+    app_input.settings.work_instruction.ip_acgs.append(
+        IP_ACG(name="New", desc="", rules=[Rule("10.0.0.0/8", "")], directories=["d-1"])
+    )
+
+    with caplog.at_level("INFO"):
+        impact(app_input)
+
+    assert "IP ACG [planned:New - New]: gains [16777216] addresses ['10.0.0.0/8']" in caplog.text
+    assert "Known clients that would lose access" not in caplog.text
@@ -0,0 +1,114 @@
+import json
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import AppInput, Inventory, Settings
+from acgenius.routing.actions import delete
+from acgenius.routing.journal import Journal, get_key, journal, load_completed
+
+
+@pytest.fixture
+def journal_file(tmp_path):
+    yield tmp_path / "journal.jsonl"
+    journal.stop()
+    journal.completed = {}
+
+
+def read_entries(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.parametrize(
+    "parts,expected",
+    [
+        # Single part
+        (("wsipg-1",), "wsipg-1"),
+        # Lists are sorted
+        (("d-1", ["wsipg-2", "wsipg-1"]), "d-1:wsipg-1,wsipg-2"),
+    ],
+)
+def test_get_key(parts, expected):
+    assert get_key(*parts) == expected
+
+
+def test_step_records_planned_completed_and_failed(journal_file):
+    test_journal = Journal()
+    test_journal.start(str(journal_file))
+
+    with test_journal.step("create_ip_group", "Group1") as result:
+        result["id"] = "wsipg-1"
+    with pytest.raises(ValueError):
+        with test_journal.step("create_ip_group", "Group2"):
+            raise ValueError("boom")
+    test_journal.stop()
+
+    assert [
+        (entry["event"], entry["key"], entry.get("id"), entry.get("error"))
+        for entry in read_entries(journal_file)
+    ] == [
+        ("planned", "Group1", None, None),
+        ("completed", "Group1", "wsipg-1", None),
+        ("planned", "Group2", None, None),
+        ("failed", "Group2", None, "ValueError"),
+    ]
+
+
+def test_step_without_start_records_nothing(journal_file):
+    with Journal().step("delete_ip_group", "wsipg-1"):
+        pass
+    assert not journal_file.exists()
+
+
+def test_load_completed_skips_truncated_entry(journal_file):
+    journal_file.write_text(
+        '{"event": "completed", "operation": "delete_ip_group", "key": "wsipg-1"}\n'
+        '{"event": "planned", "operation": "delete_ip_group", "key": "wsipg-2"}\n'
+        '{"event": "compl'
+    )
+    assert list(load_completed(str(journal_file))) == [("delete_ip_group", "wsipg-1")]
+
+
+def test_load_completed_missing_journal(journal_file):
+    with pytest.raises(SystemExit):
+        load_completed(str(journal_file))
+
+
+def test_resume_skips_completed_operations(journal_file):
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-1", "corp.example.com")
+    ids = [fake.create_ip_group(GroupName=f"Group{i}")["GroupId"] for i in range(3)]
+    fake.associate_ip_groups(DirectoryId="d-1", GroupIds=[ids[1]])
+    config.set_workspaces(fake)
+    app_input = AppInput(
+        cli={"dryrun": False, "ip_acg_ids_to_delete": ids},
+        settings=Settings(validation=None),
+        inventory=Inventory(ip_acgs=[], directories=[]),
+    )
+
+    try:
+        # Second delete fails: still associated, as the directory is unknown
+        journal.start(str(journal_file))
+        with pytest.raises(SystemExit):
+            delete(app_input)
+        journal.stop()
+
+        fake.disassociate_ip_groups(DirectoryId="d-1", GroupIds=[ids[1]])
+        journal.start(str(journal_file), resume=True)
+        delete(app_input)
+        journal.stop()
+    finally:
+        config.set_workspaces(None)
+
+    assert fake.ip_groups == {}
+    assert fake.call_counts["DeleteIpGroup"] == 4
+    assert [(entry["event"], entry["key"]) for entry in read_entries(journal_file)] == [
+        ("planned", ids[0]),
+        ("completed", ids[0]),
+        ("planned", ids[1]),
+        ("failed", ids[1]),
+        ("planned", ids[1]),
+        ("completed", ids[1]),
+        ("planned", ids[2]),
+        ("completed", ids[2]),
+    ]
@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import AppInput, Settings
+from acgenius.resources.output import close_output, set_output
+from acgenius.routing.lookup import get_addresses, lookup
+from acgenius.routing.watch import refresh_inventory
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-0", "dir0")
+    group_id = fake.create_ip_group(
+        GroupName="Office",
+        UserRules=[{"ipRule": "203.0.113.0/24", "ruleDesc": "office"}],
+    )["GroupId"]
+    fake.associate_ip_groups(DirectoryId="d-0", GroupIds=[group_id])
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_app_input(**cli):
+    return AppInput(
+        cli={"action": "lookup", "dryrun": False, **cli},
+        settings=Settings(validation=None),
+        inventory=refresh_inventory(),
+    )
+
+
+def test_lookup(fake, caplog):
+    app_input = get_app_input(addresses=("203.0.113.57", "192.0.2.1", "nope"))
+    counts = dict(fake.call_counts)
+
+    with caplog.at_level("INFO"):
+        lookup(app_input)
+
+    assert fake.call_counts == counts
+    assert "[203.0.113.57] is admitted by [1] rules." in caplog.text
+    assert "of IP ACG" in caplog.text and "in directories ['d-0']." in caplog.text
+    assert "[192.0.2.1] is not admitted." in caplog.text
+    assert "[nope] is not a valid IPv4 address." in caplog.text
+
+
+def test_lookup_records(fake, tmp_path):
+    address_file = tmp_path / "addresses.txt"
+    address_file.write_text("192.0.2.1\n\n203.0.113.1\n")
+    app_input = get_app_input(addresses=("nope",), address_file=str(address_file))
+    stream = io.StringIO()
+    set_output("ndjson", stream)
+
+    lookup(app_input)
+    close_output()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(r["address"], r["status"], r.get("rule")) for r in records] == [
+        ("nope", "invalid", None),
+        ("192.0.2.1", "not_admitted", None),
+        ("203.0.113.1", "admitted", "203.0.113.0/24"),
+    ]
+    assert records[2]["directory_ids"] == ["d-0"]
+
+
+def test_get_addresses_missing_file():
+    with pytest.raises(SystemExit):
+        get_addresses({"address_file": "missing.txt"})
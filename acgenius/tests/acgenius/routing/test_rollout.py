@@ -0,0 +1,117 @@
+import pytest
+from unittest.mock import patch
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import Directory, Execution
+from acgenius.routing.rollout import get_unsettled, get_waves, roll_out
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    for i in range(10):
+        fake.add_directory(f"d-{i}", f"dir{i}")
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_directories(amount):
+    return [Directory(id=f"d-{i}", name=f"dir{i}") for i in range(amount)]
+
+
+@pytest.mark.parametrize("amount,execution,expected", [
+    # No waves set: all directories at once
+    (10, Execution(), [10]),
+    # Wave size
+    (10, Execution(wave_size=4), [4, 4, 2]),
+    # Wave percentage, rounded up
+    (10, Execution(wave_percentage=25), [3, 3, 3, 1]),
+    # Smallest of size and percentage
+    (10, Execution(wave_size=2, wave_percentage=50), [2, 2, 2, 2, 2]),
+    # No directories
+    (0, Execution(wave_size=4), []),
+])
+def test_get_waves(amount, execution, expected):
+    assert [len(wave) for wave in get_waves(get_directories(amount), execution)] == expected
+
+
+def test_roll_out_checks_each_wave(fake):
+    group_id = fake.create_ip_group(GroupName="Group1")["GroupId"]
+    associated = []
+
+    def apply(directory):
+        associated.append(directory.id)
+        fake.associate_ip_groups(DirectoryId=directory.id, GroupIds=[group_id])
+
+    roll_out(get_directories(10), Execution(wave_size=4), apply, [group_id])
+
+    assert sorted(associated) == [f"d-{i}" for i in range(10)]
+    assert fake.call_counts["DescribeWorkspaceDirectories"] == 3
+
+
+def test_roll_out_stops_at_failing_wave(fake):
+    group_id = fake.create_ip_group(GroupName="Group1")["GroupId"]
+    now = [0.0]
+    associated = []
+
+    def apply(directory):
+        associated.append(directory.id)
+        if directory.id != "d-5":
+            fake.associate_ip_groups(DirectoryId=directory.id, GroupIds=[group_id])
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    with pytest.raises(SystemExit):
+        roll_out(
+            get_directories(10),
+            Execution(wave_size=4),
+            apply,
+            [group_id],
+            sleep=sleep,
+            clock=lambda: now[0],
+        )
+    assert sorted(associated) == [f"d-{i}" for i in range(8)]
+
+
+def test_get_unsettled_waits_for_registered_directories(fake):
+    fake.add_directory("d-x", "dirx", state="DEREGISTERING")
+    group_id = fake.create_ip_group(GroupName="Group1")["GroupId"]
+    fake.associate_ip_groups(DirectoryId="d-x", GroupIds=[group_id])
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    pending = get_unsettled(
+        [group_id],
+        [Directory(id="d-x", name="dirx")],
+        timeout=3.0,
+        sleep=sleep,
+        clock=lambda: now[0],
+    )
+    assert pending == ["d-x"]
+    assert now[0] == 3.0
+
+
+def test_get_unsettled_describes_25_directories_per_call():
+    with patch("acgenius.routing.rollout.get_directories", return_value=[]) as mock:
+        get_unsettled(["wsipg-1"], get_directories(30), timeout=0)
+    assert [len(call.args[0]) for call in mock.call_args_list] == [25, 5]
+
+
+def test_get_unsettled_with_ip_acgs_per_directory(fake):
+    group_ids = [
+        fake.create_ip_group(GroupName=f"Group{i}")["GroupId"] for i in range(2)
+    ]
+    fake.associate_ip_groups(DirectoryId="d-0", GroupIds=[group_ids[0]])
+    fake.associate_ip_groups(DirectoryId="d-1", GroupIds=[group_ids[0]])
+
+    pending = get_unsettled(
+        {"d-0": [group_ids[0]], "d-1": group_ids},
+        get_directories(2),
+        timeout=0,
+    )
+    assert pending == ["d-1"]
@@ -0,0 +1,135 @@
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.ip_acgs.plan import plan_ip_acgs
+from acgenius.resources.models import (
+    AppInput, Directory, Execution, IP_ACG, Rule, Settings, WorkInstruction
+)
+from acgenius.routing.rotate import get_rotations, rotate
+from acgenius.routing.watch import refresh_inventory
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    for i in range(30):
+        fake.add_directory(f"d-{i:02d}", f"dir{i}")
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_ip_acg(ip):
+    return IP_ACG(name="ThatGroup1", desc="Some description", rules=[Rule(ip, "host")])
+
+
+def get_app_input(dryrun=False, ip="45.33.32.24"):
+    return AppInput(
+        cli={"action": "rotate", "dryrun": dryrun, "ip_acg_ids_to_delete": ()},
+        settings=Settings(
+            validation=None,
+            work_instruction=WorkInstruction(
+                directories=[Directory(id=None, name=None)],
+                ip_acgs=[get_ip_acg(ip), IP_ACG(name="New", desc="", rules=[])],
+                tags={"Environment": "test"},
+            ),
+            execution=Execution(concurrency=1),
+        ),
+        inventory=refresh_inventory(),
+    )
+
+
+def seed(fake, directory_ids):
+    group_id = fake.create_ip_group(
+        GroupName="ThatGroup1",
+        UserRules=[{"ipRule": "45.33.32.23", "ruleDesc": "host"}],
+    )["GroupId"]
+    for directory_id in directory_ids:
+        fake.associate_ip_groups(DirectoryId=directory_id, GroupIds=[group_id])
+    return group_id
+
+
+def test_rotate_cuts_over_all_associated_directories(fake):
+    directory_ids = [f"d-{i:02d}" for i in range(28)]
+    old_id = seed(fake, directory_ids)
+    app_input = get_app_input()
+    counts = dict(fake.call_counts)
+
+    rotate(app_input, sleep=lambda _: None)
+
+    calls = {op: n - counts.get(op, 0) for op, n in fake.call_counts.items()}
+    assert calls == {
+        "DescribeIpGroups": 0,
+        "DescribeWorkspaceDirectories": 2,  # 28 directories, 25 per call
+        "CreateIpGroup": 1,
+        "AssociateIpGroups": 28,
+        "DisassociateIpGroups": 28,
+        "DeleteIpGroup": 1,
+    }
+    new_id = app_input.settings.work_instruction.ip_acgs[0].id
+    assert old_id not in fake.ip_groups
+    assert fake.ip_groups[new_id]["groupName"] == "ThatGroup1-v2"
+    assert fake.ip_groups[new_id]["userRules"] == [
+        {"ipRule": "45.33.32.24/32", "ruleDesc": "host"}
+    ]
+    assert fake.tags[new_id]["IPACGName"] == "ThatGroup1-v2"
+    assert [
+        directory_id
+        for directory_id, directory in fake.directories.items()
+        if directory["ipGroupIds"] == [new_id]
+    ] == directory_ids
+    assert fake.directories["d-29"]["ipGroupIds"] == []
+
+    # The rotated IP ACG is matched by base name afterwards
+    plan = plan_ip_acgs(refresh_inventory().ip_acgs, [get_ip_acg("45.33.32.24")])
+    assert [ip_acg.id for ip_acg in plan.unchanged] == [new_id]
+
+
+def test_rotate_dryrun(fake):
+    seed(fake, ["d-00"])
+    rotate(get_app_input(dryrun=True))
+    assert fake.call_counts["CreateIpGroup"] == 1  # the seeded IP ACG
+    assert [group["groupName"] for group in fake.ip_groups.values()] == ["ThatGroup1"]
+
+
+
+def test_rotate_in_waves(fake):
+    directory_ids = [f"d-{i:02d}" for i in range(10)]
+    old_id = seed(fake, directory_ids)
+    app_input = get_app_input()
+    app_input.settings.execution = Execution(wave_size=4)
+    counts = dict(fake.call_counts)
+
+    rotate(app_input, sleep=lambda _: None)
+
+    calls = {op: n - counts.get(op, 0) for op, n in fake.call_counts.items()}
+    assert calls["DescribeWorkspaceDirectories"] == 3  # one check per wave
+    assert calls["AssociateIpGroups"] == calls["DisassociateIpGroups"] == 10
+    assert old_id not in fake.ip_groups
+
+
+def test_rotate_skips_same_rules(fake):
+    seed(fake, ["d-00"])
+    app_input = get_app_input(ip="45.33.32.23")
+
+    assert get_rotations(app_input.settings.work_instruction, app_input.inventory) == []
+
+    rotate(app_input, sleep=lambda _: None)
+    assert fake.call_counts["CreateIpGroup"] == 1  # the seeded IP ACG
+
+
+@pytest.mark.parametrize("name_length_max, expected", [
+    # Room for the version suffix
+    (13, 1),
+    # 'ThatGroup1-v2' is longer than the maximum
+    (12, 0),
+])
+def test_get_rotations_checks_versioned_name_length(fake, name_length_max, expected):
+    seed(fake, ["d-00"])
+    app_input = get_app_input()
+
+    rotations = get_rotations(
+        app_input.settings.work_instruction, app_input.inventory, name_length_max
+    )
+    assert len(rotations) == expected
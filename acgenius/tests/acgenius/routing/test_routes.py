@@ -20,7 +20,8 @@ def test_run_common_route(directories, ip_acgs, validation, work_instruction):
     with patch('acgenius.routing.routes.show_directories') as mock_dirs, \
          patch('acgenius.routing.routes.show_ip_acgs') as mock_ip_acgs, \
          patch('acgenius.routing.routes.parse_settings') as mock_settings, \
-         patch('acgenius.routing.routes.val_work_instruction') as mock_wi:
+         patch('acgenius.routing.routes.val_work_instruction') as mock_wi, \
+         patch('acgenius.routing.routes.limit_workspaces') as mock_limit:
         
         mock_dirs.return_value = directories
         mock_ip_acgs.return_value = ip_acgs
@@ -35,6 +36,7 @@ def test_run_common_route(directories, ip_acgs, validation, work_instruction):
         assert settings.work_instruction == work_instruction
         assert inventory.directories == directories
         assert inventory.ip_acgs == ip_acgs
+        mock_limit.assert_called_once_with(5.0)
 
 
 @pytest.mark.parametrize("action,dryrun,expected_log", [
@@ -56,6 +58,7 @@ def test_run_selected_route_valid_actions(action, dryrun, expected_log):
          patch('acgenius.routing.routes.create') as mock_create, \
          patch('acgenius.routing.routes.update') as mock_update, \
          patch('acgenius.routing.routes.delete') as mock_delete, \
+         patch('acgenius.routing.routes.report_estimate') as mock_estimate, \
          patch('acgenius.routing.routes.logger') as mock_logger:
 
         run_selected_route(app_input)
@@ -68,6 +71,7 @@ def test_run_selected_route_valid_actions(action, dryrun, expected_log):
         }
 
         action_map[action].assert_called_once_with(app_input)
+        assert mock_estimate.called == (dryrun and action != "status")
         if action != "status":
             mock_logger.info.assert_called_once()
             assert expected_log in mock_logger.info.call_args[0][0]
@@ -0,0 +1,238 @@
+import pytest
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import (
+    AppInput, Directory, Execution, IP_ACG, Rule, Settings, SyncPlan, WorkInstruction
+)
+from acgenius.routing.estimate import count_calls
+from acgenius.routing.sync import plan_rules, sync
+from acgenius.routing.watch import refresh_inventory
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    for i in range(3):
+        fake.add_directory(f"d-{i}", f"dir{i}")
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_sync_plan():
+    return SyncPlan(
+        create=[], update=[], authorize=[], revoke=[], tags=[], unchanged=[],
+        associate=[], disassociate=[], delete=[], unmanaged=[],
+    )
+
+
+def get_ip_acg(name, *rules):
+    return IP_ACG(name=name, desc="", rules=[Rule(ip, desc) for ip, desc in rules])
+
+
+@pytest.mark.parametrize("rules,current_rules,expected", [
+    # Same rules, in other order and notation
+    ([("10.0.0.1", "a"), ("10.0.0.2", "b")], [("10.0.0.2/32", "b"), ("10.0.0.1/32", "a")],
+     {"unchanged": 1}),
+    # Rule added only: authorize the new rule
+    ([("10.0.0.1", "a"), ("10.0.0.2", "b")], [("10.0.0.1/32", "a")],
+     {"authorize": ["10.0.0.2"]}),
+    # Rule removed only: revoke the rule as in AWS
+    ([("10.0.0.1", "a")], [("10.0.0.1/32", "a"), ("10.0.0.2/32", "b")],
+     {"revoke": ["10.0.0.2/32"]}),
+    # Description changed: replace all rules in one call
+    ([("10.0.0.1", "new")], [("10.0.0.1/32", "old")], {"update": 1}),
+    # Rules added and removed: replace all rules in one call
+    ([("10.0.0.3", "c")], [("10.0.0.1/32", "a")], {"update": 1}),
+])
+def test_plan_rules(rules, current_rules, expected):
+    sync_plan = get_sync_plan()
+
+    plan_rules(get_ip_acg("G", *rules), get_ip_acg("G", *current_rules), sync_plan)
+
+    assert len(sync_plan.unchanged) == expected.get("unchanged", 0)
+    assert len(sync_plan.update) == expected.get("update", 0)
+    assert [
+        rule.ip for _, rules in sync_plan.authorize for rule in rules
+    ] == expected.get("authorize", [])
+    assert [
+        rule.ip for _, rules in sync_plan.revoke for rule in rules
+    ] == expected.get("revoke", [])
+
+
+def seed(fake):
+    group_ids = {}
+    for name, rules, tags in (
+        ("Keep", [("10.0.0.1", "a")], {}),
+        # Other tags: 1 create and 1 delete
+        ("Grow", [("10.0.0.1", "a")], {"Environment": "prod", "Owner": "someone"}),
+        ("Shrink", [("10.0.0.1", "a"), ("10.0.0.2", "b")], {}),
+        ("Change", [("10.0.0.1", "old")], {}),
+        ("Old", [("10.0.0.9", "z")], {}),
+    ):
+        tags = {
+            "Environment": "test",
+            "IPACGName": name,
+            "Created": "2024-01-01T00:00:00",
+            "aws:cloudformation:stack-name": "stack",
+            **tags,
+        }
+        group_ids[name] = fake.create_ip_group(
+            GroupName=name,
+            UserRules=[{"ipRule": ip, "ruleDesc": desc} for ip, desc in rules],
+            Tags=[{"Key": key, "Value": value} for key, value in tags.items()],
+        )["GroupId"]
+    for directory_id in fake.directories:
+        fake.associate_ip_groups(
+            DirectoryId=directory_id,
+            GroupIds=[group_ids[name] for name in ("Keep", "Grow", "Shrink", "Change")],
+        )
+    fake.associate_ip_groups(DirectoryId="d-0", GroupIds=[group_ids["Old"]])
+    return group_ids
+
+
+def get_app_input(dryrun=False, prune=False):
+    return AppInput(
+        cli={"action": "sync", "dryrun": dryrun, "prune": prune},
+        settings=Settings(
+            validation=None,
+            work_instruction=WorkInstruction(
+                directories=[Directory(id=None, name=None)],
+                ip_acgs=[
+                    get_ip_acg("Keep", ("10.0.0.1", "a")),
+                    get_ip_acg("Grow", ("10.0.0.1", "a"), ("10.0.0.3", "c")),
+                    get_ip_acg("Shrink", ("10.0.0.1", "a")),
+                    get_ip_acg("Change", ("10.0.0.1", "new")),
+                    get_ip_acg("New", ("10.0.0.4", "d")),
+                ],
+                tags={"Environment": "test"},
+            ),
+            execution=Execution(concurrency=4),
+        ),
+        inventory=refresh_inventory(),
+    )
+
+
+def get_calls(fake, counts):
+    return {
+        op: n - counts.get(op, 0)
+        for op, n in fake.call_counts.items()
+        if n - counts.get(op, 0)
+    }
+
+
+def test_sync_converges_with_fewest_calls(fake):
+    group_ids = seed(fake)
+    app_input = get_app_input(prune=True)
+    counts = dict(fake.call_counts)
+
+    sync(app_input)
+
+    assert get_calls(fake, counts) == {
+        "CreateIpGroup": 1,
+        "AuthorizeIpRules": 1,
+        "RevokeIpRules": 1,
+        "UpdateRulesOfIpGroup": 1,
+        "DescribeTags": 4,  # managed IP ACGs
+        "CreateTags": 1,
+        "DeleteTags": 1,
+        "AssociateIpGroups": 3,  # New, once per directory
+        "DisassociateIpGroups": 1,  # Old, from d-0 only
+        "DeleteIpGroup": 1,
+    }
+    rules = {
+        group["groupName"]: sorted(rule["ipRule"] for rule in group["userRules"])
+        for group in fake.ip_groups.values()
+    }
+    assert rules == {
+        "Keep": ["10.0.0.1/32"],
+        "Grow": ["10.0.0.1/32", "10.0.0.3/32"],
+        "Shrink": ["10.0.0.1/32"],
+        "Change": ["10.0.0.1/32"],
+        "New": ["10.0.0.4/32"],
+    }
+    assert group_ids["Old"] not in fake.ip_groups
+    assert fake.tags[group_ids["Grow"]] == {
+        "Environment": "test",
+        "IPACGName": "Grow",
+        "Created": "2024-01-01T00:00:00",
+        "aws:cloudformation:stack-name": "stack",
+    }
+    assert all(
+        len(directory["ipGroupIds"]) == 5 for directory in fake.directories.values()
+    )
+
+    # A second sync finds nothing to change; tags were forgotten at the refresh
+    app_input = get_app_input(prune=True)
+    counts = dict(fake.call_counts)
+
+    sync(app_input)
+
+    assert get_calls(fake, counts) == {"DescribeTags": 5}
+
+
+def test_sync_keeps_unmanaged_without_prune(fake, caplog):
+    group_ids = seed(fake)
+    app_input = get_app_input()
+
+    with caplog.at_level("INFO"):
+        sync(app_input)
+
+    assert group_ids["Old"] in fake.ip_groups
+    assert group_ids["Old"] in fake.directories["d-0"]["ipGroupIds"]
+    assert "Add --prune to delete them." in caplog.text
+
+
+def test_sync_dryrun_matches_estimate(fake):
+    seed(fake)
+    app_input = get_app_input(dryrun=True, prune=True)
+    counts = dict(fake.call_counts)
+
+    sync(app_input)
+
+    assert get_calls(fake, counts) == {"DescribeTags": 4}
+    counts = dict(fake.call_counts)
+    assert count_calls(app_input) == {
+        "create_ip_group": 1,
+        "update_rules_of_ip_group": 1,
+        "authorize_ip_rules": 1,
+        "revoke_ip_rules": 1,
+        "create_tags": 1,
+        "delete_tags": 1,
+        "associate_ip_groups": 3,
+        "disassociate_ip_groups": 1,
+        "delete_ip_group": 1,
+    }
+    # Tags are not described again for the estimate
+    assert get_calls(fake, counts) == {}
+
+
+def test_sync_per_ip_acg_directories(fake):
+    group_ids = seed(fake)
+    app_input = get_app_input()
+    for ip_acg in app_input.settings.work_instruction.ip_acgs:
+        if ip_acg.name == "Keep":
+            ip_acg.directories = ["d-0"]
+        if ip_acg.name == "New":
+            ip_acg.directories = ["d-1", "d-2"]
+    counts = dict(fake.call_counts)
+
+    sync(app_input)
+
+    calls = get_calls(fake, counts)
+    assert calls["AssociateIpGroups"] == 2  # New, to d-1 and d-2
+    assert calls["DisassociateIpGroups"] == 2  # Keep, from d-1 and d-2
+    new_id = next(
+        group_id
+        for group_id, group in fake.ip_groups.items()
+        if group["groupName"] == "New"
+    )
+    associated = {
+        directory_id: directory["ipGroupIds"]
+        for directory_id, directory in fake.directories.items()
+    }
+    assert group_ids["Keep"] in associated["d-0"]
+    assert group_ids["Keep"] not in associated["d-1"] + associated["d-2"]
+    assert new_id not in associated["d-0"]
+    assert new_id in associated["d-1"] and new_id in associated["d-2"]
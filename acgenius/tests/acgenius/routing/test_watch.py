@@ -0,0 +1,167 @@
+import shutil
+import pytest
+from unittest.mock import patch
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import AppInput, Settings
+from acgenius.routing.watch import refresh_inventory, watch
+
+
+@pytest.fixture
+def settings_file(tmp_path):
+    path = tmp_path / "settings.yaml"
+    shutil.copy(config.SETTINGS_FILE_PATH, path)
+    with patch("acgenius.validation.utils.SETTINGS_FILE_PATH", str(path)):
+        yield path
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-1", "corp.example.com")
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def get_app_input(dryrun=False):
+    return AppInput(
+        cli={"action": "watch", "dryrun": dryrun, "ip_acg_ids_to_delete": ()},
+        settings=Settings(validation=None),
+        inventory=refresh_inventory(),
+    )
+
+
+def edit(path, old, new, mtime):
+    path.write_text(path.read_text().replace(old, new, 1))
+    shutil.os.utime(path, (mtime, mtime))
+
+
+def get_rules(fake):
+    return {
+        group["groupName"]: sorted(rule["ipRule"] for rule in group["userRules"])
+        for group in fake.describe_ip_groups()["Result"]
+    }
+
+
+def test_watch_reconciles_changed_groups_only(settings_file, fake):
+    app_input = get_app_input()
+    edits = iter(
+        [
+            # Change a rule of a single group
+            (
+                '"45.33.32.23": "That trusted host"',
+                '"45.33.32.24": "That trusted host"',
+            ),
+            # Invalid rule: cycle fails, watch goes on
+            ('"45.33.32.24": "That trusted host"', '"0.0.0.0": "Open to all"'),
+            # Fixed again
+            ('"0.0.0.0": "Open to all"', '"45.33.32.25": "That trusted host"'),
+        ]
+    )
+
+    def sleep(_):
+        old, new = next(edits, (None, None))
+        if old:
+            edit(settings_file, old, new, settings_file.stat().st_mtime + 10)
+
+    watch(app_input, cycles=4, sleep=sleep)
+
+    assert fake.call_counts["DescribeIpGroups"] == 1
+    assert fake.call_counts["CreateIpGroup"] == 2
+    assert fake.call_counts["AssociateIpGroups"] == 1
+    assert fake.call_counts["UpdateRulesOfIpGroup"] == 2
+    assert get_rules(fake) == {
+        "ThatGroup1": ["198.51.100.22/32", "198.51.101.22/32", "45.33.32.22/32"],
+        "ThatGroup2": ["198.51.100.23/32", "45.33.32.25/32"],
+    }
+    assert [ip_acg.name for ip_acg in app_input.inventory.ip_acgs] == [
+        "ThatGroup1",
+        "ThatGroup2",
+    ]
+
+
+def test_watch_dryrun_and_refresh(settings_file, fake):
+    app_input = get_app_input(dryrun=True)
+    app_input.cli["refresh_interval"] = 5
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    watch(app_input, cycles=4, sleep=sleep, clock=lambda: now[0])
+
+    assert "CreateIpGroup" not in fake.call_counts
+    assert fake.call_counts["DescribeIpGroups"] == 2
+    assert app_input.inventory.ip_acgs == []
+
+
+def test_watch_baseline_unchanged_by_create(settings_file, fake):
+    app_input = get_app_input()
+
+    def sleep(_):
+        # Touch settings.yaml without changing it
+        mtime = settings_file.stat().st_mtime + 10
+        shutil.os.utime(settings_file, (mtime, mtime))
+
+    with patch("acgenius.routing.watch.val_rules") as val_rules:
+        watch(app_input, cycles=2, sleep=sleep)
+
+    assert fake.call_counts["CreateIpGroup"] == 2
+    assert val_rules.call_count == 1
+
+
+def test_watch_updates_rotated_ip_acg(settings_file, fake):
+    rotated = fake.create_ip_group(
+        GroupName="ThatGroup1-v2",
+        UserRules=[{"ipRule": "192.0.2.1/32", "ruleDesc": "Old host"}],
+    )["GroupId"]
+    app_input = get_app_input()
+
+    def sleep(_):
+        # Change only the description: rules are up to date in AWS
+        edit(
+            settings_file,
+            '"Some description 1"',
+            '"Other description 1"',
+            settings_file.stat().st_mtime + 10,
+        )
+
+    watch(app_input, cycles=2, sleep=sleep)
+
+    assert fake.call_counts["CreateIpGroup"] == 2
+    assert fake.call_counts["UpdateRulesOfIpGroup"] == 1
+    assert sorted(get_rules(fake)) == ["ThatGroup1-v2", "ThatGroup2"]
+    assert [
+        (ip_acg.id, ip_acg.name)
+        for ip_acg in app_input.inventory.ip_acgs
+        if ip_acg.name.startswith("ThatGroup1")
+    ] == [(rotated, "ThatGroup1-v2")]
+
+
+def test_watch_reconciles_directories_only_change(settings_file, fake):
+    fake.add_directory("d-2", "branch.example.com")
+    app_input = get_app_input()
+
+    def sleep(_):
+        edit(
+            settings_file,
+            'origin: "Security department"',
+            'origin: "Security department"\n  directories: ["d-2"]',
+            settings_file.stat().st_mtime + 10,
+        )
+
+    watch(app_input, cycles=2, sleep=sleep)
+
+    ids = {group["groupName"]: group_id for group_id, group in fake.ip_groups.items()}
+    assert fake.call_counts["AssociateIpGroups"] == 2
+    assert fake.call_counts["DisassociateIpGroups"] == 1
+    assert "UpdateRulesOfIpGroup" not in fake.call_counts
+    assert {
+        directory.id: sorted(directory.ip_acgs)
+        for directory in app_input.inventory.directories
+    } == {
+        "d-1": [ids["ThatGroup2"]],
+        "d-2": sorted([ids["ThatGroup1"], ids["ThatGroup2"]]),
+    }
@@ -0,0 +1,103 @@
+import json
+import pytest
+from botocore.exceptions import ClientError
+from click.testing import CliRunner
+from unittest.mock import MagicMock, patch
+
+from acgenius import config
+from acgenius.acgenius import main
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import Inventory, Settings
+from acgenius.telemetry.metrics import (
+    Metrics,
+    format_summary,
+    instrument,
+    metrics,
+    percentile,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    config.set_workspaces(None)
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    # No values
+    ([], 50, 0.0),
+    # Single value
+    ([1.0], 95, 1.0),
+    # Median, nearest rank
+    ([1.0, 2.0, 3.0, 4.0], 50, 2.0),
+    # High percentile
+    ([float(i) for i in range(1, 101)], 95, 95.0),
+])
+def test_percentile(values, pct, expected):
+    assert percentile(values, pct) == expected
+
+
+def test_metrics_summary():
+    collector = Metrics()
+    collector.record("describe_ip_groups", 0.010, "ok", 0)
+    collector.record("describe_ip_groups", 0.030, "ThrottlingException", 2)
+    collector.record("create_ip_group", 0.020, "ok", 1)
+
+    summary = collector.summary()
+
+    assert summary["calls"] == 3
+    assert summary["call_time_s"] == pytest.approx(0.060)
+    describe = summary["operations"]["describe_ip_groups"]
+    assert describe["calls"] == 2
+    assert describe["errors"] == {"ThrottlingException": 1}
+    assert describe["retries"] == 2
+    assert describe["p50_ms"] == pytest.approx(10.0)
+    assert describe["max_ms"] == pytest.approx(30.0)
+    assert "create_ip_group" in format_summary(summary)
+
+
+def test_instrument_records_outcome_and_retries():
+    ok = MagicMock(return_value={"ResponseMetadata": {"RetryAttempts": 3}})
+    failing = MagicMock(
+        side_effect=ClientError(
+            {"Error": {"Code": "AccessDeniedException"}}, "DeleteIpGroup"
+        )
+    )
+
+    instrument("describe_ip_groups", ok)()
+    with pytest.raises(ClientError):
+        instrument("delete_ip_group", failing)(GroupId="wsipg-1")
+
+    operations = metrics.summary()["operations"]
+    assert operations["describe_ip_groups"]["retries"] == 3
+    assert operations["delete_ip_group"]["errors"] == {"AccessDeniedException": 1}
+
+
+def test_workspaces_calls_are_instrumented():
+    config.set_workspaces(InMemoryWorkSpaces())
+
+    config.workspaces.describe_ip_groups()
+    config.workspaces.describe_workspace_directories()
+
+    assert set(metrics.summary()["operations"]) == {
+        "describe_ip_groups",
+        "describe_workspace_directories",
+    }
+
+
+def test_main_stats_file(tmp_path):
+    stats_file = tmp_path / "stats.json"
+
+    with patch("acgenius.acgenius.run_common_route") as mock_common_route, \
+         patch("acgenius.acgenius.run_selected_route"):
+        mock_common_route.return_value = (
+            Settings(validation=None),
+            Inventory(directories=[], ip_acgs=[]),
+        )
+        result = CliRunner().invoke(
+            main, ["status", "--stats", "--stats-file", str(stats_file)]
+        )
+
+    assert result.exit_code == 0
+    assert json.loads(stats_file.read_text())["calls"] == 0
@@ -0,0 +1,67 @@
+import io
+import pstats
+import pytest
+from click.testing import CliRunner
+
+from acgenius import config
+from acgenius.acgenius import main
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.telemetry.profiling import MemoryProfiler, start_profile, write_profile
+from acgenius.telemetry.tracing import span, tracer
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-1", "corp.example.com")
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+def test_write_profile(tmp_path):
+    stats_file = tmp_path / "run.pstats"
+    stream = io.StringIO()
+
+    profiler = start_profile()
+    sorted(range(1000), key=lambda i: -i)
+    write_profile(profiler, str(stats_file), top=5, stream=stream)
+
+    assert pstats.Stats(str(stats_file)).total_calls > 0
+    assert "cumulative" in stream.getvalue()
+
+
+def test_memory_profiler_nested_phases():
+    profiler = MemoryProfiler(phases=("outer", "inner"), top=2)
+    profiler.start()
+    try:
+        with span("outer"):
+            with span("inner"):
+                inner = [bytearray(1024) for _ in range(512)]
+            with span("ignored"):
+                pass
+            del inner
+    finally:
+        profiler.stop()
+
+    assert not tracer.enabled
+    assert [result["phase"] for result in profiler.results] == ["inner", "outer"]
+    inner, outer = profiler.results
+    assert inner["peak_bytes"] >= 512 * 1024
+    assert outer["peak_bytes"] >= inner["peak_bytes"]
+    assert inner["allocated_bytes"] >= 512 * 1024
+    assert "test_profiling_telemetry.py" in inner["sites"][0]["site"]
+    assert "inner" in profiler.format_report()
+
+
+def test_main_profile_and_memprofile(fake, tmp_path):
+    stats_file = tmp_path / "run.pstats"
+
+    result = CliRunner().invoke(
+        main, ["status", "--profile", str(stats_file), "--memprofile"]
+    )
+
+    assert result.exit_code == 0
+    assert stats_file.exists()
+    for phase in ("inventory", "parse_settings", "validate_work_instruction"):
+        assert phase in result.output
@@ -0,0 +1,73 @@
+import json
+import threading
+import pytest
+from click.testing import CliRunner
+
+from acgenius import config
+from acgenius.acgenius import main
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.telemetry.tracing import span, traced, tracer
+
+
+@pytest.fixture(autouse=True)
+def stop_tracer():
+    yield
+    tracer.stop()
+    config.set_workspaces(None)
+
+
+def test_span_not_recorded_when_stopped():
+    tracer.stop()
+    tracer.events = []
+
+    with span("phase"):
+        pass
+
+    assert tracer.events == []
+
+
+def test_spans_in_chrome_trace_format():
+    tracer.start()
+
+    @traced("outer")
+    def outer():
+        with span("inner", "aws", GroupId="wsipg-1"):
+            pass
+
+    outer()
+    worker = threading.Thread(target=outer)
+    worker.start()
+    worker.join()
+
+    trace = tracer.to_chrome_trace()
+    events = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    threads = [event for event in trace["traceEvents"] if event["ph"] == "M"]
+
+    assert [event["name"] for event in events] == ["outer", "inner"] * 2
+    assert events[1]["args"] == {"GroupId": "wsipg-1"}
+    assert events[0]["ts"] <= events[1]["ts"]
+    assert events[0]["dur"] >= events[1]["dur"]
+    assert [thread["args"]["name"] for thread in threads] == ["main", "worker-1"]
+
+
+def test_main_writes_trace(tmp_path):
+    trace_file = tmp_path / "trace.json"
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-1", "corp.example.com")
+    config.set_workspaces(fake)
+
+    result = CliRunner().invoke(main, ["status", "--trace", str(trace_file)])
+
+    assert result.exit_code == 0
+    names = {event["name"] for event in json.loads(trace_file.read_text())["traceEvents"]}
+    assert {
+        "common_route",
+        "fetch_directories",
+        "describe_workspace_directories",
+        "fetch_ip_acgs",
+        "render_report",
+        "load_settings",
+        "validate_structure",
+        "validate_rules",
+        "action_status",
+    } <= names
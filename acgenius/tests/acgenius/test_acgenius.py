@@ -2,15 +2,23 @@ import pytest
 from click.testing import CliRunner
 from unittest.mock import patch
 
+from acgenius import config
 from acgenius.acgenius import main
-from acgenius.resources.models import AppInput, Settings, Inventory
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import AppInput, Execution, Settings, Inventory
+from acgenius.routing.engine import RateLimitedWorkSpaces
 
 
 @pytest.mark.parametrize(
     "action,ip_acg_ids,dryrun,debug,expected_app_input,mock_settings,mock_inventory", [
         # Basic status check
         ("status", (), False, False, 
-         AppInput(cli={"action": "status", "dryrun": False, "ip_acg_ids_to_delete": ()}, 
+         AppInput(cli={"action": "status", "dryrun": False, "prune": False, "ip_acg_ids_to_delete": (),
+                      "poll_interval": 2.0, "refresh_interval": 300.0,
+                      "drift_file": None, "addresses": (), "address_file": None,
+                      "log_file": None, "log_column": None,
+                      "latency_profile": None,
+                      "since": None}, 
                  settings=Settings(validation=None), 
                  inventory=Inventory(directories=[], ip_acgs=[])),
          Settings(validation=None),
@@ -18,7 +26,12 @@ from acgenius.resources.models import AppInput, Settings, Inventory
         
         # Create with dryrun
         ("create", (), True, False,
-         AppInput(cli={"action": "create", "dryrun": True, "ip_acg_ids_to_delete": ()},
+         AppInput(cli={"action": "create", "dryrun": True, "prune": False, "ip_acg_ids_to_delete": (),
+                      "poll_interval": 2.0, "refresh_interval": 300.0,
+                      "drift_file": None, "addresses": (), "address_file": None,
+                      "log_file": None, "log_column": None,
+                      "latency_profile": None,
+                      "since": None},
                  settings=Settings(validation=None),
                  inventory=Inventory(directories=[], ip_acgs=[])),
          Settings(validation=None),
@@ -26,7 +39,12 @@ from acgenius.resources.models import AppInput, Settings, Inventory
         
         # Update with debug
         ("update", (), False, True,
-         AppInput(cli={"action": "update", "dryrun": False, "ip_acg_ids_to_delete": ()},
+         AppInput(cli={"action": "update", "dryrun": False, "prune": False, "ip_acg_ids_to_delete": (),
+                      "poll_interval": 2.0, "refresh_interval": 300.0,
+                      "drift_file": None, "addresses": (), "address_file": None,
+                      "log_file": None, "log_column": None,
+                      "latency_profile": None,
+                      "since": None},
                  settings=Settings(validation=None),
                  inventory=Inventory(directories=[], ip_acgs=[])),
          Settings(validation=None),
@@ -34,7 +52,12 @@ from acgenius.resources.models import AppInput, Settings, Inventory
         
         # Delete with IP ACG IDs
         ("delete", ("acg1", "acg2"), False, False,
-         AppInput(cli={"action": "delete", "dryrun": False, "ip_acg_ids_to_delete": ("acg1", "acg2")},
+         AppInput(cli={"action": "delete", "dryrun": False, "prune": False, "ip_acg_ids_to_delete": ("acg1", "acg2"),
+                      "poll_interval": 2.0, "refresh_interval": 300.0,
+                      "drift_file": None, "addresses": (), "address_file": None,
+                      "log_file": None, "log_column": None,
+                      "latency_profile": None,
+                      "since": None},
                  settings=Settings(validation=None),
                  inventory=Inventory(directories=[], ip_acgs=[])),
          Settings(validation=None),
@@ -42,7 +65,12 @@ from acgenius.resources.models import AppInput, Settings, Inventory
         
         # All options enabled with delete
         ("delete", ("acg1",), True, True,
-         AppInput(cli={"action": "delete", "dryrun": True, "ip_acg_ids_to_delete": ("acg1",)},
+         AppInput(cli={"action": "delete", "dryrun": True, "prune": False, "ip_acg_ids_to_delete": ("acg1",),
+                      "poll_interval": 2.0, "refresh_interval": 300.0,
+                      "drift_file": None, "addresses": (), "address_file": None,
+                      "log_file": None, "log_column": None,
+                      "latency_profile": None,
+                      "since": None},
                  settings=Settings(validation=None),
                  inventory=Inventory(directories=[], ip_acgs=[])),
          Settings(validation=None),
@@ -93,3 +121,89 @@ def test_main_error_handling(action, exception_class, exception_msg):
         
         assert result.exit_code != 0
         mock_common_route.assert_called_once()
+
+
+@pytest.mark.parametrize("output,expected_out", [
+    ("table", ""),
+    ("json", "[]\n"),
+    ("ndjson", ""),
+])
+def test_main_output_format(output, expected_out):
+    runner = CliRunner()
+
+    with patch('acgenius.acgenius.run_common_route') as mock_common_route, \
+         patch('acgenius.acgenius.run_selected_route'):
+        mock_common_route.return_value = (Settings(validation=None), Inventory(directories=[], ip_acgs=[]))
+
+        result = runner.invoke(main, ["status", "--output", output])
+
+        assert result.exit_code == 0
+        assert result.stdout == expected_out
+
+
+def test_main_journal_and_resume_rejected(tmp_path):
+    runner = CliRunner()
+    (tmp_path / "old.jsonl").write_text("")
+
+    with patch('acgenius.acgenius.run_common_route') as mock_common_route:
+        result = runner.invoke(
+            main,
+            [
+                "sync",
+                "--journal", str(tmp_path / "new.jsonl"),
+                "--resume", str(tmp_path / "old.jsonl"),
+            ],
+        )
+
+    assert result.exit_code == 1
+    mock_common_route.assert_not_called()
+
+
+@pytest.mark.parametrize("output", ["json", "csv"])
+def test_main_drift_file_and_output_rejected(tmp_path, output):
+    runner = CliRunner()
+
+    with patch('acgenius.acgenius.run_common_route') as mock_common_route:
+        result = runner.invoke(
+            main,
+            [
+                "drift",
+                "--drift-file", str(tmp_path / "drift.ndjson"),
+                "--output", output,
+            ],
+        )
+
+    assert result.exit_code == 1
+    mock_common_route.assert_not_called()
+
+
+def test_main_limits_rate_of_calls():
+    runner = CliRunner()
+    fake = InMemoryWorkSpaces()
+    config.set_workspaces(fake)
+    clients = []
+
+    try:
+        with patch('acgenius.routing.routes.parse_settings') as mock_settings, \
+             patch('acgenius.routing.routes.val_work_instruction'), \
+             patch('acgenius.routing.routes.show_directories') as mock_dirs, \
+             patch('acgenius.routing.routes.show_ip_acgs') as mock_ip_acgs, \
+             patch('acgenius.acgenius.run_selected_route') as mock_selected_route:
+            mock_settings.return_value = Settings(
+                validation=None, execution=Execution(rate_limit=2.0)
+            )
+            mock_dirs.side_effect = lambda: clients.append(config.get_workspaces()) or []
+            mock_ip_acgs.return_value = []
+            mock_selected_route.side_effect = lambda _: clients.append(config.get_workspaces())
+
+            result = runner.invoke(main, ["sync"])
+
+        assert result.exit_code == 0
+        # The inventory is described through the rate limiter as well
+        assert clients[0] is clients[1]
+        assert isinstance(clients[0], RateLimitedWorkSpaces)
+        assert clients[0].client is fake
+        assert clients[0].limiter.rate == 2.0
+        assert config.get_workspaces() is fake
+    finally:
+        config.set_workspaces(None)
@@ -1,7 +1,8 @@
 import pytest
 import logging
+from unittest.mock import patch
 
-from acgenius.config import DepthFormatter
+from acgenius.config import DepthFormatter, LazyJSON
 
 
 @pytest.mark.parametrize("depth, expected", [
@@ -16,3 +17,21 @@ def test_depth_formatter(depth, expected):
     formatted_message = formatter.format(record)
 
     assert formatted_message == expected
+
+
+@pytest.mark.parametrize("payload, max_chars, expected", [
+    ({"a": 1}, 4000, '{\n    "a": 1\n}'),
+    ({"a": "x" * 20}, 10, '{\n    "a":... [25 chars truncated]'),
+])
+def test_lazy_json_renders_and_truncates(payload, max_chars, expected):
+    assert str(LazyJSON(payload, max_chars=max_chars)) == expected
+
+
+def test_lazy_json_not_rendered_when_level_disabled():
+    logger = logging.getLogger("test_lazy_json")
+    logger.setLevel(logging.INFO)
+
+    with patch.object(LazyJSON, "__str__") as mock_str:
+        logger.debug("Payload: %s", LazyJSON({"a": 1}))
+
+    mock_str.assert_not_called()
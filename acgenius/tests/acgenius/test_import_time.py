@@ -0,0 +1,48 @@
+import os
+import subprocess
+import sys
+import pytest
+
+SRC_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+
+# Heavy dependencies that must only be loaded at first use.
+HEAVY_MODULES = ["boto3", "botocore", "pandas", "tabulate"]
+
+# Generous upper bound on the cumulative import time, in microseconds.
+IMPORT_TIME_BUDGET_US = 400_000
+
+
+def get_import_times(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": SRC_PATH},
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        import_times[name.strip()] = int(cumulative)
+
+    return import_times
+
+
+@pytest.mark.parametrize("module", [
+    # CLI entry point, e.g. for --help
+    "acgenius.acgenius",
+    # Validation of settings.yaml
+    "acgenius.validation",
+    # Reporting
+    "acgenius.resources.utils",
+])
+def test_import_time_budget(module):
+    import_times = get_import_times(module)
+
+    heavy_imported = [
+        name for name in import_times if name.split(".")[0] in HEAVY_MODULES
+    ]
+    assert heavy_imported == []
+    assert import_times[module] <= IMPORT_TIME_BUDGET_US
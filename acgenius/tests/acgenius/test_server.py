@@ -0,0 +1,174 @@
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import yaml
+
+from acgenius import config
+from acgenius.backends.memory import InMemoryWorkSpaces
+from acgenius.resources.models import IP_ACG, Directory, Execution, Inventory
+from acgenius.server import InventoryCache, create_server
+
+
+@pytest.fixture
+def settings():
+    with open(config.SETTINGS_FILE_PATH) as settings_file:
+        return yaml.safe_load(settings_file)
+
+
+@pytest.fixture
+def fake():
+    fake = InMemoryWorkSpaces()
+    fake.add_directory("d-1", "corp.example.com")
+    config.set_workspaces(fake)
+    yield fake
+    config.set_workspaces(None)
+
+
+@pytest.fixture
+def rotated(fake):
+    return fake.create_ip_group(
+        GroupName="ThatGroup1-v2",
+        UserRules=[{"ipRule": "192.0.2.1/32", "ruleDesc": "Old host"}],
+    )["GroupId"]
+
+
+@pytest.fixture
+def url(fake):
+    logging.getLogger("acgenius").setLevel(logging.INFO)
+    server = create_server(
+        "127.0.0.1", 0, Execution(concurrency=4, rate_limit=1000), refresh_interval=3600
+    )
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, data=None):
+    body = json.dumps(data).encode() if data is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_status_served_from_cache(url, fake):
+    describes = fake.call_counts["DescribeIpGroups"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda _: request(f"{url}/status"), range(200)))
+
+    assert {status for status, _ in responses} == {200}
+    assert responses[0][1]["directories"][0]["id"] == "d-1"
+    assert fake.call_counts["DescribeIpGroups"] == describes
+
+
+def test_validate(url, settings):
+    assert request(f"{url}/validate", settings) == (200, {"valid": True})
+
+    settings["ip_acgs"][0]["rules"].append({"0.0.0.0": "Open to all"})
+    status, body = request(f"{url}/validate", settings)
+
+    assert status == 422
+    assert not body["valid"]
+    assert any("0.0.0.0" in message for message in body["messages"])
+
+
+def test_plan_and_apply(url, fake, settings):
+    status, plan = request(f"{url}/plan", settings)
+    assert status == 200
+    assert [ip_acg["name"] for ip_acg in plan["create"]] == ["ThatGroup1", "ThatGroup2"]
+
+    status, body = request(f"{url}/apply", settings)
+    assert status == 200
+    assert [result["operation"] for result in body["results"]] == ["create", "create"]
+    assert {
+        group_id: fake.tags[group_id]["IPACGName"] for group_id in fake.ip_groups
+    } == {result["id"]: result["name"] for result in body["results"]}
+
+    settings["ip_acgs"][1]["rules"][0] = {"45.33.32.99": "That trusted host"}
+    status, plan = request(f"{url}/apply?dryrun=true", settings)
+    assert [ip_acg["name"] for ip_acg in plan["update"]] == ["ThatGroup2"]
+    assert [ip_acg["name"] for ip_acg in plan["unchanged"]] == ["ThatGroup1"]
+
+    request(f"{url}/apply", settings)
+    status, body = request(f"{url}/status")
+    rules = [rule["ip"] for rule in body["ip_acgs"][1]["rules"]]
+    assert "45.33.32.99" in rules
+    assert fake.call_counts["UpdateRulesOfIpGroup"] == 1
+
+
+def test_apply_create_updates_cached_directories(url, fake, settings):
+    status, body = request(f"{url}/apply", settings)
+    ids = [result["id"] for result in body["results"]]
+
+    status, body = request(f"{url}/status")
+    assert sorted(body["directories"][0]["ip_acgs"]) == sorted(ids)
+
+
+def test_cache_refresh_keeps_concurrent_put(monkeypatch):
+    cache = InventoryCache()
+    directory = Directory(id="d-1", name="corp.example.com")
+    ip_acg = IP_ACG(name="ThatGroup1", desc="desc", rules=[], id="wsipg-1")
+
+    def refresh_inventory():
+        cache.put(ip_acg, [directory])
+        return Inventory(
+            directories=[Directory(id="d-1", name="corp.example.com")], ip_acgs=[]
+        )
+
+    monkeypatch.setattr("acgenius.server.refresh_inventory", refresh_inventory)
+    cache.refresh()
+    cache.put(ip_acg, [directory])
+
+    assert cache.find("ThatGroup1") is ip_acg
+    assert cache.inventory.directories[0].ip_acgs == ["wsipg-1"]
+    assert cache.pending is None
+
+
+def test_concurrent_applies_serialized_per_ip_acg(url, fake, settings):
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(
+            executor.map(lambda _: request(f"{url}/apply", settings), range(4))
+        )
+
+    assert {status for status, _ in responses} == {200}
+    assert fake.call_counts["CreateIpGroup"] == 2
+    assert len(fake.ip_groups) == 2
+
+
+def test_apply_updates_rotated_ip_acg(rotated, url, fake, settings):
+    status, plan = request(f"{url}/plan", settings)
+    assert [ip_acg["id"] for ip_acg in plan["update"]] == [rotated]
+
+    status, body = request(f"{url}/apply", settings)
+    assert status == 200
+    assert [
+        (result["name"], result["operation"]) for result in body["results"]
+    ] == [("ThatGroup2", "create"), ("ThatGroup1", "update")]
+    assert body["results"][1]["id"] == rotated
+    assert sorted(group["groupName"] for group in fake.ip_groups.values()) == [
+        "ThatGroup1-v2",
+        "ThatGroup2",
+    ]
+
+    status, body = request(f"{url}/apply", settings)
+    assert body["results"] == []
+
+
+@pytest.mark.parametrize("path, data, expected", [
+    # Unknown path
+    ("/unknown", None, 404),
+    # Not a mapping
+    ("/validate", [1, 2], 400),
+])
+def test_bad_requests(url, path, data, expected):
+    assert request(f"{url}{path}", data)[0] == expected
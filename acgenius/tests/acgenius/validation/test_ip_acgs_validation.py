@@ -8,6 +8,8 @@ from acgenius.validation.ip_acgs import (
     val_ip_acg_name_length_allowed,
     val_ip_acg_name_unique,
     val_ip_acg_description_length_allowed,
+    val_ip_acg_directories,
+    get_ip_acg_names_per_directory,
     val_ip_acgs,
     val_ip_acgs_match_inventory
 )
@@ -120,6 +122,59 @@ def test_val_ip_acg_description_length_allowed(desc, max_length, should_raise, s
     else:
         val_ip_acg_description_length_allowed(ip_acg, settings)
 
+@pytest.mark.parametrize("directories, should_raise", [
+    # No directories of its own
+    (None, False),
+    # Directory ids
+    (["d-1", "d-2"], False),
+    # Not a list
+    ("d-1", True),
+    # Empty id
+    (["d-1", ""], True),
+    # Duplicate id
+    (["d-1", "d-1"], True),
+])
+def test_val_ip_acg_directories(directories, should_raise):
+    ip_acg = IP_ACG(name="test_group", desc="desc", rules=[], directories=directories)
+
+    if should_raise:
+        with pytest.raises(SystemExit):
+            val_ip_acg_directories(ip_acg)
+    else:
+        val_ip_acg_directories(ip_acg)
+
+
+@pytest.mark.parametrize("directories, expected", [
+    # No directories of their own: all IP ACGs may go to any directory
+    ([None, None, None], {None: ["g0", "g1", "g2"]}),
+    # IP ACGs with directories count for those only
+    ([None, ["d-1"], ["d-2"]], {None: ["g0"], "d-1": ["g0", "g1"], "d-2": ["g0", "g2"]}),
+    ([["d-1"], ["d-1"], ["d-2"]], {None: [], "d-1": ["g0", "g1"], "d-2": ["g2"]}),
+])
+def test_get_ip_acg_names_per_directory(directories, expected):
+    ip_acgs = [
+        IP_ACG(name=f"g{i}", desc="desc", rules=[], directories=ip_acg_directories)
+        for i, ip_acg_directories in enumerate(directories)
+    ]
+    assert get_ip_acg_names_per_directory(ip_acgs) == expected
+
+
+def test_val_ip_acgs_counts_groups_per_directory(settings):
+    settings.validation.groups_per_directory_amt_max = 2
+    ip_acgs = [
+        IP_ACG(name=f"g{i}", desc="desc", rules=[], directories=[f"d-{i}"])
+        for i in range(4)
+    ]
+    work_instruction = WorkInstruction(ip_acgs=ip_acgs, directories=[], tags={})
+
+    val_ip_acgs(work_instruction, settings)
+
+    ip_acgs[1].directories = ["d-0"]
+    ip_acgs[2].directories = ["d-0"]
+    with pytest.raises(SystemExit):
+        val_ip_acgs(work_instruction, settings)
+
+
 @pytest.mark.parametrize("ip_acgs_data, should_raise", [
     ([("group1", "desc1"), ("group2", "desc2")], False),
     ([("group1", "desc1"), ("group1", "desc2")], True),
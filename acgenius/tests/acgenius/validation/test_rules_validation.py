@@ -213,3 +213,23 @@ def test_val_rules(rules, expected):
         result = val_rules(work_instruction, settings)
         assert isinstance(result, WorkInstruction)
         assert result.ip_acgs[0].desc == "test"
+
+
+def test_val_rules_sets_network_with_prefix_default():
+    settings = MockSettings(
+        validation=MockValidation(
+            invalid_rules=[],
+            prefix_min=16,
+            prefix_default=24,
+            rules_desc_length_max=100,
+            rules_amt_max=60,
+            groups_per_directory_amt_max=25
+        )
+    )
+    rule = Rule(ip=" 192.168.1.1 ", desc="test")
+    ip_acg = IP_ACG(name="test_acg", desc="test", rules=[rule])
+    work_instruction = WorkInstruction(ip_acgs=[ip_acg], directories=[], tags=[])
+
+    val_rules(work_instruction, settings)
+
+    assert str(rule.network) == "192.168.1.0/24"
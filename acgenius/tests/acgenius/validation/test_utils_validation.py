@@ -8,12 +8,13 @@ from acgenius.validation.utils import (
     val_settings_ip_acg_structure,
     get_validation_baseline,
     get_work_instruction,
+    get_execution,
     parse_settings,
     split_ip_and_prefix,
     remove_whitespaces
 )
 from acgenius.resources.models import (
-    Rule, IP_ACG, Directory, WorkInstruction, Validation, Settings
+    Rule, IP_ACG, Directory, WorkInstruction, Validation, Settings, Execution
 )
 
 
@@ -183,6 +184,30 @@ def test_get_validation_baseline(valid_settings):
             tags={"key": "value"}
         )
     ),
+    # IP ACG with its own directories
+    (
+        {
+            "directories": [],
+            "ip_acgs": [{
+                "name": "test",
+                "desc": "test",
+                "rules": [{"192.168.1.1": "test"}],
+                "directories": ["d-1"]
+            }],
+            "tags": {}
+        },
+        WorkInstruction(
+            directories=[],
+            ip_acgs=[IP_ACG(
+                name="test",
+                desc="test",
+                origin="",
+                rules=[Rule(ip="192.168.1.1", desc="test")],
+                directories=["d-1"]
+            )],
+            tags={}
+        )
+    ),
 ])
 def test_get_work_instruction(settings_input, expected_result):
     result = get_work_instruction(settings_input)
@@ -201,6 +226,40 @@ def test_parse_settings(valid_settings, monkeypatch):
     assert isinstance(result, Settings)
     assert isinstance(result.validation, Validation)
     assert isinstance(result.work_instruction, WorkInstruction)
+    assert result.execution == Execution()
+
+
+def test_parse_settings_from_payload(valid_settings):
+    result = parse_settings({**valid_settings, "execution": {"concurrency": 4}})
+    assert result.execution == Execution(concurrency=4, rate_limit=5.0)
+
+
+@pytest.mark.parametrize("execution,expected", [
+    # Absent section
+    (None, Execution()),
+    # Partially specified
+    ({"rate_limit": 2}, Execution(concurrency=1, rate_limit=2.0)),
+    # Fully specified
+    ({"concurrency": 8, "rate_limit": 0.5}, Execution(concurrency=8, rate_limit=0.5)),
+    # Rollout waves
+    ({"wave_size": 5, "wave_percentage": 25},
+     Execution(wave_size=5, wave_percentage=25.0)),
+    # Invalid wave size
+    ({"wave_size": 0}, SystemExit),
+    # Invalid wave percentage
+    ({"wave_percentage": 150}, SystemExit),
+    # Invalid concurrency
+    ({"concurrency": 0}, SystemExit),
+    # Invalid rate limit
+    ({"rate_limit": "fast"}, SystemExit),
+])
+def test_get_execution(execution, expected):
+    settings = {"execution": execution}
+    if expected is SystemExit:
+        with pytest.raises(SystemExit):
+            get_execution(settings)
+    else:
+        assert get_execution(settings) == expected
 
 
 def test_split_ip_and_prefix_with_prefix(valid_settings):